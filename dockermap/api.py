@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from .build.context import DockerContext
+from .build.context import DockerContext, StreamingDockerContext
 from .build.dockerfile import DockerFile
 from .client.base import DockerClientWrapper
 from .exceptions import PartialResultsError, DockerStatusError
@@ -12,6 +12,7 @@ from .map.config.host_volume import HostVolumeConfiguration
 from .map.config.main import ContainerMap
 from .map.config.network import NetworkConfiguration
 from .map.config.volume import VolumeConfiguration
-from .map.exceptions import ActionRunnerException, MapIntegrityError, ScriptActionException, ScriptRunException
+from .map.exceptions import (ActionRunnerException, MapIntegrityError, ScriptActionException, ScriptRunException,
+                             ContainerNotReadyError)
 from .map.input import (ContainerLink, ExecPolicy, ExecCommand, ItemType, MapConfigId, NetworkEndpoint, PortBinding,
-                        SharedVolume, HealthCheck)
+                        SharedVolume, HealthCheck, ReadyCheck)
@@ -1,17 +1,98 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import bz2
+from collections import deque, namedtuple
+import copy
+import hashlib
+import json
+import multiprocessing
+import sys
 import tarfile
+import threading
+import zlib
 
-import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+import io
 import os
 import re
+import six
+from six.moves import queue
 
 from .buffer import DockerTempFile
 from .dockerfile import DockerFile
 
 
 LITERAL_PATTERN = re.compile(r'\\(.)')
+# Number of patterns that are combined into a single regular expression; Python 2 supports up to 100 groups.
+MAX_COMBINED_PATTERNS = 100
+STREAM_ENCODINGS = {
+    'gz': 'gzip',
+    'pgz': 'gzip',
+    'bz2': 'bzip2',
+}
+
+
+def translate_pattern(pattern):
+    """
+    Translates a shell-style pattern into a regular expression, as :func:`fnmatch.translate`. Unlike the latter, the
+    expression does not contain any groups or inline flags, so that multiple expressions can be combined. It should be
+    compiled with the flag :data:`re.DOTALL`.
+
+    :param pattern: Shell-style pattern.
+    :type pattern: unicode | str
+    :return: Regular expression.
+    :rtype: unicode | str
+    """
+    i, n = 0, len(pattern)
+    res = []
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            if not res or res[-1] != '.*':
+                res.append('.*')
+        elif c == '?':
+            res.append('.')
+        elif c == '[':
+            j = i
+            if j < n and pattern[j] == '!':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                res.append('\\[')
+            else:
+                stuff = pattern[i:j].replace('\\', '\\\\')
+                i = j + 1
+                if stuff[0] == '!':
+                    stuff = '^' + stuff[1:]
+                elif stuff[0] == '^':
+                    stuff = '\\' + stuff
+                res.append('[{0}]'.format(stuff))
+        else:
+            res.append(re.escape(c))
+    res.append('\\Z')
+    return ''.join(res)
+
+
+def _get_literal_prefix(expr):
+    # Returns the beginning of a regular expression from translate_pattern, up to the first wildcard.
+    prefix = []
+    i, n = 0, len(expr) - 2
+    while i < n:
+        c = expr[i]
+        if c == '\\':
+            prefix.append(expr[i + 1])
+            i += 2
+        elif c in '.[':
+            break
+        else:
+            prefix.append(c)
+            i += 1
+    return ''.join(prefix)
 
 
 def preprocess_matches(input_items):
@@ -39,7 +120,7 @@ def preprocess_matches(input_items):
         else:
             is_negative = False
             match_str = s
-        yield re.compile(fnmatch.translate(LITERAL_PATTERN.sub(r'[\g<1>]', match_str))), is_negative
+        yield re.compile(translate_pattern(LITERAL_PATTERN.sub(r'[\g<1>]', match_str)), re.DOTALL), is_negative
 
 
 def get_exclusions(path):
@@ -57,10 +138,86 @@ def get_exclusions(path):
     dockerignore_file = os.path.join(path, '.dockerignore')
     if not os.path.isfile(dockerignore_file):
         return None
-    with open(dockerignore_file, 'rb') as dif:
+    with io.open(dockerignore_file, 'r', encoding='utf-8') as dif:
         return list(preprocess_matches(dif.readlines()))
 
 
+class ExclusionMatcher(object):
+    """
+    Matches relative paths against exclusion patterns, as generated by :func:`preprocess_matches`. All patterns are
+    combined into a single regular expression. As in Docker, the last pattern that matches a path decides whether it is
+    excluded or not.
+
+    Excluded directories can be skipped entirely, unless there is an exemption that could match a path inside them.
+    Whether that is the case is checked once per directory.
+
+    :param patterns: List of patterns and negative indicator.
+    :type patterns: list[(__RegEx, bool)]
+    """
+    def __init__(self, patterns):
+        patterns = list(patterns)
+        if patterns and len(patterns) < MAX_COMBINED_PATTERNS:
+            # Alternatives are tried in order; reversing them makes the last matching pattern the first alternative.
+            self._expr = re.compile('|'.join('({0})'.format(expr.pattern) for expr, __ in reversed(patterns)),
+                                    re.DOTALL)
+        else:
+            self._expr = None
+        self._patterns = patterns[::-1]
+        self._negative = [None]
+        self._negative.extend(is_negative for __, is_negative in reversed(patterns))
+        self._exemption_prefixes = [_get_literal_prefix(expr.pattern) for expr, is_negative in patterns if is_negative]
+        self._prune_dirs = {}
+
+    def _match(self, name):
+        expr = self._expr
+        if expr is not None:
+            match = expr.match(name)
+            if match is None:
+                return None
+            return not self._negative[match.lastindex]
+        # Python 2 does not support more than 100 groups in a single expression.
+        for pattern, is_negative in self._patterns:
+            if pattern.match(name) is not None:
+                return not is_negative
+        return None
+
+    def is_excluded(self, name, parent_excluded=False):
+        """
+        Checks whether a path is excluded. Paths inside an excluded directory remain excluded, unless an exemption
+        matches them.
+
+        :param name: Path relative to the context root, with ``/`` as separator.
+        :type name: unicode | str
+        :param parent_excluded: Whether the parent directory of the path is excluded.
+        :type parent_excluded: bool
+        :return: ``True`` if the path is excluded, ``False`` otherwise.
+        :rtype: bool
+        """
+        excluded = self._match(name)
+        if excluded is None:
+            return parent_excluded
+        return excluded
+
+    def can_prune(self, name):
+        """
+        Checks whether the contents of an excluded directory can be skipped, i.e. no exemption could match any path
+        inside it.
+
+        :param name: Directory path relative to the context root, with ``/`` as separator.
+        :type name: unicode | str
+        :return: ``True`` if the directory does not have to be traversed, ``False`` otherwise.
+        :rtype: bool
+        """
+        try:
+            return self._prune_dirs[name]
+        except KeyError:
+            pass
+        dir_prefix = name + '/'
+        prune = self._prune_dirs[name] = not any(prefix.startswith(dir_prefix) or dir_prefix.startswith(prefix)
+                                                 for prefix in self._exemption_prefixes)
+        return prune
+
+
 def get_filter_func(patterns, prefix):
     """
     Provides a filter function that can be used as filter argument on ``tarfile.add``. Generates the filter based on
@@ -79,36 +236,234 @@ def get_filter_func(patterns, prefix):
     :return: tarinfo.TarInfo -> tarinfo.TarInfo | NoneType
     """
     prefix_len = len(prefix.strip(os.path.sep)) + 1
-    if any(i[1] for i in patterns):
-        def _exclusion_func(tarinfo):
-            name = tarinfo.name[prefix_len:]
-            exclude = False
-            for match_str, is_negative in patterns:
-                if is_negative:
-                    if not exclude:
-                        continue
-                    if match_str.match(name) is not None:
-                        exclude = False
-                elif exclude:
-                    continue
-                elif match_str.match(name) is not None:
-                    exclude = True
-            if exclude:
-                return None
-            return tarinfo
-    else:
-        # Optimized version: If there are no exemptions from matches, not all matches have to be processed.
-        exclusions = [i[0] for i in patterns]
-
-        def _exclusion_func(tarinfo):
-            name = tarinfo.name[prefix_len:]
-            if any(match_str.match(name) is not None for match_str in exclusions):
-                return None
-            return tarinfo
+    is_excluded = ExclusionMatcher(patterns).is_excluded
+
+    def _exclusion_func(tarinfo):
+        if is_excluded(tarinfo.name[prefix_len:]):
+            return None
+        return tarinfo
 
     return _exclusion_func
 
 
+class ParallelGzipCompressor(object):
+    """
+    Compresses data in blocks of ``block_size`` bytes, using a pool of threads. Each block is written as a separate
+    gzip member; the concatenated members form a valid gzip stream. Has the same ``compress`` and ``flush`` methods as
+    the compressor objects of :mod:`zlib`; output is returned in order as soon as it is available.
+
+    :param compresslevel: Compression level.
+    :type compresslevel: int
+    :param workers: Number of threads. By default uses the number of CPUs.
+    :type workers: int
+    :param block_size: Size of each compressed block.
+    :type block_size: int
+    """
+    def __init__(self, compresslevel=9, workers=None, block_size=1048576):
+        workers = workers or multiprocessing.cpu_count()
+        self._compresslevel = compresslevel
+        self._block_size = block_size
+        self._max_pending = workers * 2
+        self._executor = ThreadPoolExecutor(workers)
+        self._pending = deque()
+        self._buffer = []
+        self._buffer_size = 0
+
+    def _compress_block(self, data):
+        compressor = zlib.compressobj(self._compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+
+    def _submit(self, data):
+        self._pending.append(self._executor.submit(self._compress_block, data))
+
+    def _collect(self, wait_all):
+        pending = self._pending
+        output = []
+        # Waits for blocks, if too many have been queued.
+        while pending and (wait_all or pending[0].done() or len(pending) > self._max_pending):
+            output.append(pending.popleft().result())
+        return b''.join(output)
+
+    def compress(self, data):
+        """
+        Adds data to the compressed stream.
+
+        :param data: Uncompressed data.
+        :type data: bytes
+        :return: Compressed output, as far as it is available.
+        :rtype: bytes
+        """
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        if self._buffer_size >= self._block_size:
+            block_size = self._block_size
+            data = b''.join(self._buffer)
+            end = len(data) - len(data) % block_size
+            for start in range(0, end, block_size):
+                self._submit(data[start:start + block_size])
+            remainder = data[end:]
+            self._buffer = [remainder]
+            self._buffer_size = len(remainder)
+        return self._collect(False)
+
+    def flush(self):
+        """
+        Compresses the remaining data, and finishes the stream.
+
+        :return: Remaining compressed output.
+        :rtype: bytes
+        """
+        if self._buffer_size:
+            self._submit(b''.join(self._buffer))
+            self._buffer = []
+            self._buffer_size = 0
+        try:
+            return self._collect(True)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Shuts down the thread pool. Pending blocks are discarded.
+        """
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+
+def get_compressor(compression, compresslevel=9, workers=None):
+    """
+    Returns a compressor object for the given compression type.
+
+    :param compression: Compression type, i.e. ``gz`` for gzip, ``pgz`` for gzip using multiple threads, ``bz2`` for
+      bzip2, or ``None`` or ``none`` for no compression.
+    :type compression: unicode | str | NoneType
+    :param compresslevel: Compression level.
+    :type compresslevel: int
+    :param workers: Number of threads for ``pgz`` compression.
+    :type workers: int
+    :return: Compressor object with methods ``compress`` and ``flush``; ``None`` if the data is not compressed.
+    """
+    if not compression or compression == 'none':
+        return None
+    elif compression == 'gz':
+        return zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif compression == 'pgz':
+        return ParallelGzipCompressor(compresslevel, workers)
+    elif compression == 'bz2':
+        return bz2.BZ2Compressor(compresslevel)
+    raise ValueError("Unsupported compression: {0}.".format(compression))
+
+
+class _CompressingWriter(object):
+    """
+    File-like object, that compresses data before writing it to another file object.
+    """
+    def __init__(self, fileobj, compressor):
+        self._fileobj = fileobj
+        self._compressor = compressor
+
+    def write(self, data):
+        output = self._compressor.compress(data)
+        if output:
+            self._fileobj.write(output)
+
+    def finish(self):
+        self._fileobj.write(self._compressor.flush())
+
+    def close(self):
+        close_func = getattr(self._compressor, 'close', None)
+        if close_func:
+            close_func()
+
+
+class _HashingReader(object):
+    def __init__(self, fileobj, content_hash):
+        self._fileobj = fileobj
+        self._content_hash = content_hash
+
+    def read(self, *args):
+        data = self._fileobj.read(*args)
+        self._content_hash.update(data)
+        return data
+
+
+class TarNormalization(namedtuple('TarNormalization', ['mtime', 'uid', 'gid', 'uname', 'gname', 'normalize_mode'])):
+    """
+    Describes how entries of a reproducible context tarball are normalized, so that tarballs generated from the same
+    contents are identical, regardless of modification times and ownership of the source files.
+
+    :param mtime: Modification time to set on all entries.
+    :type mtime: int
+    :param uid: User id to set on all entries.
+    :type uid: int
+    :param gid: Group id to set on all entries.
+    :type gid: int
+    :param uname: User name to set on all entries.
+    :type uname: unicode | str
+    :param gname: Group name to set on all entries.
+    :type gname: unicode | str
+    :param normalize_mode: Set permissions of directories and executable files to ``0755``, and of other files to
+      ``0644``.
+    :type normalize_mode: bool
+    """
+    __slots__ = ()
+
+    def __new__(cls, mtime=0, uid=0, gid=0, uname='', gname='', normalize_mode=True):
+        return super(TarNormalization, cls).__new__(cls, mtime, uid, gid, uname, gname, normalize_mode)
+
+    def apply(self, tarinfo):
+        """
+        Returns a normalized copy of an entry.
+
+        :param tarinfo: Tar info object.
+        :type tarinfo: tarfile.TarInfo
+        :return: Normalized tar info object.
+        :rtype: tarfile.TarInfo
+        """
+        tarinfo = copy.copy(tarinfo)
+        tarinfo.mtime = self.mtime
+        tarinfo.uid = self.uid
+        tarinfo.gid = self.gid
+        tarinfo.uname = self.uname
+        tarinfo.gname = self.gname
+        if self.normalize_mode:
+            if tarinfo.issym():
+                tarinfo.mode = 0o777
+            elif tarinfo.isdir() or tarinfo.mode & 0o111:
+                tarinfo.mode = 0o755
+            else:
+                tarinfo.mode = 0o644
+        return tarinfo
+
+
+class ContentHashTarFile(tarfile.TarFile):
+    """
+    Tar file, that generates a hash of its contents while they are added. The hash includes names, types, permissions,
+    link names, sizes, and contents of all entries in the order they are added, but no modification times or
+    ownership. If ``normalization`` is set, entries are normalized before they are added.
+    """
+    normalization = None
+
+    def __init__(self, *args, **kwargs):
+        super(ContentHashTarFile, self).__init__(*args, **kwargs)
+        self.content_hash = hashlib.sha256()
+
+    def addfile(self, tarinfo, fileobj=None):
+        if self.normalization:
+            tarinfo = self.normalization.apply(tarinfo)
+        entry = [tarinfo.name, tarinfo.type.decode('latin-1'), tarinfo.mode & 0o7777, tarinfo.linkname, tarinfo.size]
+        self.content_hash.update(json.dumps(entry).encode('utf-8'))
+        if fileobj is not None:
+            fileobj = _HashingReader(fileobj, self.content_hash)
+        super(ContentHashTarFile, self).addfile(tarinfo, fileobj)
+
+
+class _NullWriter(object):
+    def write(self, data):
+        pass
+
+
 class DockerContext(DockerTempFile):
     """
     Class for constructing a Docker context tarball, that can be sent to the remote API. If a :class:`~DockerFile`
@@ -116,24 +471,36 @@ class DockerContext(DockerTempFile):
 
     :param dockerfile: Optional :class:`~DockerFile` instance, or file path to a Dockerfile.
     :type dockerfile: DockerFile | unicode | str
-    :param compression: Compression for the tarball; default is gzip (`gz`); use `bz2` for bzip2.
+    :param compression: Compression for the tarball; default is gzip (`gz`); use `pgz` for gzip using multiple
+      threads, `bz2` for bzip2, and `none` for no compression, e.g. when the Docker daemon is on the local host.
     :type compression: unicode | str
     :param encoding: Encoding for the tarfile; default is `utf-8`.
     :type encoding: unicode | str
     :param finalize: Finalize the tarball immediately.
     :type finalize: bool
+    :param compress_workers: Number of threads for `pgz` compression. By default uses the number of CPUs.
+    :type compress_workers: int
+    :param reproducible: Generate a reproducible tarball: Directories are added in sorted order, entries are
+      normalized, and the gzip header does not contain a timestamp. Can be set to ``True`` for the default
+      normalization, or to a :class:`TarNormalization` instance.
+    :type reproducible: bool | TarNormalization
     :param kwargs: Additional kwargs for :func:`tarfile.open`.
     """
-    def __init__(self, dockerfile=None, compression='gz', encoding='utf-8', finalize=False, **kwargs):
+    def __init__(self, dockerfile=None, compression='gz', encoding='utf-8', finalize=False, compress_workers=None,
+                 reproducible=False, **kwargs):
         super(DockerContext, self).__init__()
-        open_mode = 'w:{0}'.format(compression or '')
-        if compression == 'gz':
-            self._stream_encoding = 'gzip'
-        elif compression == 'bz2':
-            self._stream_encoding = 'bzip2'
+        self._stream_encoding = STREAM_ENCODINGS.get(compression)
+        self._compress_workers = compress_workers
+        self._writer = None
+        if reproducible is True:
+            self._normalization = TarNormalization()
         else:
-            self._stream_encoding = None
-        self.tarfile = tarfile.open(mode=open_mode, fileobj=self._fileobj, encoding=encoding, **kwargs)
+            self._normalization = reproducible or None
+        if self._normalization:
+            # The default format differs between Python versions.
+            kwargs.setdefault('format', tarfile.PAX_FORMAT)
+        self.tarfile = self.open_tarfile(compression, encoding, **kwargs)
+        self.tarfile.normalization = self._normalization
         if dockerfile is not None:
             self.add_dockerfile(dockerfile)
         if finalize:
@@ -141,22 +508,66 @@ class DockerContext(DockerTempFile):
                 raise ValueError("Cannot finalize the docker context tarball without a dockerfile object.")
             self.finalize()
 
+    def open_tarfile(self, compression, encoding, **kwargs):
+        """
+        Opens the tar file on the underlying file object.
+
+        :param compression: Compression for the tarball.
+        :type compression: unicode | str
+        :param encoding: Encoding for the tarfile.
+        :type encoding: unicode | str
+        :param kwargs: Additional kwargs for :func:`tarfile.open`.
+        :return: Tar file object.
+        :rtype: tarfile.TarFile
+        """
+        if compression == 'pgz' or (compression == 'gz' and self._normalization):
+            # Unlike tarfile, writes gzip headers without file name and modification time.
+            compressor = get_compressor(compression, kwargs.pop('compresslevel', 9), self._compress_workers)
+            self._writer = _CompressingWriter(self._fileobj, compressor)
+            return ContentHashTarFile.open(mode='w|', fileobj=self._writer, encoding=encoding, **kwargs)
+        elif compression == 'none':
+            compression = None
+        open_mode = 'w:{0}'.format(compression or '')
+        return ContentHashTarFile.open(mode=open_mode, fileobj=self._fileobj, encoding=encoding, **kwargs)
+
     def add(self, name, arcname=None, **kwargs):
         """
         Add a file or directory to the context tarball.
 
+        If a directory contains a ``.dockerignore`` file, matching paths are excluded, unless a ``filter`` is passed
+        in. Excluded directories are not traversed, unless an exemption could apply to their contents. Directory
+        contents are added in sorted order.
+
         :param name: File or directory path.
         :type name: unicode | str
         :param args: Additional args for :meth:`tarfile.TarFile.add`.
         :param kwargs: Additional kwargs for :meth:`tarfile.TarFile.add`.
         """
-        if os.path.isdir(name):
+        if os.path.isdir(name) and 'filter' not in kwargs and kwargs.get('recursive', True):
             exclusions = get_exclusions(name)
-            if exclusions:
-                target_prefix = os.path.abspath(arcname or name)
-                kwargs.setdefault('filter', get_filter_func(exclusions, target_prefix))
+            if exclusions or self._normalization:
+                kwargs['recursive'] = False
+                self.tarfile.add(name, arcname=arcname, **kwargs)
+                self._add_tree(name, arcname if arcname is not None else name, '', ExclusionMatcher(exclusions or ()),
+                               False, kwargs)
+                return
         self.tarfile.add(name, arcname=arcname, **kwargs)
 
+    def _add_tree(self, path, arcname, rel_path, matcher, parent_excluded, kwargs):
+        for entry in sorted(os.listdir(path)):
+            entry_path = os.path.join(path, entry)
+            entry_rel_path = '{0}/{1}'.format(rel_path, entry) if rel_path else entry
+            is_dir = os.path.isdir(entry_path) and not os.path.islink(entry_path)
+            entry_arcname = os.path.join(arcname, entry)
+            excluded = matcher.is_excluded(entry_rel_path, parent_excluded)
+            if excluded:
+                if is_dir and not matcher.can_prune(entry_rel_path):
+                    self._add_tree(entry_path, entry_arcname, entry_rel_path, matcher, True, kwargs)
+                continue
+            self.tarfile.add(entry_path, arcname=entry_arcname, **kwargs)
+            if is_dir:
+                self._add_tree(entry_path, entry_arcname, entry_rel_path, matcher, False, kwargs)
+
     def addfile(self, *args, **kwargs):
         """
         Add a file to the tarball using a :class:`~tarfile.TarInfo` object. For details, see
@@ -196,7 +607,7 @@ class DockerContext(DockerTempFile):
             tarinfo = tarfile.TarInfo('Dockerfile')
             tarinfo.size = dockerfile_obj.tell()
             dockerfile_obj.seek(0)
-            self.tarfile.addfile(tarinfo, dockerfile_obj)
+            self.addfile(tarinfo, dockerfile_obj)
         else:
             self.add(dockerfile, arcname='Dockerfile')
 
@@ -217,8 +628,22 @@ class DockerContext(DockerTempFile):
         file object can still be read.
         """
         self.tarfile.close()
+        if self._writer:
+            self._writer.finish()
         self._fileobj.seek(0)
 
+    def get_content_hash(self):
+        """
+        Returns a hash of the contents of the context tarball, as generated by :class:`ContentHashTarFile`. The
+        context is finalized, if that has not happened before.
+
+        :return: Hexadecimal SHA-256 hash.
+        :rtype: unicode | str
+        """
+        if not self.tarfile.closed:
+            self.finalize()
+        return self.tarfile.content_hash.hexdigest()
+
     @property
     def name(self):
         """
@@ -252,3 +677,279 @@ class DockerContext(DockerTempFile):
                 if not buf:
                     break
                 f.write(buf)
+
+    def close(self):
+        """
+        Closes the file object. If the tarball has not been finalized, threads used for compression are shut down.
+        """
+        if self._writer:
+            self._writer.close()
+        super(DockerContext, self).close()
+
+
+class _StreamCancelled(Exception):
+    pass
+
+
+class _ChunkWriter(object):
+    """
+    File-like object for the output of a tar file stream. Compresses the data written, and passes it on in chunks of
+    at least ``chunk_size`` bytes to a queue, as long as the stream has not been cancelled.
+    """
+    def __init__(self):
+        self.compressor = None
+        self.chunk_size = 1
+        self.queue = None
+        self.cancelled = threading.Event()
+        self._buffer = []
+        self._buffer_size = 0
+
+    def _put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise _StreamCancelled()
+
+    def _append(self, data):
+        if data:
+            self._buffer.append(data)
+            self._buffer_size += len(data)
+            if self._buffer_size >= self.chunk_size:
+                self._put(b''.join(self._buffer))
+                self._buffer = []
+                self._buffer_size = 0
+
+    def write(self, data):
+        compressor = self.compressor
+        self._append(compressor.compress(data) if compressor else data)
+
+    def finish(self):
+        compressor = self.compressor
+        if compressor:
+            self._append(compressor.flush())
+        if self._buffer:
+            self._put(b''.join(self._buffer))
+            self._buffer = []
+            self._buffer_size = 0
+        self._put(None)
+
+    def fail(self, exc_info):
+        self._put(exc_info)
+
+    def close(self):
+        self.cancelled.set()
+        close_func = getattr(self.compressor, 'close', None)
+        if close_func:
+            close_func()
+
+
+class StreamingDockerContext(DockerContext):
+    """
+    Docker context tarball, that is generated while it is being read, e.g. during the upload to the Docker remote API.
+    Files, directories, and archives added are only read at that point, so they should not be changed in between. The
+    tarball is generated in a separate thread, that stays ahead of the consumer by up to ``queue_size`` chunks. It can
+    only be read once.
+
+    :param dockerfile: Optional :class:`~DockerFile` instance, or file path to a Dockerfile.
+    :type dockerfile: DockerFile | unicode | str
+    :param compression: Compression for the tarball; default is gzip (`gz`); use `pgz` for gzip using multiple
+      threads, `bz2` for bzip2, and `none` for no compression.
+    :type compression: unicode | str
+    :param encoding: Encoding for the tarfile; default is `utf-8`.
+    :type encoding: unicode | str
+    :param finalize: Finalize the tarball immediately.
+    :type finalize: bool
+    :param compress_workers: Number of threads for `pgz` compression. By default uses the number of CPUs.
+    :type compress_workers: int
+    :param reproducible: Generate a reproducible tarball. See :class:`DockerContext`.
+    :type reproducible: bool | TarNormalization
+    :param chunk_size: Minimum size of chunks to pass on.
+    :type chunk_size: int
+    :param queue_size: Maximum number of chunks to generate ahead of the consumer.
+    :type queue_size: int
+    :param kwargs: Additional kwargs for :func:`tarfile.open`.
+    """
+    def __init__(self, dockerfile=None, compression='gz', encoding='utf-8', finalize=False, compress_workers=None,
+                 reproducible=False, chunk_size=65536, queue_size=16, **kwargs):
+        self._chunk_size = chunk_size
+        self._queue_size = queue_size
+        self._operations = []
+        self._content_hash = None
+        self._thread = None
+        self._consumed = False
+        super(StreamingDockerContext, self).__init__(dockerfile=dockerfile, compression=compression, encoding=encoding,
+                                                     finalize=finalize, compress_workers=compress_workers,
+                                                     reproducible=reproducible, **kwargs)
+
+    def create_fileobj(self):
+        return _ChunkWriter()
+
+    def open_tarfile(self, compression, encoding, compresslevel=9, **kwargs):
+        """
+        Opens the tar file as an uncompressed stream, and sets up the compression of the output.
+
+        :param compression: Compression for the tarball.
+        :type compression: unicode | str
+        :param encoding: Encoding for the tarfile.
+        :type encoding: unicode | str
+        :param compresslevel: Compression level.
+        :type compresslevel: int
+        :param kwargs: Additional kwargs for :func:`tarfile.open`.
+        :return: Tar file object.
+        :rtype: tarfile.TarFile
+        """
+        writer = self._fileobj
+        writer.compressor = get_compressor(compression, compresslevel, self._compress_workers)
+        writer.chunk_size = self._chunk_size
+        writer.queue = queue.Queue(self._queue_size)
+        return ContentHashTarFile.open(mode='w|', fileobj=writer, encoding=encoding, **kwargs)
+
+    def add(self, name, arcname=None, **kwargs):
+        """
+        Adds a file or directory to the context tarball, when it is generated.
+
+        :param name: File or directory path.
+        :type name: unicode | str
+        :param kwargs: Additional kwargs for :meth:`tarfile.TarFile.add`.
+        """
+        self.check_not_finalized()
+        self._operations.append((super(StreamingDockerContext, self).add, (name, arcname), kwargs))
+
+    def addfile(self, tarinfo, fileobj=None):
+        """
+        Adds a file to the tarball using a :class:`~tarfile.TarInfo` object, when it is generated. A file object
+        passed in is read from its current position at that point. For details, see :meth:`tarfile.TarFile.addfile`.
+
+        :param tarinfo: Tar info object.
+        :type tarinfo: tarfile.TarInfo
+        :param fileobj: File object to read the contents from.
+        """
+        self.check_not_finalized()
+        position = fileobj.tell() if fileobj is not None else None
+        self._operations.append((self._addfile_at, (tarinfo, fileobj, position), {}))
+
+    def _addfile_at(self, tarinfo, fileobj, position):
+        if fileobj is not None:
+            fileobj.seek(position)
+        super(StreamingDockerContext, self).addfile(tarinfo, fileobj)
+
+    def addarchive(self, name):
+        """
+        Adds the contents of another tarball to this one, when it is generated.
+
+        :param name: File path to the tar archive.
+        :type name: unicode | str
+        """
+        self.check_not_finalized()
+        self._operations.append((super(StreamingDockerContext, self).addarchive, (name, ), {}))
+
+    def finalize(self):
+        """
+        Marks the context as finalized. No further contents can be added.
+        """
+        self._finalized = True
+
+    def _run_operations(self):
+        for func, args, kwargs in self._operations:
+            func(*args, **kwargs)
+
+    def get_content_hash(self):
+        """
+        Returns a hash of the contents of the context tarball, as generated by :class:`ContentHashTarFile`. This reads
+        all added contents without compressing them, so files are read once more when the context is sent. The
+        context is finalized.
+
+        :return: Hexadecimal SHA-256 hash.
+        :rtype: unicode | str
+        """
+        if self._content_hash is None:
+            self.finalize()
+            context_tarfile = self.tarfile
+            self.tarfile = hash_tarfile = ContentHashTarFile.open(mode='w|', fileobj=_NullWriter(),
+                                                                  encoding=context_tarfile.encoding,
+                                                                  format=context_tarfile.format)
+            hash_tarfile.normalization = self._normalization
+            try:
+                self._run_operations()
+                hash_tarfile.close()
+            finally:
+                self.tarfile = context_tarfile
+            self._content_hash = hash_tarfile.content_hash.hexdigest()
+        return self._content_hash
+
+    def _generate(self):
+        writer = self._fileobj
+        try:
+            self._run_operations()
+            self.tarfile.close()
+            writer.finish()
+        except _StreamCancelled:
+            pass
+        except Exception:
+            try:
+                writer.fail(sys.exc_info())
+            except _StreamCancelled:
+                pass
+
+    def __iter__(self):
+        if self._consumed:
+            raise ValueError("The context stream can only be read once.")
+        self._consumed = True
+        self.finalize()
+        writer = self._fileobj
+        self._thread = thread = threading.Thread(target=self._generate, name='dockermap-context')
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                item = writer.queue.get()
+                if item is None:
+                    break
+                elif isinstance(item, tuple):
+                    six.reraise(*item)
+                yield item
+        finally:
+            self.close()
+
+    @property
+    def fileobj(self):
+        """
+        Returns a generator of the context tarball contents, as it can be passed to :meth:`docker.client.Client.build`.
+
+        :return: Generator of byte strings.
+        :rtype: collections.Iterable[bytes]
+        """
+        return iter(self)
+
+    @property
+    def name(self):
+        """
+        The streamed context does not have a file name.
+
+        :return: ``None``
+        """
+        return None
+
+    def save(self, name):
+        """
+        Saves the entire Docker context tarball to a file.
+
+        :param name: File path to save the tarball into.
+        :type name: unicode | str
+        """
+        with open(name, 'wb+') as f:
+            for chunk in self:
+                f.write(chunk)
+
+    def close(self):
+        """
+        Stops generating the tarball, if it has been started.
+        """
+        self._fileobj.close()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
@@ -1,18 +1,45 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import hashlib
+import json
 import logging
 import sys
 
+from docker.errors import NotFound
 from requests import Timeout
 
-from ..build.context import DockerContext
+from ..build.context import DockerContext, StreamingDockerContext
 from ..dep import ImageDependentsResolver
 from ..exceptions import PartialResultsError
 from . import use_force_tag
 
 log = logging.getLogger(__name__)
 
+CONTEXT_HASH_LABEL = 'dockermap.context_hash'
+BUILD_HASH_ARGS = ('buildargs', 'container_limits', 'dockerfile', 'extra_hosts', 'isolation', 'labels',
+                   'network_mode', 'platform', 'pull', 'shmsize', 'squash', 'target')
+
+
+def get_build_hash(content_hash, build_kwargs):
+    """
+    Combines the content hash of a context with the build arguments that affect the resulting image, i.e. the ones
+    listed in ``BUILD_HASH_ARGS``. Arguments are serialized in a canonical form, so that their order does not matter.
+
+    :param content_hash: Content hash, as returned by :meth:`~.context.DockerContext.get_content_hash`.
+    :type content_hash: unicode | str
+    :param build_kwargs: Keyword arguments for :meth:`docker.client.Client.build`.
+    :type build_kwargs: dict
+    :return: Hexadecimal SHA-256 hash.
+    :rtype: unicode | str
+    """
+    build_args = {key: build_kwargs[key]
+                  for key in BUILD_HASH_ARGS
+                  if build_kwargs.get(key) is not None}
+    build_hash = hashlib.sha256(content_hash.encode('utf-8'))
+    build_hash.update(json.dumps(build_args, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return build_hash.hexdigest()
+
 
 def is_repo_image(image):
     """
@@ -121,21 +148,63 @@ class DockerUtilityMixin(object):
         """
         log.log(level, info, *args, **kwargs)
 
-    def build_from_context(self, ctx, tag, **kwargs):
+    def get_unchanged_image(self, tag, content_hash):
+        """
+        Checks whether an image exists with the given tag, that has been built from a context with the given content
+        hash.
+
+        :param tag: Image tag.
+        :type tag: unicode | str
+        :param content_hash: Hash of the contents and build arguments, as returned by :func:`get_build_hash`.
+        :type content_hash: unicode | str
+        :return: Short image id, if the image exists and has been built from the same contents; ``None`` otherwise.
+        :rtype: unicode | str | NoneType
+        """
+        try:
+            image = self.inspect_image(tag)
+        except NotFound:
+            return None
+        labels = (image.get('Config') or {}).get('Labels') or {}
+        if labels.get(CONTEXT_HASH_LABEL) != content_hash:
+            return None
+        image_id = image['Id']
+        if image_id.startswith('sha256:'):
+            image_id = image_id[7:]
+        return image_id[:12]
+
+    def build_from_context(self, ctx, tag, skip_unchanged=False, **kwargs):
         """
         Builds a docker image from the given docker context with a `Dockerfile` file object.
 
-        :param ctx: An instance of :class:`~.context.DockerContext`.
+        If ``skip_unchanged`` is set, a hash of the context contents and of the build arguments that affect the image
+        (e.g. ``buildargs``, ``target``, ``dockerfile``, and ``labels``) is stored in the image label
+        ``dockermap.context_hash``. If an image with the same tag and hash already exists, the context is not
+        uploaded, and the existing image id is returned. Changes of the base image are not detected.
+
+        :param ctx: An instance of :class:`~.context.DockerContext`. A
+          :class:`~.context.StreamingDockerContext` is generated during the upload.
         :type ctx: dockermap.build.context.DockerContext
         :param tag: New image tag.
         :type tag: unicode | str
+        :param skip_unchanged: Skip the build if the image has been built from the same contents before.
+        :type skip_unchanged: bool
         :param kwargs: See :meth:`docker.client.Client.build`.
         :return: New, generated image id or `None`.
         :rtype: unicode | str
         """
+        if skip_unchanged:
+            content_hash = get_build_hash(ctx.get_content_hash(), kwargs)
+            image_id = self.get_unchanged_image(tag, content_hash)
+            if image_id:
+                self.push_log("Image %s has been built from the same contents; skipping build.", logging.INFO, tag)
+                self.add_extra_tags(image_id, tag, kwargs.get('add_tags'), kwargs.get('add_latest_tag', False))
+                return image_id
+            labels = kwargs.get('labels')
+            kwargs['labels'] = labels = dict(labels) if labels else {}
+            labels[CONTEXT_HASH_LABEL] = content_hash
         return self.build(fileobj=ctx.fileobj, tag=tag, custom_context=True, encoding=ctx.stream_encoding, **kwargs)
 
-    def build_from_file(self, dockerfile, tag, **kwargs):
+    def build_from_file(self, dockerfile, tag, stream_context=False, compression='gz', reproducible=False, **kwargs):
         """
         Builds a docker image from the given :class:`~dockermap.build.dockerfile.DockerFile`. Use this as a shortcut to
         :meth:`build_from_context`, if no extra data is added to the context.
@@ -144,11 +213,20 @@ class DockerUtilityMixin(object):
         :type dockerfile: dockermap.build.dockerfile.DockerFile
         :param tag: New image tag.
         :type tag: unicode | str
-        :param kwargs: See :meth:`docker.client.Client.build`.
+        :param stream_context: Generate the context tarball during the upload, instead of writing it to a temporary
+          file first.
+        :type stream_context: bool
+        :param compression: Compression of the context tarball, as passed to :class:`~.context.DockerContext`. For
+          Docker daemons on the local host, ``none`` avoids the compression overhead.
+        :type compression: unicode | str
+        :param reproducible: Generate a reproducible context tarball, as described for :class:`~.context.DockerContext`.
+        :type reproducible: bool | dockermap.build.context.TarNormalization
+        :param kwargs: See :meth:`build_from_context` and :meth:`docker.client.Client.build`.
         :return: New, generated image id or ``None``.
         :rtype: unicode | str
         """
-        with DockerContext(dockerfile, finalize=True) as ctx:
+        context_class = StreamingDockerContext if stream_context else DockerContext
+        with context_class(dockerfile, compression=compression, reproducible=reproducible, finalize=True) as ctx:
             return self.build_from_context(ctx, tag, **kwargs)
 
     def cleanup_containers(self, include_initial=False, exclude=None, raise_on_error=False, list_only=False):
@@ -8,6 +8,13 @@ from six import iteritems, with_metaclass, python_2_unicode_compatible, text_typ
 from .utils import merge_list
 
 
+def _extend_unique(merged_list, merged_set, items):
+    merged_add = merged_set.add
+    merged_list.extend(item
+                       for item in items
+                       if item not in merged_set and not merged_add(item))
+
+
 class NotInitialized(object):
     """
     Utility class to locate nodes in the dependency tree where there is no cached dependency structure yet.
@@ -19,11 +26,12 @@ class CachedDependency(object):
     """
     Caching dependencies along the hierarchy.
     """
-    __slots__ = ['_parent', '_dependencies']
+    __slots__ = ['_parent', '_dependencies', '_level']
 
-    def __init__(self, parent, dependencies=NotInitialized):
+    def __init__(self, parent, dependencies=NotInitialized, level=NotInitialized):
         self._parent = parent
         self._dependencies = dependencies
+        self._level = level
 
     def __repr__(self):
         d = self._dependencies if self._dependencies is not NotInitialized else '<NotInitialized>'
@@ -52,6 +60,17 @@ class CachedDependency(object):
     def dependencies(self, value):
         self._dependencies = value
 
+    @property
+    def level(self):
+        """
+        Length of the longest dependency path from this node. Returns ``NotInitialized`` if not cached yet.
+        """
+        return self._level
+
+    @level.setter
+    def level(self, value):
+        self._level = value
+
 
 def _iterate_dependencies(items):
     if not items:
@@ -105,6 +124,92 @@ class BaseDependencyResolver(with_metaclass(ABCMeta, object)):
         """
         return []
 
+    def _resolve(self, item):
+        """
+        Resolves the dependencies of the given item. Instead of recursion, the dependency graph is traversed
+        depth-first on an explicit stack. Once all resolvable parents of a node have been resolved, its dependencies
+        are merged through :meth:`merge_dependency` and cached on the node, along with the dependency level. Therefore
+        every node is only merged once, also across multiple calls.
+
+        :param item: Node to start the dependency check with.
+        :return: Cached dependency entry of the item, or ``None`` if the item is not found.
+        :rtype: CachedDependency | NoneType
+        :raise CircularDependency: If any node depends on itself, directly or indirectly.
+        """
+        deps = self._deps
+        e = deps.get(item)
+        if e is None or e.dependencies is not NotInitialized:
+            return e
+        is_resolvable = self.is_resolvable
+        in_progress = {item}
+        stack = [(item, e, iter(e.parent))]
+        while stack:
+            node, node_e, parent_iter = stack[-1]
+            for parent_key in parent_iter:
+                if parent_key == node:
+                    raise CircularDependency(node, True)
+                if not is_resolvable(parent_key):
+                    continue
+                parent_e = deps.get(parent_key)
+                if parent_e is None or parent_e.dependencies is not NotInitialized:
+                    continue
+                if parent_key in in_progress:
+                    raise CircularDependency(parent_key)
+                in_progress.add(parent_key)
+                stack.append((parent_key, parent_e, iter(parent_e.parent)))
+                break
+            else:
+                stack.pop()
+                in_progress.discard(node)
+                node_e.dependencies = self.merge_dependency(node, self.get_dependencies, node_e.parent)
+                node_e.level = self._get_merged_level(node_e.parent)
+        return e
+
+    def merge_dependency(self, item, resolve_parent, parents):
+        """
+        Merge dependencies of element with further dependencies. First dependencies of resolvable parents are checked,
+        and then immediate dependencies of the current element are added to the list, but without duplicating any
+        entries. When this is called, all resolvable parents have already been resolved.
+
+        :param item: Item.
+        :param resolve_parent: Function to resolve parent dependencies.
+        :type resolve_parent: function
+        :param parents: Immediate dependencies of the item.
+        :type parents: collections.Iterable
+        :return: List of recursively resolved dependencies of this item.
+        :rtype: list
+        """
+        dep = []
+        merged = set()
+        for parent_key in parents:
+            if self.is_resolvable(parent_key):
+                _extend_unique(dep, merged, resolve_parent(parent_key))
+        _extend_unique(dep, merged, parents)
+        return dep
+
+    def _get_merged_level(self, parents):
+        deps = self._deps
+        level = 0
+        for parent_key in parents:
+            parent_e = deps.get(parent_key) if self.is_resolvable(parent_key) else None
+            if parent_e is None or parent_e.level is NotInitialized:
+                parent_level = 1
+            else:
+                parent_level = parent_e.level + 1
+            if parent_level > level:
+                level = parent_level
+        return level
+
+    def is_resolvable(self, item):
+        """
+        Determines whether dependencies of a parent node should be followed. By default, all nodes are resolved.
+
+        :param item: Parent node.
+        :return: ``True`` if the dependencies of the node should be merged into the result.
+        :rtype: bool
+        """
+        return True
+
     def get_dependencies(self, item):
         """
         Performs a dependency check on the given item.
@@ -112,16 +217,48 @@ class BaseDependencyResolver(with_metaclass(ABCMeta, object)):
         :param item: Node to start the dependency check with.
         :return: The result on merged dependencies down the hierarchy.
         """
-        def _get_sub_dependency(sub_item):
-            e = self._deps.get(sub_item)
-            if e is None:
-                return self.get_default()
+        e = self._resolve(item)
+        if e is None:
+            return self.get_default()
+        return e.dependencies
 
-            if e.dependencies is NotInitialized:
-                e.dependencies = self.merge_dependency(sub_item, _get_sub_dependency, e.parent)
-            return e.dependencies
+    def get_level(self, item):
+        """
+        Returns the length of the longest dependency path starting at the given item. Items without any dependencies
+        have a level of ``0``.
+
+        :param item: Node to start the dependency check with.
+        :return: Dependency level.
+        :rtype: int
+        """
+        e = self._resolve(item)
+        if e is None:
+            return 0
+        return e.level
 
-        return _get_sub_dependency(item)
+    def get_dependency_levels(self, item):
+        """
+        Performs a dependency check on the given item, and groups the result by the level of each dependency. Items on
+        each level only depend on items of lower levels; within each level, the order of
+        :meth:`get_dependencies` is retained.
+
+        :param item: Node to start the dependency check with.
+        :return: Lists of dependencies, starting with level ``0``.
+        :rtype: list[list]
+        """
+        deps = self._deps
+        levels = []
+        for dependency in self.get_dependencies(item):
+            # Levels of all resolved nodes have been cached along with the dependencies.
+            dep_e = deps.get(dependency) if self.is_resolvable(dependency) else None
+            if dep_e is None or dep_e.level is NotInitialized:
+                level = 0
+            else:
+                level = dep_e.level
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(dependency)
+        return levels
 
     def get(self, item):
         """
@@ -135,16 +272,70 @@ class BaseDependencyResolver(with_metaclass(ABCMeta, object)):
             return self.get_default()
         return e.parent
 
+    def get_resolved(self, items):
+        """
+        Resolves the given items, and returns their cached dependencies and levels, e.g. for storing them.
+
+        :param items: Nodes to resolve.
+        :type items: collections.Iterable
+        :return: Dictionary of nodes with a tuple of dependencies and level.
+        :rtype: dict
+        """
+        resolved = {}
+        for item in items:
+            e = self._resolve(item)
+            if e is not None:
+                resolved[item] = e.dependencies, e.level
+        return resolved
+
+    def set_resolved(self, resolved):
+        """
+        Sets previously resolved dependencies and levels of nodes, as returned by :meth:`get_resolved`. Dependencies
+        between nodes need to be added separately through :meth:`update`.
+
+        :param resolved: Dictionary of nodes with a tuple of dependencies and level.
+        :type resolved: dict
+        """
+        deps = self._deps
+        for item, (dependencies, level) in iteritems(resolved):
+            e = deps.get(item)
+            if e is not None:
+                e.dependencies = dependencies
+                e.level = level
+
+    def invalidate(self, items):
+        """
+        Resets cached nodes selectively: The given items and all nodes that have any of them on their dependency path.
+        Other nodes keep their cached dependencies.
+
+        :param items: Nodes that have been changed.
+        :type items: collections.Iterable
+        """
+        deps = self._deps
+        dependents = defaultdict(list)
+        for item, e in iteritems(deps):
+            for parent_key in e.parent:
+                dependents[parent_key].append(item)
+        stack = list(items)
+        visited = set(stack)
+        while stack:
+            node = stack.pop()
+            e = deps.get(node)
+            if e is not None:
+                e.dependencies = NotInitialized
+                e.level = NotInitialized
+            for dependent in dependents.get(node, ()):
+                if dependent not in visited:
+                    visited.add(dependent)
+                    stack.append(dependent)
+
     def reset(self):
         """
         Resets all cached nodes.
         """
         for value in self._deps.values():
             value.dependencies = NotInitialized
-
-    @abstractmethod
-    def merge_dependency(self, item, resolve_parent, parent):
-        pass
+            value.level = NotInitialized
 
     @abstractmethod
     def update(self, items):
@@ -156,30 +347,6 @@ class ImageDependentsResolver(BaseDependencyResolver):
         self._deps = defaultdict(lambda: CachedDependency([]))
         self.update(initial)
 
-    def merge_dependency(self, item, resolve_parent, parents):
-        """
-        Merge dependencies of element with further dependencies. First parent dependencies are checked, and then
-        immediate dependencies of the current element should be added to the list, but without duplicating any entries.
-
-        :param item: Item.
-        :param resolve_parent: Function to resolve parent dependencies.
-        :type resolve_parent: function
-        :type parents: collections.Iterable
-        :return: List of recursively resolved dependencies of this container.
-        :rtype: list
-        :raise CircularDependency: If the current element depends on one found deeper in the hierarchy.
-        """
-        dep = []
-        for parent_key in parents:
-            if item == parent_key:
-                raise CircularDependency(item, True)
-            parent_dep = resolve_parent(parent_key)
-            if item in parent_dep:
-                raise CircularDependency(item)
-            merge_list(dep, parent_dep)
-        merge_list(dep, parents)
-        return dep
-
     def update(self, items):
         """
         Updates the dependencies in the inverse relationship format, i.e. from an iterable or dict that is structured
@@ -215,6 +382,20 @@ class MultiForwardDependencyResolver(with_metaclass(ABCMeta, BaseDependencyResol
             dep = self._deps[item]
             merge_list(dep.parent, parents)
 
+    def remove(self, items):
+        """
+        Removes dependencies, i.e. the inverse of :meth:`update`. Note that this does not reset any cached nodes; use
+        :meth:`invalidate` for that.
+
+        :param items: Iterable or dictionary in the format `(dependent_item, dependencies)`.
+        :type items: collections.Iterable
+        """
+        for item, parents in _iterate_dependencies(items):
+            dep = self._deps.get(item)
+            if dep is not None:
+                removed = set(parents)
+                dep.parent = [p for p in dep.parent if p not in removed]
+
 
 class MultiReverseDependencyResolver(with_metaclass(ABCMeta, BaseDependencyResolver)):
     def __init__(self, initial=None):
@@ -234,3 +415,17 @@ class MultiReverseDependencyResolver(with_metaclass(ABCMeta, BaseDependencyResol
                 dep = self._deps[si]
                 if parent not in dep.parent:
                     dep.parent.append(parent)
+
+    def remove(self, items):
+        """
+        Removes dependencies, i.e. the inverse of :meth:`update`. Note that this does not reset any cached nodes; use
+        :meth:`invalidate` for that.
+
+        :param items: Iterable or dictionary in the format `(item, dependent_items)`.
+        :type items: collections.Iterable
+        """
+        for parent, sub_items in _iterate_dependencies(items):
+            for si in sub_items:
+                dep = self._deps.get(si)
+                if dep is not None and parent in dep.parent:
+                    dep.parent.remove(parent)
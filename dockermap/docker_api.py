@@ -9,7 +9,8 @@ CLIENT_FEATURES = [
     ('networks', '1.21'),
     ('volumes', '1.21'),
     ('container_update', '1.22'),
-    ('stop_signal', '1.21')
+    ('stop_signal', '1.21'),
+    ('labels', '1.23'),
 ]
 CLIENT_CONSTRAINTS = [
     ('mem_limit', 'MemoryLimit'),
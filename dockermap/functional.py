@@ -2,6 +2,8 @@
 from __future__ import unicode_literals
 
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+import threading
 
 from six import iteritems, text_type, with_metaclass, python_2_unicode_compatible
 
@@ -151,9 +153,6 @@ lazy_type = AbstractLazyObject
 lazy = SimpleLazyObject
 lazy_once = LazyOnceObject
 
-type_registry = {}
-
-
 def expand_type_name(type_):
     """
     Returns concatenated module and name of a type for identification.
@@ -166,10 +165,169 @@ def expand_type_name(type_):
     return '{0.__module__}.{0.__name__}'.format(type_)
 
 
+class TypeRegistry(dict):
+    """
+    Dictionary of type names (as returned by :func:`expand_type_name`) and functions for resolving them. Lookups by
+    type are cached, so that type names do not have to be generated on each resolution. The cache is cleared on every
+    change of the registry.
+    """
+    def __init__(self, *args, **kwargs):
+        super(TypeRegistry, self).__init__(*args, **kwargs)
+        self._type_cache = {}
+
+    def __setitem__(self, key, value):
+        super(TypeRegistry, self).__setitem__(key, value)
+        self._type_cache.clear()
+
+    def __delitem__(self, key):
+        super(TypeRegistry, self).__delitem__(key)
+        self._type_cache.clear()
+
+    def update(self, *args, **kwargs):
+        super(TypeRegistry, self).update(*args, **kwargs)
+        self._type_cache.clear()
+
+    def setdefault(self, key, default=None):
+        value = super(TypeRegistry, self).setdefault(key, default)
+        self._type_cache.clear()
+        return value
+
+    def pop(self, *args):
+        value = super(TypeRegistry, self).pop(*args)
+        self._type_cache.clear()
+        return value
+
+    def popitem(self):
+        item = super(TypeRegistry, self).popitem()
+        self._type_cache.clear()
+        return item
+
+    def clear(self):
+        super(TypeRegistry, self).clear()
+        self._type_cache.clear()
+
+    def copy(self):
+        return self.__class__(self)
+
+    def get_resolver(self, type_):
+        """
+        Returns the function registered for resolving the given type.
+
+        :param type_: Type.
+        :type type_: type
+        :return: Function for resolving the value; ``None`` if the type is not registered.
+        :rtype: function | NoneType
+        """
+        try:
+            return self._type_cache[type_]
+        except KeyError:
+            resolve_func = self._type_cache[type_] = self.get(expand_type_name(type_))
+            return resolve_func
+
+
+type_registry = TypeRegistry()
+
+
+class ResolutionScope(object):
+    """
+    Memoizes the results of lazy objects and registered types while it is active, so that each value is only resolved
+    once. Values are identified by object identity; they are referenced by the scope until it ends.
+    """
+    def __init__(self):
+        self._values = {}
+
+    def resolve(self, value, resolve_func):
+        """
+        Returns the resolved value from a previous call, or resolves it using ``resolve_func``.
+
+        :param value: Lazy object or instance of a registered type.
+        :param resolve_func: Function for resolving the value, accepting it as its only argument.
+        :type resolve_func: function
+        :return: Resolved value.
+        """
+        key = id(value)
+        try:
+            return self._values[key][1]
+        except KeyError:
+            pass
+        resolved = resolve_func(value)
+        # If another thread has resolved the same value meanwhile, its result is used consistently.
+        return self._values.setdefault(key, (value, resolved))[1]
+
+    def clear(self):
+        """
+        Discards all memoized values.
+        """
+        self._values.clear()
+
+
+_scope_local = threading.local()
+
+
+def get_resolution_scope():
+    """
+    Returns the resolution scope that is active in the current thread.
+
+    :return: Resolution scope, or ``None`` if none is active.
+    :rtype: ResolutionScope | NoneType
+    """
+    return getattr(_scope_local, 'scope', None)
+
+
+@contextmanager
+def resolution_scope(scope=None):
+    """
+    Context manager, within which :func:`resolve_value` resolves lazy objects and registered types only once. The scope
+    is only active in the current thread. Nested scopes share the outermost one, which memoizes the values until it is
+    exited. For sharing the values with other threads, e.g. workers of the same run, pass the scope on and activate it
+    there.
+
+    :param scope: Scope to activate in the current thread. By default, the active scope is used or a new one is
+     created.
+    :type scope: ResolutionScope
+    :return: The active resolution scope.
+    :rtype: ResolutionScope
+    """
+    previous = getattr(_scope_local, 'scope', None)
+    if scope is None:
+        scope = previous or ResolutionScope()
+    _scope_local.scope = scope
+    try:
+        yield scope
+    finally:
+        _scope_local.scope = previous
+
+
+def bind_resolution_scope(func):
+    """
+    Binds the resolution scope that is active in the current thread to a function, so that it can be used when the
+    function is called in another thread.
+
+    :param func: Function.
+    :type func: function
+    :return: Function that activates the current scope while it is running; ``func`` itself if no scope is active.
+    :rtype: function
+    """
+    scope = getattr(_scope_local, 'scope', None)
+    if scope is None:
+        return func
+
+    def _scoped_func(*args, **kwargs):
+        with resolution_scope(scope):
+            return func(*args, **kwargs)
+
+    return _scoped_func
+
+
+def _resolve_lazy(value):
+    return value.get()
+
+
 def resolve_value(value, types=type_registry):
     """
     Returns the actual value for the given object, if it is a late-resolving object type.
-    If not, the value itself is simply returned.
+    If not, the value itself is simply returned. Within a :func:`resolution_scope`, lazy objects and types from
+    :attr:`type_registry` are only resolved once.
 
     :param value: Lazy object, registered type in :attr:`type_registry`, or a simple value. In the
      latter case, the value is returned as-is.
@@ -179,10 +337,19 @@ def resolve_value(value, types=type_registry):
     if value is None:
         return None
     elif isinstance(value, lazy_type):
+        scope = getattr(_scope_local, 'scope', None)
+        if scope is not None:
+            return scope.resolve(value, _resolve_lazy)
         return value.get()
     elif types:
-        resolve_func = types.get(expand_type_name(type(value)))
+        if isinstance(types, TypeRegistry):
+            resolve_func = types.get_resolver(type(value))
+        else:
+            resolve_func = types.get(expand_type_name(type(value)))
         if resolve_func:
+            scope = getattr(_scope_local, 'scope', None)
+            if scope is not None and types is type_registry:
+                return scope.resolve(value, resolve_func)
             return resolve_func(value)
     return value
 
@@ -245,5 +412,4 @@ def uses_type_registry(value):
     :return: Whether the type of the given value is registered.
     :rtype: bool
     """
-    type_name = expand_type_name(type(value))
-    return type_name in type_registry
+    return type_registry.get_resolver(type(value)) is not None
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .client import MappingDockerClient
+
+_get_running_loop = getattr(asyncio, 'get_running_loop', None)
+
+
+class ThreadedAsyncMappingDockerClient(MappingDockerClient):
+    """
+    Variant of :class:`~dockermap.map.client.MappingDockerClient` for use in an :mod:`asyncio` event loop. Instead of
+    returning the results directly, :meth:`run_actions` and all methods based on it (e.g. :meth:`create`,
+    :meth:`startup`, or :meth:`update`) return an awaitable future.
+
+    This is a wrapper that offloads the blocking implementation to threads; it does not use asynchronous I/O. Actions
+    are performed by the regular runner classes in an executor, so that calls to the Docker API do not block the event
+    loop, and multiple actions can be pending at the same time. Each pending action occupies a thread of the executor.
+    The policy object and its caches are shared between threads. Concurrent actions should still not affect the same
+    configurations.
+
+    Besides the arguments of :class:`~dockermap.map.client.MappingDockerClient`, the following keyword arguments are
+    accepted:
+
+    :param loop: Event loop to attach the futures to. By default, the running event loop is used, i.e. the one that
+      :meth:`run_actions` is called from.
+    :type loop: asyncio.AbstractEventLoop
+    :param executor: Executor for running actions. By default, a thread pool is created.
+    :type executor: concurrent.futures.Executor
+    :param max_workers: Maximum number of threads of the default thread pool. Defaults to :attr:`max_workers`.
+    :type max_workers: int
+    """
+    max_workers = 8
+
+    def __init__(self, *args, **kwargs):
+        self._loop = kwargs.pop('loop', None)
+        executor = kwargs.pop('executor', None)
+        max_workers = kwargs.pop('max_workers', self.max_workers)
+        super(ThreadedAsyncMappingDockerClient, self).__init__(*args, **kwargs)
+        self._executor = executor or ThreadPoolExecutor(max_workers)
+
+    def run_actions(self, action_name, config_name, instances=None, map_name=None, **kwargs):
+        """
+        Same as :meth:`dockermap.map.client.MappingDockerClient.run_actions`, but returns a future of the results.
+
+        :param action_name: Action name.
+        :type action_name: unicode | str
+        :param config_name: Name(s) of container configuration(s) or MapConfigId tuple(s).
+        :type config_name: unicode | str | collections.Iterable[unicode | str] | dockermap.map.input.MapConfigId | collections.Iterable[dockermap.map.input.MapConfigId]
+        :param instances: Optional instance names, where applicable but not included in ``config_name``.
+        :type instances: unicode | str | collections.Iterable[unicode | str]
+        :param map_name: Optional map name, where not inlcuded in ``config_name``.
+        :param kwargs: Additional kwargs for state generation, action generation, runner, or the client action.
+        :return: Future of the client output of actions of the configurations.
+        :rtype: asyncio.Future
+        """
+        # Policy is initialized here, so that concurrent calls share the same instance.
+        self.get_policy()
+        run_func = partial(super(ThreadedAsyncMappingDockerClient, self).run_actions, action_name, config_name,
+                           instances=instances, map_name=map_name, **kwargs)
+        return self.loop.run_in_executor(self._executor, run_func)
+
+    def close(self):
+        """
+        Shuts down the executor, after all pending actions have been completed.
+        """
+        self._executor.shutdown()
+
+    @property
+    def loop(self):
+        """
+        Event loop that the futures are attached to. Unless set explicitly, this is the running event loop. Outside of
+        a running loop, and on Python versions before 3.7, the current event loop of the thread is returned.
+
+        :return: Event loop.
+        :rtype: asyncio.AbstractEventLoop
+        """
+        if self._loop is not None:
+            return self._loop
+        if _get_running_loop is not None:
+            try:
+                return _get_running_loop()
+            except RuntimeError:
+                pass
+        return asyncio.get_event_loop()
+
+    @property
+    def executor(self):
+        """
+        Executor for running actions.
+
+        :return: Executor.
+        :rtype: concurrent.futures.Executor
+        """
+        return self._executor
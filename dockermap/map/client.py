@@ -3,8 +3,14 @@ from __future__ import unicode_literals
 
 import logging
 import sys
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+import six
 
 from ..exceptions import PartialResultsError
+from ..functional import bind_resolution_scope, resolution_scope
+from ..utils import merge_list
 from .action import simple, script, update
 from .config.client import ClientConfiguration
 from .config.main import ContainerMap
@@ -29,6 +35,16 @@ def _set_forced_update_ids(kwargs, maps, default_map_name, default_instances):
         kwargs['force_update'] = set(config_ids)
 
 
+def _merge_client_results(client_results):
+    config_order = {}
+    for results in client_results:
+        for res in results:
+            config_order.setdefault(res.config_id, len(config_order))
+    merged_results = [res for results in client_results for res in results]
+    merged_results.sort(key=lambda res: config_order[res.config_id])
+    return merged_results
+
+
 class MappingDockerClient(object):
     """
     Reflects a :class:`~dockermap.map.config.main.ContainerMap` instance on a Docker client
@@ -41,7 +57,8 @@ class MappingDockerClient(object):
     ignored.
 
     Image names, container status, and dependencies are cached. In order to force a refresh, use :meth:`refresh_names`.
-    It is also cleared on every change of ``policy_class``.
+    It is also cleared on every change of ``policy_class``. If ``monitor_events`` is set, cached names are updated from
+    the event stream of each client instead (see :meth:`~dockermap.map.policy.base.BasePolicy.start_event_monitoring`).
 
     :param container_maps: :class:`~dockermap.map.config.main.ContainerMap` instance or a tuple or list of such
       instances along with an associated instance.
@@ -55,6 +72,8 @@ class MappingDockerClient(object):
     :type map_defaults: dict
     :param option_defaults: Default values to set for various state, action generator, and runner classes.
     :type option_defaults: dict
+    :param monitor_events: Keep cached names up-to-date by processing the event streams of the clients.
+    :type monitor_events: bool
     """
     configuration_class = ClientConfiguration
     policy_class = BasePolicy
@@ -74,7 +93,7 @@ class MappingDockerClient(object):
     runner_class = DockerClientRunner
 
     def __init__(self, container_maps=None, docker_client=None, clients=None,
-                 map_defaults=None, option_defaults=None):
+                 map_defaults=None, option_defaults=None, monitor_events=False):
         if container_maps:
             if isinstance(container_maps, ContainerMap):
                 self._default_map = container_maps.name
@@ -103,7 +122,9 @@ class MappingDockerClient(object):
             self._clients[self.policy_class.default_client_name] = default_client
         self._map_defaults = map_defaults or {}
         self._option_defaults = option_defaults or {}
+        self._monitor_events = monitor_events
         self._policy = None
+        self._policy_lock = threading.Lock()
 
     def get_policy(self):
         """
@@ -113,8 +134,14 @@ class MappingDockerClient(object):
         :rtype: dockermap.map.policy.base.BasePolicy
         """
         if not self._policy:
-            self._policy = self.policy_class(self._maps, self._clients,
-                                             self._map_defaults, self._option_defaults)
+            with self._policy_lock:
+                if not self._policy:
+                    policy = self.policy_class(self._maps, self._clients, self._map_defaults, self._option_defaults)
+                    if self._monitor_events:
+                        # Does not wait for the event streams; caches are listed from the clients until they are
+                        # connected.
+                        policy.start_event_monitoring(timeout=0)
+                    self._policy = policy
         return self._policy
 
     def get_state_generator(self, action_name, policy, kwargs):
@@ -179,6 +206,29 @@ class MappingDockerClient(object):
         :return: Resulting states of the configurations.
         :rtype: collections.Iterable[dockermap.map.state.ConfigState]
         """
+        state_generator, config_ids = self._get_state_input(action_name, config_name, instances, map_name, kwargs)
+        return state_generator.get_states(config_ids)
+
+    def get_state_waves(self, action_name, config_name, instances=None, map_name=None, **kwargs):
+        """
+        Same as :meth:`get_states`, but groups states into waves of configurations that are independent of each other.
+        States of each wave are generated when it is being iterated over.
+
+        :param action_name: Action name.
+        :type action_name: unicode | str
+        :param config_name: Name(s) of container configuration(s) or MapConfigId tuple(s).
+        :type config_name: unicode | str | collections.Iterable[unicode | str] | dockermap.map.input.InputConfigId | collections.Iterable[dockermap.map.input.InputConfigId]
+        :param instances: Optional instance names, where applicable but not included in ``config_name``.
+        :type instances: unicode | str | collections.Iterable[unicode | str]
+        :param map_name: Optional map name, where not inlcuded in ``config_name``.
+        :param kwargs: Additional kwargs for state generation, action generation, runner, or the client action.
+        :return: Resulting states of the configurations, in waves.
+        :rtype: collections.Iterable[collections.Iterable[dockermap.map.state.ConfigState]]
+        """
+        state_generator, config_ids = self._get_state_input(action_name, config_name, instances, map_name, kwargs)
+        return state_generator.get_state_waves(config_ids)
+
+    def _get_state_input(self, action_name, config_name, instances, map_name, kwargs):
         policy = self.get_policy()
         _set_forced_update_ids(kwargs, policy.container_maps, map_name or self._default_map, instances)
         state_generator = self.get_state_generator(action_name, policy, kwargs)
@@ -186,7 +236,7 @@ class MappingDockerClient(object):
         config_ids = get_map_config_ids(config_name, policy.container_maps, map_name or self._default_map,
                                         instances)
         log.debug("Generating states for configurations: %s", config_ids)
-        return state_generator.get_states(config_ids)
+        return state_generator, config_ids
 
     def get_actions(self, action_name, config_name, instances=None, map_name=None, **kwargs):
         """
@@ -214,12 +264,53 @@ class MappingDockerClient(object):
             else:
                 log.debug("No actions returned.")
 
+    def get_action_waves(self, action_name, config_name, instances=None, map_name=None, **kwargs):
+        """
+        Same as :meth:`get_actions`, but groups the actions into waves as returned by :meth:`get_state_waves`. Actions
+        of the following wave are only generated once the caller requests it, so that they can reflect the changes
+        made by actions of previous waves.
+
+        :param action_name: Action name.
+        :type action_name: unicode | str
+        :param config_name: Name(s) of container configuration(s) or MapConfigId tuple(s).
+        :type config_name: unicode | str | collections.Iterable[unicode | str] | dockermap.map.input.MapConfigId | collections.Iterable[dockermap.map.input.MapConfigId]
+        :param instances: Optional instance names, where applicable but not included in ``config_name``.
+        :type instances: unicode | str | collections.Iterable[unicode | str]
+        :param map_name: Optional map name, where not inlcuded in ``config_name``.
+        :param kwargs: Additional kwargs for state generation, action generation, runner, or the client action.
+        :return: Resulting actions of the configurations, with a list of action lists per wave.
+        :rtype: collections.Iterable[list[list[dockermap.map.action.ItemAction]]]
+        """
+        policy = self.get_policy()
+        action_generator = self.get_action_generator(action_name, policy, kwargs)
+        for wave in self.get_state_waves(action_name, config_name, instances=instances, map_name=map_name, **kwargs):
+            wave_actions = []
+            for state in wave:
+                log.debug("Evaluating state: %s.", state)
+                actions = action_generator.get_state_actions(state, **kwargs)
+                if actions:
+                    log.debug("Adding actions to wave: %s", actions)
+                    wave_actions.append(actions)
+                else:
+                    log.debug("No actions returned.")
+            if wave_actions:
+                yield wave_actions
+
     def run_actions(self, action_name, config_name, instances=None, map_name=None, **kwargs):
         """
         Runs the entire set of actions performed for the indicated action name. On any client failure this raises a
         :class:`~dockermap.map.exceptions.ActionRunnerException`, where partial results can be reviewed in the property
         ``results``, or :class:`~dockermap.exceptions.MiscInvocationError` if no particular action was performed.
 
+        If the runner option ``max_workers`` is set to more than ``1`` (e.g. through ``option_defaults`` or as a keyword
+        argument), configurations are grouped into waves along their dependencies, and actions of each wave are run
+        concurrently by :meth:`~dockermap.map.runner.AbstractRunner.run_action_wave`. If the runner option
+        ``parallel_clients`` is set to ``True`` and the configurations are deployed to multiple clients, each client is
+        processed in a separate thread. Actions are performed in the same order on each client, and the results are
+        merged in the order of configurations. If the runner option ``memoize_values`` is set to ``True``, lazy values
+        and registered types are resolved only once during the run (see
+        :func:`~dockermap.functional.resolution_scope`).
+
         :param action_name: Action name.
         :type action_name: unicode | str
         :param config_name: Name(s) of container configuration(s) or MapConfigId tuple(s).
@@ -232,17 +323,71 @@ class MappingDockerClient(object):
         :rtype: list[dockermap.map.runner.ActionOutput]
         """
         policy = self.get_policy()
-        results = []
         runner = self.get_runner(policy, kwargs)
-        for action_list in self.get_actions(action_name, config_name, instances, map_name, **kwargs):
+        if runner.memoize_values:
+            with resolution_scope():
+                return self._run_actions(policy, runner, action_name, config_name, instances, map_name, kwargs)
+        return self._run_actions(policy, runner, action_name, config_name, instances, map_name, kwargs)
+
+    def _run_actions(self, policy, runner, action_name, config_name, instances, map_name, kwargs):
+        if runner.parallel_clients:
+            client_names = self._get_client_names(policy, config_name, instances, map_name)
+            if len(client_names) > 1:
+                return self._run_client_actions(runner, client_names, action_name, config_name, instances, map_name,
+                                                kwargs)
+        results = []
+        self._run_action_lists(runner, results, action_name, config_name, instances, map_name, kwargs)
+        return results
+
+    def _run_action_lists(self, runner, results, action_name, config_name, instances, map_name, kwargs):
+        if runner.max_workers and runner.max_workers > 1:
+            log.debug("Running actions in waves with up to %s workers.", runner.max_workers)
+            action_lists = self.get_action_waves(action_name, config_name, instances, map_name, **kwargs)
+            run_func = runner.run_action_wave
+        else:
+            action_lists = self.get_actions(action_name, config_name, instances, map_name, **kwargs)
+            run_func = runner.run_actions
+        for action_list in action_lists:
             try:
-                for res in runner.run_actions(action_list):
+                for res in run_func(action_list):
                     results.append(res)
             except ActionException as ae:
                 raise ActionRunnerException.from_action_exception(ae, results)
             except:
                 exc_info = sys.exc_info()
                 raise PartialResultsError(exc_info, results)
+
+    def _get_client_names(self, policy, config_name, instances, map_name):
+        config_ids = get_map_config_ids(config_name, policy.container_maps, map_name or self._default_map, instances)
+        client_names = []
+        for c_map_name in sorted(set(config_id.map_name for config_id in config_ids)):
+            merge_list(client_names, policy.get_map_client_names(c_map_name))
+        return client_names
+
+    def _run_client_actions(self, runner, client_names, action_name, config_name, instances, map_name, kwargs):
+        def _run_client(client_name):
+            results = []
+            client_kwargs = kwargs.copy()
+            client_kwargs['client_names'] = [client_name]
+            try:
+                self._run_action_lists(runner, results, action_name, config_name, instances, map_name, client_kwargs)
+            except Exception:
+                return results, sys.exc_info()
+            return results, None
+
+        log.debug("Running actions on clients %s concurrently.", client_names)
+        with ThreadPoolExecutor(len(client_names)) as executor:
+            client_outputs = list(executor.map(bind_resolution_scope(_run_client), client_names))
+        results = _merge_client_results([client_results for client_results, __ in client_outputs])
+        for __, exc_info in client_outputs:
+            if exc_info:
+                exc = exc_info[1]
+                if isinstance(exc, ActionRunnerException):
+                    raise ActionRunnerException(exc.source_exception, exc.client_name, exc.config_id, exc.action_type,
+                                                results)
+                elif isinstance(exc, PartialResultsError):
+                    raise PartialResultsError(exc.source_exception, results)
+                six.reraise(*exc_info)
         return results
 
     def create(self, container, instances=None, map_name=None, **kwargs):
@@ -471,6 +616,8 @@ class MappingDockerClient(object):
         """
         Invalidates the policy name and status cache.
         """
+        if self._policy:
+            self._policy.stop_event_monitoring()
         self._policy = None
 
     def list_persistent_containers(self, map_name=None):
@@ -37,49 +37,98 @@ class ConfigurationProperty(namedtuple('ConfigurationProperty', ['attr_type', 'd
 CP = ConfigurationProperty
 
 
-def _get_property(prop_name, doc=None):
+class _NotInitialized(object):
+    """
+    Placeholder for properties with a mutable default value, which has not been generated yet.
+    """
+    def __repr__(self):
+        return '<NotInitialized>'
+
+    def __reduce__(self):
+        # Placeholder remains a singleton after unpickling.
+        return '_NOT_INITIALIZED'
+
+
+_NOT_INITIALIZED = _NotInitialized()
+
+
+def _get_property(index, default_factory, doc=None):
+    mask = 1 << index
+
     def get_item(self):
-        return self._config[prop_name]
+        value = self._values[index]
+        if value is _NOT_INITIALIZED:
+            self._values[index] = value = default_factory()
+        elif self._shared & mask:
+            # Values shared with another object may be changed in-place by the caller.
+            value = self._get_own_value(index)
+        return value
 
     def set_item(self, value):
-        self._modified.add(prop_name)
-        self._config[prop_name] = value
+        self._modified |= mask
+        self._shared &= ~mask
+        self._values[index] = value
 
     return property(get_item, set_item, doc=doc)
 
 
 class ConfigurationMeta(type):
+    """
+    Generates the storage layout of configuration classes: Values of all properties are stored in a list, indexed by
+    the order of properties. Immutable default values are shared between all instances; mutable defaults (e.g. lists
+    and dictionaries) are only generated when the property is accessed for the first time.
+    """
     def __new__(mcs, name, bases, dct):
         new_cls = super(ConfigurationMeta, mcs).__new__(mcs, name, bases, dct)
         attrs = sorted([(attr_name, config)
                        for attr_name, config in six.iteritems(dct)
                        if isinstance(config, ConfigurationProperty)],
                        key=lambda i: i[1]._field_order)
-        new_cls.CONFIG_PROPERTIES = OrderedDict(attrs)
+        all_props = OrderedDict()
+        for base in reversed(new_cls.__mro__[1:]):
+            all_props.update(getattr(base, 'CONFIG_PROPERTIES', ()))
+        all_props.update(attrs)
+        new_cls.CONFIG_PROPERTIES = all_props
+        new_cls.PROPERTY_INDEXES = {attr_name: index for index, attr_name in enumerate(all_props)}
+        new_cls._initial_values = initial_values = []
+        new_cls._default_factories = default_factories = []
         docstrings = new_cls.DOCSTRINGS
-        for attr_name, config in attrs:
+        for index, (attr_name, config) in enumerate(six.iteritems(all_props)):
+            default = config.default
+            if callable(default):
+                initial_values.append(_NOT_INITIALIZED)
+                default_factories.append(default)
+            else:
+                initial_values.append(default)
+                default_factories.append(None)
             doc = docstrings.get(attr_name)
-            setattr(new_cls, attr_name, _get_property(attr_name, doc))
+            setattr(new_cls, attr_name, _get_property(index, default, doc))
         return new_cls
 
 
 class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
+    """
+    Base class for configuration objects. Subclasses declare their properties as :class:`ConfigurationProperty`
+    attributes. Subclasses that do not set any further instance attributes should declare empty ``__slots__``, so that
+    instances do not need a ``__dict__``.
+    """
+    __slots__ = ('_values', '_modified', '_shared')
     DOCSTRINGS = {}
 
     def __init__(self, values=None, **kwargs):
-        all_props = self.__class__.CONFIG_PROPERTIES
-        self._config = {
-            attr_name: attr_config.default() if callable(attr_config.default) else attr_config.default
-            for attr_name, attr_config in six.iteritems(all_props)
-        }
-        self._modified = set()
+        self._values = list(self._initial_values)
+        self._modified = 0
+        self._shared = 0
         if values:
             self.update(values, copy_instance=True)
         if kwargs:
             self.update_from_dict(kwargs)
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self._config == other._config
+        if not isinstance(other, self.__class__):
+            return False
+        return all(self._get_value(index) == other._get_value(index)
+                   for index in range(len(self._values)))
 
     def __repr__(self):
         if not self._modified:
@@ -87,9 +136,40 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
         else:
             status = '(Modified) '
         props = ', '.join('{0}={1!r}'.format(key, value)
-                          for key, value in six.iteritems(self._config))
+                          for key, value in self._iter_values())
         return '<{0}({1}{2})>'.format(self.__class__.__name__, status, props)
 
+    def _get_value(self, index):
+        value = self._values[index]
+        if value is _NOT_INITIALIZED:
+            self._values[index] = value = self._default_factories[index]()
+        return value
+
+    def _iter_values(self):
+        for index, attr_name in enumerate(self.__class__.CONFIG_PROPERTIES):
+            yield attr_name, self._get_value(index)
+
+    def _iter_modified(self):
+        modified = self._modified
+        index = 0
+        while modified:
+            if modified & 1:
+                yield index
+            modified >>= 1
+            index += 1
+
+    def get_value(self, name):
+        """
+        Returns the current value of a property for reading. Unlike accessing the property, a list or dictionary that is
+        shared with another configuration object is not copied. The returned value must therefore not be modified
+        in-place.
+
+        :param name: Property name.
+        :type name: unicode | str
+        :return: Property value.
+        """
+        return self._get_value(self.__class__.PROPERTY_INDEXES[name])
+
     def update_default_from_dict(self, key, value):
         """
         When updating from a dictionary, this is processed for any key that does not match a ``ConfigurationProperty``.
@@ -113,29 +193,44 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
         """
         pass
 
-    def _merge_value(self, attr_type, merge_func, key, value):
-        get_current = self._config.get
+    def _get_own_value(self, index):
+        current = self._get_value(index)
+        mask = 1 << index
+        if current and self._shared & mask:
+            # Copy-on-write: Values shared with another object are copied before they are modified.
+            self._values[index] = current = current.copy() if isinstance(current, dict) else current[:]
+            self._shared &= ~mask
+        return current
+
+    def _merge_value(self, attr_type, merge_func, index, value, copy=True):
+        get_current = self._get_own_value
         if attr_type:
             if issubclass(attr_type, list):
                 if value and merge_func:
-                    current = get_current(key)
+                    current = get_current(index)
                     if current:
                         merge_func(current, value)
+                    elif copy:
+                        self._values[index] = value[:]
                     else:
-                        self._config[key] = value[:]
+                        self._values[index] = value
+                        self._shared |= 1 << index
             elif attr_type is dict:
                 if value:
-                    current = get_current(key)
+                    current = get_current(index)
                     if merge_func and current:
                         merge_func(current, value)
                     elif current:
                         current.update(value)
+                    elif copy:
+                        self._values[index] = value.copy()
                     else:
-                        self._config[key] = value.copy()
+                        self._values[index] = value
+                        self._shared |= 1 << index
         elif merge_func and value:
-            self._config[key] = merge_func(get_current(key), value)
+            self._values[index] = merge_func(self._get_value(index), value)
         else:
-            self._config[key] = value
+            self._values[index] = value
 
     def update_from_dict(self, dct):
         """
@@ -168,27 +263,25 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
         :type copy: bool
         """
         obj.clean()
-        obj_config = obj._config
-        all_props = self.__class__.CONFIG_PROPERTIES
-        if copy:
-            for key, value in six.iteritems(obj_config):
-                attr_config = all_props.get(key)
-                if attr_config:
-                    attr_type = attr_config.attr_type
-                    if attr_type:
-                        if issubclass(attr_type, list):
-                            self._config[key] = value[:]
-                        elif attr_type is dict:
-                            self._config[key] = value.copy()
-                    else:
-                        self._config[key] = value
-                    self._modified.discard(key)
-        else:
-            filtered_dict = {key: value
-                             for key, value in six.iteritems(obj_config)
-                             if key in all_props}
-            self._config.update(filtered_dict)
-            self._modified.difference_update(filtered_dict.keys())
+        obj_values = obj._values
+        obj_indexes = obj.__class__.PROPERTY_INDEXES
+        values = self._values
+        for index, (key, attr_config) in enumerate(six.iteritems(self.__class__.CONFIG_PROPERTIES)):
+            obj_index = obj_indexes.get(key)
+            if obj_index is None:
+                continue
+            value = obj_values[obj_index]
+            if copy and value is not _NOT_INITIALIZED:
+                attr_type = attr_config.attr_type
+                if attr_type:
+                    if issubclass(attr_type, list):
+                        value = value[:]
+                    elif attr_type is dict:
+                        value = value.copy()
+            values[index] = value
+            mask = ~(1 << index)
+            self._modified &= mask
+            self._shared &= mask
 
     def merge_from_dict(self, dct, lists_only=False):
         """
@@ -205,6 +298,7 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
             return
         self.clean()
         all_props = self.__class__.CONFIG_PROPERTIES
+        indexes = self.__class__.PROPERTY_INDEXES
         for key, value in six.iteritems(dct):
             attr_config = all_props.get(key)
             if attr_config:
@@ -213,11 +307,11 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
                         (not lists_only or (attr_type and issubclass(attr_type, list)))):
                     if input_func:
                         value = input_func(value)
-                    self._merge_value(attr_type, merge_func, key, value)
+                    self._merge_value(attr_type, merge_func, indexes[key], value)
             else:
                 self.merge_default_from_dict(key, value, lists_only=lists_only)
 
-    def merge_from_obj(self, obj, lists_only=False):
+    def merge_from_obj(self, obj, lists_only=False, copy=True):
         """
         Merges a configuration object into this one.
 
@@ -227,17 +321,27 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
         :type obj: ConfigurationObject
         :param lists_only: Ignore single-value attributes and update dictionary options.
         :type lists_only: bool
+        :param copy: Copies lists and dictionaries, where they are not merged with existing values. If set to
+          ``False``, they are shared with ``obj`` until they are accessed through a property, merged with further
+          values, or replaced; then either object copies the value first (copy-on-write).
+        :type copy: bool
         """
         self.clean()
         obj.clean()
-        obj_config = obj._config
-        all_props = self.__class__.CONFIG_PROPERTIES
-        for key, value in six.iteritems(obj_config):
-            attr_config = all_props[key]
+        obj_values = obj._values
+        indexes = self.__class__.PROPERTY_INDEXES
+        for obj_index, (key, attr_config) in enumerate(six.iteritems(obj.__class__.CONFIG_PROPERTIES)):
+            value = obj_values[obj_index]
+            if value is _NOT_INITIALIZED:
+                # Default value, which has not been changed.
+                continue
             attr_type, default, __, merge_func = attr_config[:4]
             if (merge_func is not False and value != default and
                     (not lists_only or (attr_type and issubclass(attr_type, list)))):
-                self._merge_value(attr_type, merge_func, key, value)
+                index = indexes[key]
+                self._merge_value(attr_type, merge_func, index, value, copy=copy)
+                if not copy and self._values[index] is value:
+                    obj._shared |= 1 << obj_index
 
     def update(self, values, copy_instance=False):
         """
@@ -299,12 +403,14 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
         format needed by functions using them. For example, for list-like values it means that input of single strings
         is transformed into a single-entry list. If this conversion fails, a ``ValueError`` is raised.
         """
-        all_props = self.__class__.CONFIG_PROPERTIES
-        for prop_name in self._modified:
-            attr_config = all_props.get(prop_name)
-            if attr_config and attr_config.input_func:
-                self._config[prop_name] = attr_config.input_func(self._config[prop_name])
-        self._modified.clear()
+        if not self._modified:
+            return
+        all_props = list(six.itervalues(self.__class__.CONFIG_PROPERTIES))
+        for index in self._iter_modified():
+            input_func = all_props[index].input_func
+            if input_func:
+                self._values[index] = input_func(self._get_value(index))
+        self._modified = 0
 
     @property
     def is_clean(self):
@@ -327,8 +433,8 @@ class ConfigurationObject(six.with_metaclass(ConfigurationMeta)):
         self.clean()
         d = OrderedDict()
         all_props = self.__class__.CONFIG_PROPERTIES
-        for attr_name, attr_config in six.iteritems(all_props):
-            value = self._config[attr_name]
+        for index, (attr_name, attr_config) in enumerate(six.iteritems(all_props)):
+            value = self._get_value(index)
             attr_type = attr_config.attr_type
             if attr_type:
                 if value:
@@ -5,7 +5,8 @@ from collections import OrderedDict
 
 from . import ConfigurationObject, CP
 from ..input import (SharedHostVolumesList, AttachedVolumeList, UsedVolumeList, ContainerLinkList, PortBindingList,
-                     NetworkEndpointList, ExecCommandList, get_network_mode, bool_if_set, get_healthcheck)
+                     NetworkEndpointList, ExecCommandList, get_network_mode, bool_if_set, get_healthcheck,
+                     get_ready_check)
 
 
 def _merge_first(current, update_list):
@@ -23,6 +24,8 @@ class ContainerConfiguration(ConfigurationObject):
     """
     Class to maintain resources that are associated with a container.
     """
+    __slots__ = ()
+
     abstract = CP(default=False, input_func=bool, merge_func=False)
     extends = CP(list, merge_func=False)
     image = CP()
@@ -39,6 +42,7 @@ class ContainerConfiguration(ConfigurationObject):
     stop_timeout = CP()
     stop_signal = CP()
     start_delay = CP()
+    ready_check = CP(input_func=get_ready_check)
     network_mode = CP(input_func=get_network_mode)
     networks = CP(NetworkEndpointList, merge_func=_merge_first)
     exec_commands = CP(ExecCommandList)
@@ -101,6 +105,13 @@ class ContainerConfiguration(ConfigurationObject):
                        "the best signal to get the main process to shut down properly. This property can for example "
                        "be set to ``SIGINT``, where more appropriate.",
         'start_delay': "Delay in seconds to insert after a container start.",
+        'ready_check': "Waits after a container start until the container is ready, before dependent containers are "
+                       "started. Can be set to ``healthcheck`` for waiting on the container's health status, a port "
+                       "number (or ``tcp:port``) for waiting on a connection to the container, or a callable with the "
+                       "arguments client and container name, returning ``True`` when ready. Can also be passed as a "
+                       "tuple or dictionary with the elements ``probe``, ``timeout`` (default 60 seconds), "
+                       "``interval`` (initial polling interval), and ``max_interval`` (maximum interval on backoff). "
+                       "Replaces ``start_delay`` if set.",
         'network_mode': "Networking to apply to this container. If not ``bridge`` or ``host`` (as described in the "
                         "docker-py docs), tries to locate a container configuration on this map. Prefixed with ``/`` "
                         "assumes the full container name. Setting it to ``disabled`` deactivates networking for the "
@@ -88,7 +88,7 @@ class ContainerMap(ConfigurationObject):
         else:
             status = ''
         props = [('name', self._name)]
-        props.extend(six.iteritems(self._config))
+        props.extend(self._iter_values())
         props.extend((
             ('containers', self._containers),
             ('networks', self._networks),
@@ -186,10 +186,10 @@ class ContainerMap(ConfigurationObject):
         """
         attached_items = [(container, ac)
                           for container, config in self
-                          for ac in config.attaches]
+                          for ac in config.get_value('attaches')]
         persistent_containers = [(container, ci)
                                  for container, config in self if config.persistent
-                                 for ci in config.instances or [None]]
+                                 for ci in config.get_value('instances') or [None]]
         return attached_items, persistent_containers
 
     @property
@@ -356,7 +356,7 @@ class ContainerMap(ConfigurationObject):
             volume_config_name, __, volume_instance = u.name.partition('.')
             attaching_config = ext_map.get_existing(volume_config_name)
             attaching_instances = instances.get(volume_config_name)
-            config_volumes = {a.name for a in attaching_config.attaches}
+            config_volumes = {a.name for a in attaching_config.get_value('attaches')}
             if not volume_instance or volume_instance in config_volumes:
                 used_instances = attaching_instances
             else:
@@ -377,10 +377,10 @@ class ContainerMap(ConfigurationObject):
             net_config_name, net_instance = n
             network_ref_config = ext_map.get_existing(net_config_name)
             if network_ref_config:
-                if net_instance and net_instance in network_ref_config.instances:
+                if net_instance and net_instance in network_ref_config.get_value('instances'):
                     network_instances = (net_instance, )
                 else:
-                    network_instances = network_ref_config.instances or (None, )
+                    network_instances = network_ref_config.get_value('instances') or (None, )
                 return [MapConfigId(ItemType.CONTAINER, self._name, net_config_name, ni)
                         for ni in network_instances]
             return []
@@ -398,12 +398,12 @@ class ContainerMap(ConfigurationObject):
         else:
             ext_map = self.get_extended_map()
 
-        instances = {c_name: c_config.instances
+        instances = {c_name: c_config.get_value('instances')
                      for c_name, c_config in ext_map}
         if not self.use_attached_parent_name:
             attaching = {attaches.name: c_name
                          for c_name, c_config in ext_map
-                         for attaches in c_config.attaches}
+                         for attaches in c_config.get_value('attaches')}
             used_func = _get_used_items_np
         else:
             used_func = _get_used_items_ap
@@ -414,17 +414,18 @@ class ContainerMap(ConfigurationObject):
             nw = config.network_mode
             if isinstance(nw, tuple):
                 merge_list(d, _get_network_mode_items(nw))
-            merge_list(d, itertools.chain.from_iterable(map(_get_network_items, config.networks)))
-            merge_list(d, itertools.chain.from_iterable(map(used_func, config.uses)))
-            merge_list(d, itertools.chain.from_iterable(_get_linked_items(l.container) for l in config.links))
+            merge_list(d, itertools.chain.from_iterable(map(_get_network_items, config.get_value('networks'))))
+            merge_list(d, itertools.chain.from_iterable(map(used_func, config.get_value('uses'))))
+            merge_list(d, itertools.chain.from_iterable(_get_linked_items(l.container)
+                                                        for l in config.get_value('links')))
             d.extend(MapConfigId(ItemType.VOLUME, self._name, name, a.name)
-                     for a in config.attaches)
+                     for a in config.get_value('attaches'))
             d.append(MapConfigId(ItemType.IMAGE, self._name, image, tag))
             return d
 
         for c_name, c_config in ext_map:
             dep_list = _get_dep_list(c_name, c_config)
-            for c_instance in c_config.instances or (None, ):
+            for c_instance in c_config.get_value('instances') or (None, ):
                 yield MapConfigId(ItemType.CONTAINER, self._name, c_name, c_instance), dep_list
 
     def get(self, item):
@@ -499,30 +500,39 @@ class ContainerMap(ConfigurationObject):
         """
         return self._volumes.get(name)
 
+    def _get_extended(self, config, extended_configs):
+        if not config.get_value('extends') or self._extended:
+            return config
+        extended_config = ContainerConfiguration()
+        for ext_name in config.get_value('extends'):
+            ext_cfg = extended_configs.get(ext_name)
+            if ext_cfg is None:
+                ext_cfg_base = self._containers.get(ext_name)
+                if not ext_cfg_base:
+                    raise KeyError(ext_name)
+                extended_configs[ext_name] = ext_cfg = self._get_extended(ext_cfg_base, extended_configs)
+            extended_config.merge_from_obj(ext_cfg, copy=False)
+        extended_config.merge_from_obj(config, copy=False)
+        return extended_config
+
     def get_extended(self, config):
         """
         Generates a configuration that includes all inherited values.
 
+        Lists and dictionaries are only copied where they are merged from multiple configurations. Otherwise they are
+        shared with the inherited configuration, until they are merged or replaced (copy-on-write).
+
         :param config: Container configuration.
         :type config: ContainerConfiguration
         :return: A merged (shallow) copy of all inherited configurations merged with the container configuration.
         :rtype: ContainerConfiguration
         """
-        if not config.extends or self._extended:
-            return config
-        extended_config = ContainerConfiguration()
-        for ext_name in config.extends:
-            ext_cfg_base = self._containers.get(ext_name)
-            if not ext_cfg_base:
-                raise KeyError(ext_name)
-            ext_cfg = self.get_extended(ext_cfg_base)
-            extended_config.merge_from_obj(ext_cfg)
-        extended_config.merge_from_obj(config)
-        return extended_config
+        return self._get_extended(config, {})
 
     def get_extended_map(self, defaults=None):
         """
-        Creates a copy of this map which includes all non-abstract configurations in their extended form.
+        Creates a copy of this map which includes all non-abstract configurations in their extended form. Inherited
+        configurations are extended only once, and shared between the configurations extending them.
 
         :param defaults: Optional default map properties.
         :type defaults: dict
@@ -533,8 +543,12 @@ class ContainerMap(ConfigurationObject):
         if defaults:
             map_copy.update_from_dict(defaults)
         map_copy.update_from_obj(self, copy=True, update_containers=False)
+        extended_configs = {}
         for c_name, c_config in self:
-            map_copy._containers[c_name] = self.get_extended(c_config)
+            ext_config = extended_configs.get(c_name)
+            if ext_config is None:
+                extended_configs[c_name] = ext_config = self._get_extended(c_config, extended_configs)
+            map_copy._containers[c_name] = ext_config
         map_copy._extended = True
         return map_copy
 
@@ -557,15 +571,19 @@ class ContainerMap(ConfigurationObject):
             return [c_name]
 
         def _get_container_items(c_name, c_config):
-            instance_names = _get_instance_names(c_name, c_config.instances)
+            instance_names = _get_instance_names(c_name, c_config.get_value('instances'))
             group_ref_names = instance_names[:]
-            if c_config.instances:
+            if c_config.get_value('instances'):
                 group_ref_names.append(c_name)
-            shared = instance_names[:] if c_config.shares or c_config.binds or c_config.uses else []
-            bind = [b.name for b in c_config.binds if isinstance(b, SharedVolume)]
-            link = [l.container for l in c_config.links]
-            uses = [u.name for u in c_config.uses]
-            networks = [n.network_name for n in c_config.networks if n.network_name not in DEFAULT_PRESET_NETWORKS]
+            if c_config.get_value('shares') or c_config.get_value('binds') or c_config.get_value('uses'):
+                shared = instance_names[:]
+            else:
+                shared = []
+            bind = [b.name for b in c_config.get_value('binds') if isinstance(b, SharedVolume)]
+            link = [l.container for l in c_config.get_value('links')]
+            uses = [u.name for u in c_config.get_value('uses')]
+            networks = [n.network_name for n in c_config.get_value('networks')
+                        if n.network_name not in DEFAULT_PRESET_NETWORKS]
             network_mode = c_config.network_mode
             if isinstance(network_mode, tuple):
                 if network_mode[1]:
@@ -575,10 +593,10 @@ class ContainerMap(ConfigurationObject):
             else:
                 net_containers = []
             if self.use_attached_parent_name:
-                attaches = [(c_name, a.name) for a in c_config.attaches]
+                attaches = [(c_name, a.name) for a in c_config.get_value('attaches')]
             else:
-                attaches = [a.name for a in c_config.attaches]
-            attaches_with_path = [a.name for a in c_config.attaches
+                attaches = [a.name for a in c_config.get_value('attaches')]
+            attaches_with_path = [a.name for a in c_config.get_value('attaches')
                                   if isinstance(a, UsedVolume)]
             return (instance_names, group_ref_names, uses, attaches, attaches_with_path, shared, bind, link, networks,
                     net_containers)
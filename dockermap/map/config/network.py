@@ -9,6 +9,8 @@ class NetworkConfiguration(ConfigurationObject):
     """
     Configuration class for networks.
     """
+    __slots__ = ()
+
     driver = CP(default='bridge')
     driver_options = CP(dict)
     internal = CP(default=False, input_func=bool_if_set)
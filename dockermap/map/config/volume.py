@@ -13,6 +13,8 @@ class VolumeConfiguration(ConfigurationObject):
     """
     Configuration class for networks.
     """
+    __slots__ = ()
+
     default_path = CP()
     driver = CP(default='local')
     driver_options = CP(dict)
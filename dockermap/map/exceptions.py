@@ -130,3 +130,11 @@ class ScriptRunException(Exception):
 
 class ScriptActionException(Exception):
     pass
+
+
+class ContainerNotReadyError(Exception):
+    """
+    Exception for cases where a container did not become ready after its start, e.g. because its healthcheck failed or
+    it did not respond before the deadline.
+    """
+    pass
@@ -64,6 +64,9 @@ class _NotSet(object):
     def __eq__(self, other):
         return isinstance(other, self.__class__)
 
+    def __reduce__(self):
+        return 'NotSet'
+
 
 NotSet = _NotSet()
 
@@ -115,6 +118,12 @@ def _get_nanoseconds(value):
     raise ValueError("Invalid unit.", unit)
 
 
+def _get_seconds(value):
+    if isinstance(value, six.string_types):
+        return _get_nanoseconds(value) / 1000000000.0
+    return value
+
+
 class NetworkEndpoint(namedtuple('NetworkEndpoint', ('network_name', 'aliases', 'links', 'ipv4_address', 'ipv6_address',
                                                      'link_local_ips'))):
     def __new__(cls, network_name, aliases=None, links=None, ipv4_address=None, ipv6_address=None, link_local_ips=None):
@@ -176,6 +185,17 @@ class HealthCheck(namedtuple('HealthCheck', ('test', 'interval', 'timeout', 'ret
                 if v or k == 'test'}
 
 
+class ReadyCheck(namedtuple('ReadyCheck', ('probe', 'timeout', 'interval', 'max_interval'))):
+    def __new__(cls, probe='healthcheck', timeout=60, interval=0.1, max_interval=2):
+        if isinstance(probe, six.string_types):
+            if probe.startswith('tcp:'):
+                probe = int(probe[4:])
+            elif probe.isdigit():
+                probe = int(probe)
+        return super(ReadyCheck, cls).__new__(cls, probe, _get_seconds(timeout), _get_seconds(interval),
+                                              _get_seconds(max_interval))
+
+
 def _get_listed_tuples(value, element_type, conversion_func, **kwargs):
     if value is None:
         return []
@@ -384,6 +404,29 @@ def get_healthcheck(value):
         "Invalid type; expected a list, tuple, dict, or string type, found {0}.".format(type(value).__name__))
 
 
+def get_ready_check(value):
+    """
+    Converts input into a :class:`ReadyCheck` tuple. Input can be passed as a single probe (string, port number, or
+    callable), tuple, list, or a dictionary. Times can be passed in seconds or as string with a unit, e.g. ``30s``.
+
+    :param value: Readiness check input.
+    :type value: unicode | str | int | tuple | list | dict | callable | NoneType
+    :return: ReadyCheck tuple
+    :rtype: ReadyCheck
+    """
+    if value is None or isinstance(value, ReadyCheck):
+        return value
+    elif isinstance(value, (tuple, list)):
+        return ReadyCheck(*value)
+    elif isinstance(value, dict):
+        return ReadyCheck(**value)
+    elif isinstance(value, six.string_types + six.integer_types) or callable(value):
+        return ReadyCheck(value)
+    raise ValueError(
+        "Invalid type; expected a list, tuple, dict, string, int, or callable type, found {0}.".format(
+            type(value).__name__))
+
+
 class SharedHostVolumesList(NamedTupleList):
     """
     Converts a single value, a list or tuple, or a dictionary into a list of SharedVolume or HostVolume tuples for
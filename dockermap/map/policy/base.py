@@ -1,14 +1,22 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import itertools
 import logging
+import threading
+from collections import defaultdict
+from functools import partial
 
 from six import iteritems, itervalues
 
 from ... import DEFAULT_COREIMAGE, DEFAULT_BASEIMAGE, DEFAULT_HOSTNAME_REPLACEMENT, DEFAULT_PRESET_NETWORKS
-from ..input import UsedVolume
+from ..config.container import ContainerConfiguration
+from ..input import ItemType, UsedVolume
 from .cache import ContainerCache, ImageCache, NetworkCache, VolumeCache
-from .dep import ContainerDependencyResolver, ContainerDependentsResolver
+from .dep import ContainerDependencyResolver, ContainerDependentsResolver, DependencyGraphCache
+from .events import CacheEventMonitor
+from ...utils import merge_list
+from .utils import LazyMapDict
 
 log = logging.getLogger(__name__)
 
@@ -21,72 +29,239 @@ class BasePolicy(object):
     :type container_maps: dict[unicode | str, dockermap.map.config.main.ContainerMap]
     :param clients: Dictionary of clients.
     :type clients: dict[unicode | str, dockermap.map.config.client.ClientConfiguration]
+
+    Containers, networks, and volumes are labeled with their map, configuration, and instance name on creation (see
+    :meth:`get_labels`). If ``label_filters`` is set to ``True`` (e.g. through ``option_defaults``), only labeled
+    objects are listed from the clients. Images are then also filtered by the repositories used in the maps, which are
+    collected when images are listed for the first time. Objects created by earlier versions, without labels, are not
+    considered at all in that case.
+
+    Maps are extended, and their dependencies and volume tables are generated, only when a map is accessed for the first
+    time. Actions on a single map therefore do not depend on the size of all other maps.
+
+    If ``dependency_cache_dir`` is set, dependencies of the maps are stored in that directory, and loaded from there by
+    later instances, as long as the maps and ``map_defaults`` have not been changed.
+
+    Containers are additionally labeled with a fingerprint of their configuration in :attr:`fingerprint_label`,
+    which is used for shortcutting the configuration checks during updates. Set it to ``None`` to disable this.
     """
     core_image = DEFAULT_COREIMAGE
     base_image = DEFAULT_BASEIMAGE
     default_client_name = '__default__'
     hostname_replace = DEFAULT_HOSTNAME_REPLACEMENT
     default_network_names = ['bridge']
+    label_filters = False
+    dependency_cache_dir = None
+    dependency_cache_class = DependencyGraphCache
+    map_label = 'dockermap.map'
+    config_label = 'dockermap.config'
+    instance_label = 'dockermap.instance'
+    fingerprint_label = 'dockermap.fingerprint'
+    event_monitor_class = CacheEventMonitor
 
     def __init__(self, container_maps, clients, map_defaults=None, option_defaults=None):
-        self._maps = maps = {
-            map_name: map_contents.get_extended_map(map_defaults)
-            for map_name, map_contents in iteritems(container_maps)
-        }
+        self._container_maps = container_maps
+        self._map_defaults = map_defaults
         self._clients = clients
         self._option_defaults = default_opts = {}
         if option_defaults:
             default_opts.update(option_defaults)
             for p_opt in ['core_image', 'base_image', 'default_client_name',
-                          'hostname_replace', 'default_network_names']:
+                          'hostname_replace', 'default_network_names', 'label_filters', 'dependency_cache_dir']:
                 if p_opt in default_opts:
                     setattr(self, p_opt, default_opts.pop(p_opt))
-        self._container_names = ContainerCache(clients)
-        self._network_names = NetworkCache(clients)
-        self._volume_names = VolumeCache(clients)
-        self._images = ImageCache(clients)
-        self._f_resolver = f_resolver = ContainerDependencyResolver()
-        self._r_resolver = r_resolver = ContainerDependentsResolver()
-        self._default_volume_paths = volume_paths = {}
-        self._volume_users = volume_users = {}
-        self._volume_permissions = volume_permissions = {}
-        for m in itervalues(maps):
+        self._map_lock = threading.RLock()
+        self._map_data = {}
+        self._maps = LazyMapDict(container_maps, partial(self._get_map_data, 0))
+        self._default_volume_paths = LazyMapDict(container_maps, partial(self._get_map_data, 1))
+        self._volume_users = LazyMapDict(container_maps, partial(self._get_map_data, 2))
+        self._volume_permissions = LazyMapDict(container_maps, partial(self._get_map_data, 3))
+        self._f_resolver = ContainerDependencyResolver()
+        self._r_resolver = ContainerDependentsResolver()
+        if self.dependency_cache_dir:
+            self._dependency_cache = self.dependency_cache_class(self.dependency_cache_dir)
+        else:
+            self._dependency_cache = None
+        if self.label_filters:
+            label_filter = {'label': self.map_label}
+            image_filter = self._get_image_filter
+        else:
+            label_filter = None
+            image_filter = None
+        self._container_names = ContainerCache(clients, filters=label_filter)
+        self._network_names = NetworkCache(clients, filters=label_filter)
+        self._volume_names = VolumeCache(clients, filters=label_filter)
+        self._images = ImageCache(clients, filters=image_filter)
+        self._event_monitors = {}
+        self._map_client_names = {}
+
+    def _get_map_data(self, index, map_name):
+        map_data = self._map_data.get(map_name)
+        if map_data is None:
+            with self._map_lock:
+                map_data = self._map_data.get(map_name)
+                if map_data is None:
+                    self._map_data[map_name] = map_data = self._init_map(map_name)
+        return map_data[index]
+
+    def init_map(self, map_name):
+        """
+        Initializes a map, if it exists and this has not happened yet. Maps are otherwise initialized on first access
+        through :attr:`container_maps`, :attr:`default_volume_paths`, :attr:`volume_users`, or
+        :attr:`volume_permissions`, and when looking up dependencies.
+
+        :param map_name: Container map name.
+        :type map_name: unicode | str
+        """
+        if map_name in self._container_maps:
+            self._get_map_data(0, map_name)
+
+    def _init_map(self, map_name):
+        """
+        Generates the extended map, updates the dependency resolvers, and generates the volume tables of a map. This
+        is performed on first access of the map.
+
+        :param map_name: Container map name.
+        :type map_name: unicode | str
+        :return: Tuple of the extended map, its default volume paths, volume users, volume permissions, and dependency
+          items.
+        :rtype: (dockermap.map.config.main.ContainerMap, dict, dict, dict, list)
+        """
+        log.debug("Initializing map %s.", map_name)
+        container_map = self._container_maps[map_name]
+        m = container_map.get_extended_map(self._map_defaults)
+        if self._dependency_cache:
+            depdendency_items = self._update_dependencies_cached(self._dependency_cache, container_map, m,
+                                                                 self._map_defaults)
+        else:
             depdendency_items = list(m.dependency_items())
-            f_resolver.update(depdendency_items)
-            r_resolver.update(depdendency_items)
-            volume_paths[m.name] = map_paths = {}
-            volume_users[m.name] = map_users = {}
-            volume_permissions[m.name] = map_permissions = {}
-            default_paths = m.volumes.get_default_paths()
-            v_users = m.volumes.get_users()
-            v_permissions = m.volumes.get_permissions()
-            map_paths.update(default_paths)
-            if m.use_attached_parent_name:
-                map_paths.update(('{0}.{1}'.format(c_name, a.name),
-                                  a.path if isinstance(a, UsedVolume) else default_paths[a.name])
-                                 for c_name, c_config in m
-                                 for a in c_config.attaches)
-                map_users.update(('{0}.{1}'.format(c_name, a.name),
-                                  v_users.get(a.name) or c_config.user)
-                                 for c_name, c_config in m
-                                 for a in c_config.attaches)
-                map_permissions.update(('{0}.{1}'.format(c_name, a.name),
-                                       v_permissions.get(a.name) or c_config.permissions)
-                                       for c_name, c_config in m
-                                       for a in c_config.attaches)
+            self._f_resolver.update(depdendency_items)
+            self._r_resolver.update(depdendency_items)
+        return (m, ) + self._get_volume_tables(m) + (depdendency_items, )
+
+    @staticmethod
+    def _get_volume_tables(m):
+        map_paths = {}
+        map_users = {}
+        map_permissions = {}
+        default_paths = m.volumes.get_default_paths()
+        v_users = m.volumes.get_users()
+        v_permissions = m.volumes.get_permissions()
+        map_paths.update(default_paths)
+        if m.use_attached_parent_name:
+            map_paths.update(('{0}.{1}'.format(c_name, a.name),
+                              a.path if isinstance(a, UsedVolume) else default_paths[a.name])
+                             for c_name, c_config in m
+                             for a in c_config.get_value('attaches'))
+            map_users.update(('{0}.{1}'.format(c_name, a.name),
+                              v_users.get(a.name) or c_config.user)
+                             for c_name, c_config in m
+                             for a in c_config.get_value('attaches'))
+            map_permissions.update(('{0}.{1}'.format(c_name, a.name),
+                                   v_permissions.get(a.name) or c_config.permissions)
+                                   for c_name, c_config in m
+                                   for a in c_config.get_value('attaches'))
+        else:
+            map_paths.update((a.name,
+                              a.path if isinstance(a, UsedVolume) else default_paths[a.name])
+                             for c_name, c_config in m
+                             for a in c_config.get_value('attaches'))
+            map_users.update((a.name,
+                              v_users.get(a.name) or c_config.user)
+                             for c_name, c_config in m
+                             for a in c_config.get_value('attaches'))
+            map_permissions.update((a.name,
+                                   v_permissions.get(a.name) or c_config.permissions)
+                                   for c_name, c_config in m
+                                   for a in c_config.get_value('attaches'))
+        return map_paths, map_users, map_permissions
+
+    def _apply_container_config(self, map_name, config_name):
+        map_data = self._map_data.get(map_name)
+        if map_data is None:
+            # Not initialized yet; changes are picked up on first access.
+            return
+        container_map = self._container_maps[map_name]
+        m, __, __, __, old_items = map_data
+        source_configs = container_map.containers
+        extended_by = defaultdict(list)
+        for c_name, c_config in iteritems(source_configs):
+            for ext_name in c_config.get_value('extends'):
+                extended_by[ext_name].append(c_name)
+        changed_configs = [config_name]
+        changed_set = {config_name}
+        for c_name in changed_configs:
+            for ext_name in extended_by.get(c_name, ()):
+                if ext_name not in changed_set:
+                    changed_set.add(ext_name)
+                    changed_configs.append(ext_name)
+        log.debug("Updating configurations %s of map %s.", changed_configs, map_name)
+        for c_name in changed_configs:
+            c_config = source_configs.get(c_name)
+            if c_config is None or c_config.abstract:
+                m.containers.pop(c_name, None)
             else:
-                map_paths.update((a.name,
-                                  a.path if isinstance(a, UsedVolume) else default_paths[a.name])
-                                 for c_name, c_config in m
-                                 for a in c_config.attaches)
-                map_users.update((a.name,
-                                  v_users.get(a.name) or c_config.user)
-                                 for c_name, c_config in m
-                                 for a in c_config.attaches)
-                map_permissions.update((a.name,
-                                       v_permissions.get(a.name) or c_config.permissions)
-                                       for c_name, c_config in m
-                                       for a in c_config.attaches)
+                m.containers[c_name] = container_map.get_extended(c_config)
+        new_items = list(m.dependency_items())
+        old_dict = dict(old_items)
+        new_dict = dict(new_items)
+        removed_items = [(item, parents)
+                         for item, parents in iteritems(old_dict)
+                         if new_dict.get(item) != parents]
+        added_items = [(item, parents)
+                       for item, parents in iteritems(new_dict)
+                       if old_dict.get(item) != parents]
+        if removed_items or added_items:
+            f_resolver = self._f_resolver
+            r_resolver = self._r_resolver
+            f_resolver.remove(removed_items)
+            r_resolver.remove(removed_items)
+            f_resolver.update(added_items)
+            r_resolver.update(added_items)
+            changed_items = set()
+            changed_parents = set()
+            for item, parents in itertools.chain(removed_items, added_items):
+                changed_items.add(item)
+                changed_parents.update(parents)
+            f_resolver.invalidate(changed_items)
+            r_resolver.invalidate(changed_parents)
+        self._map_data[map_name] = (m, ) + self._get_volume_tables(m) + (new_items, )
+        self._map_client_names.pop(map_name, None)
+
+    def update_container_config(self, map_name, config_name, config=None):
+        """
+        Applies a new or changed container configuration to the policy, without initializing it again. Only the
+        configuration and others that extend it are extended again; dependencies are updated, and cached dependencies
+        are reset where they are affected by the change.
+
+        :param map_name: Container map name.
+        :type map_name: unicode | str
+        :param config_name: Container configuration name.
+        :type config_name: unicode | str
+        :param config: New configuration, which is set on the container map. If not provided, changes that have been
+          made to the configuration on the original container map are applied.
+        :type config: dockermap.map.config.container.ContainerConfiguration | dict
+        """
+        with self._map_lock:
+            if config is not None:
+                if not isinstance(config, ContainerConfiguration):
+                    config = ContainerConfiguration(config)
+                self._container_maps[map_name].containers[config_name] = config
+            self._apply_container_config(map_name, config_name)
+
+    def remove_container_config(self, map_name, config_name):
+        """
+        Removes a container configuration from the container map, and updates the policy accordingly. Existing
+        containers are not affected.
+
+        :param map_name: Container map name.
+        :type map_name: unicode | str
+        :param config_name: Container configuration name.
+        :type config_name: unicode | str
+        """
+        with self._map_lock:
+            self._container_maps[map_name].containers.pop(config_name, None)
+            self._apply_container_config(map_name, config_name)
 
     @classmethod
     def cname(cls, map_name, container, instance=None):
@@ -151,6 +326,76 @@ class BasePolicy(object):
             return network_name
         return '{0}.{1}'.format(map_name, network_name)
 
+    def _update_dependencies_cached(self, dependency_cache, container_map, extended_map, map_defaults):
+        f_resolver = self._f_resolver
+        r_resolver = self._r_resolver
+        cache_key = dependency_cache.get_key(container_map, map_defaults)
+        cached = dependency_cache.load(cache_key) if cache_key else None
+        if cached:
+            log.debug("Loading dependencies of map %s from cache.", extended_map.name)
+            depdendency_items, f_resolved, r_resolved = cached
+            f_resolver.update(depdendency_items)
+            r_resolver.update(depdendency_items)
+            f_resolver.set_resolved(f_resolved)
+            r_resolver.set_resolved(r_resolved)
+            return depdendency_items
+        depdendency_items = list(extended_map.dependency_items())
+        f_resolver.update(depdendency_items)
+        r_resolver.update(depdendency_items)
+        if cache_key:
+            log.debug("Storing dependencies of map %s in cache.", extended_map.name)
+            map_items = set()
+            for item, parents in depdendency_items:
+                map_items.add(item)
+                map_items.update(parents)
+            dependency_cache.save(cache_key, (depdendency_items, f_resolver.get_resolved(map_items),
+                                              r_resolver.get_resolved(map_items)))
+        return depdendency_items
+
+    @classmethod
+    def get_labels(cls, config_id):
+        """
+        Generates labels that should be set on new containers, networks, and volumes for identifying them with their
+        configuration.
+
+        In this implementation, the map name, configuration name, and instance name (if present) are set on the labels
+        :attr:`map_label`, :attr:`config_label`, and :attr:`instance_label`.
+
+        :param config_id: MapConfigId tuple.
+        :type config_id: dockermap.map.input.MapConfigId
+        :return: Labels.
+        :rtype: dict[unicode | str, unicode | str]
+        """
+        labels = {
+            cls.map_label: config_id.map_name,
+            cls.config_label: config_id.config_name,
+        }
+        if config_id.instance_name:
+            labels[cls.instance_label] = config_id.instance_name
+        return labels
+
+    def _get_image_filter(self):
+        return {'reference': self.get_image_repositories()}
+
+    def get_image_repositories(self):
+        """
+        Returns the names of all image repositories used by the container maps, including the core and base image.
+
+        :return: Sorted list of repository names.
+        :rtype: list[unicode | str]
+        """
+        def _get_repository(image):
+            name, __, tag = image.rpartition(':')
+            if not name or '/' in tag:
+                return image
+            return name
+
+        repositories = {_get_repository(self.core_image), _get_repository(self.base_image)}
+        for c_map in itervalues(self._maps):
+            repositories.update(c_map.get_image(c_config.image or c_name)[0]
+                                for c_name, c_config in c_map)
+        return sorted(repositories)
+
     @classmethod
     def get_hostname(cls, container_name, client_name=None):
         """
@@ -179,24 +424,103 @@ class BasePolicy(object):
         """
         Generates the list of dependency containers, in reverse order (i.e. the last dependency coming first).
 
-        :param config_id: MapConfigId tuple.
-        :type config_id: dockermap.map.input.MapConfigId
+        :param config_id: MapConfigId tuple, or a plain tuple of the same items.
+        :type config_id: dockermap.map.input.MapConfigId | tuple
         :return: Dependency configuration types, container map names, configuration names, and instances.
         :rtype: collections.Iterable[(unicode | str, unicode | str, unicode | str, unicode | str)]
         """
+        self.init_map(config_id[1])
         return self._f_resolver.get_dependencies(config_id)
 
     def get_dependents(self, config_id):
         """
         Generates the list of dependent containers, in reverse order (i.e. the last dependent coming first).
 
-        :param config_id: MapConfigId tuple.
-        :type config_id: dockermap.map.input.MapConfigId
+        :param config_id: MapConfigId tuple, or a plain tuple of the same items.
+        :type config_id: dockermap.map.input.MapConfigId | tuple
         :return: Dependent configuration types, container map names, configuration names, and instances.
         :rtype: collections.Iterable[(unicode | str, unicode | str, unicode | str, unicode | str)]
         """
+        self.init_map(config_id[1])
         return self._r_resolver.get_dependencies(config_id)
 
+    def get_client_names(self, config_id):
+        """
+        Returns the names of the clients that an item is deployed to. Containers and their attached volumes use the
+        clients of their container configuration, if set, and otherwise the clients of the map. Images and networks
+        are used on all clients of the map (see :meth:`get_map_client_names`).
+
+        :param config_id: MapConfigId tuple, or a plain tuple of the same items.
+        :type config_id: dockermap.map.input.MapConfigId | tuple
+        :return: Client names.
+        :rtype: list[unicode | str]
+        """
+        config_type, map_name, config_name = config_id[:3]
+        if config_type in (ItemType.CONTAINER, ItemType.VOLUME):
+            c_map = self._maps[map_name]
+            c_config = c_map.get_existing(config_name)
+            if c_config is not None and c_config.get_value('clients'):
+                return c_config.get_value('clients')
+            return c_map.clients or [self.default_client_name]
+        return self.get_map_client_names(map_name)
+
+    def get_map_client_names(self, map_name):
+        """
+        Returns the names of all clients that a map is deployed to, i.e. the clients of the map (or the default client)
+        and the clients of individual container configurations.
+
+        :param map_name: Container map name.
+        :type map_name: unicode | str
+        :return: Client names.
+        :rtype: list[unicode | str]
+        """
+        client_names = self._map_client_names.get(map_name)
+        if client_names is None:
+            c_map = self._maps[map_name]
+            client_names = list(c_map.clients or [self.default_client_name])
+            for __, c_config in c_map:
+                merge_list(client_names, c_config.get_value('clients'))
+            self._map_client_names[map_name] = client_names
+        return client_names
+
+    def start_event_monitoring(self, client_names=None, timeout=10):
+        """
+        Starts updating the cached container, image, network, and volume names from the event stream of the clients,
+        instead of relying on the initial listing. Until a client is connected, its caches are listed as usual.
+
+        :param client_names: Client names to monitor. By default all clients are monitored.
+        :type client_names: collections.Iterable[unicode | str]
+        :param timeout: Time in seconds to wait for each client to connect. Set to ``0`` for not waiting at all, or
+          ``None`` for waiting indefinitely.
+        :type timeout: float | NoneType
+        """
+        for client_name in client_names or list(self._clients.keys()):
+            monitor = self._event_monitors.get(client_name)
+            if not monitor:
+                self._event_monitors[client_name] = monitor = self.event_monitor_class(self, client_name)
+            if not monitor.start(timeout):
+                log.warning("Event stream of client %s not connected yet.", client_name)
+
+    def stop_event_monitoring(self):
+        """
+        Stops updating the cached names from the event streams.
+        """
+        for monitor in itervalues(self._event_monitors):
+            monitor.stop()
+        self._event_monitors.clear()
+
+    def is_monitored(self, client_name):
+        """
+        Whether the cached names of a client are currently kept up-to-date from its event stream.
+
+        :param client_name: Client name.
+        :type client_name: unicode | str
+        :return: ``True`` if the event stream is processed, ``False`` otherwise.
+        :rtype: bool
+        """
+        monitor = self._event_monitors.get(client_name)
+        return monitor is not None and monitor.is_current
+
     @property
     def container_maps(self):
         """
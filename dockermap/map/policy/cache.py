@@ -1,16 +1,44 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import threading
+from functools import wraps
+
+from docker.errors import APIError
+
+from ... import DEFAULT_PRESET_NETWORKS
+
+CONTAINER_STATE_EVENTS = {'start', 'restart', 'die', 'kill', 'stop', 'pause', 'unpause', 'oom', 'update'}
+
+
+def _remove_values(dct, value):
+    for key in [k for k, v in list(dct.items()) if v == value]:
+        dct.pop(key, None)
+
+
+def _locked(func):
+    @wraps(func)
+    def _locked_func(self, *args, **kwargs):
+        with self.lock:
+            return func(self, *args, **kwargs)
+
+    return _locked_func
+
 
 class CachedItems(object):
     """
-    Abstract implementation for a caching collection of client names or ids.
+    Abstract implementation for a caching collection of client names or ids. Changes from other threads, e.g. from
+    events, should be made while holding :attr:`lock`.
 
     :param client: Client object.
     :type client: docker.client.Client
+    :param filters: Filters to apply when listing items from the client.
+    :type filters: dict | NoneType
     """
-    def __init__(self, client):
+    def __init__(self, client, filters=None):
         self._client = client
+        self._filters = filters
+        self.lock = threading.RLock()
         super(CachedItems, self).__init__()
         self.refresh()
 
@@ -20,6 +48,19 @@ class CachedItems(object):
         """
         raise NotImplementedError("Method 'refresh' is not implemented.")
 
+    def apply_event(self, action, actor_id, attributes):
+        """
+        Updates the cached items incrementally from an event of the Docker client. By default, events are ignored.
+
+        :param action: Event action, e.g. ``create`` or ``destroy``.
+        :type action: unicode | str
+        :param actor_id: Id of the object that the event refers to.
+        :type actor_id: unicode | str
+        :param attributes: Additional event attributes, e.g. the object name.
+        :type attributes: dict
+        """
+        pass
+
 
 class CachedImages(CachedItems, dict):
     """
@@ -31,13 +72,17 @@ class CachedImages(CachedItems, dict):
             if tags:
                 self.update({tag: image['Id'] for tag in tags})
 
+    @_locked
     def refresh(self):
         """
         Fetches image and their ids from the client.
         """
         if not self._client:
             return
-        current_images = self._client.images()
+        if self._filters:
+            current_images = self._client.images(filters=self._filters)
+        else:
+            current_images = self._client.images()
         self.clear()
         self._update(current_images)
         for image in current_images:
@@ -45,54 +90,168 @@ class CachedImages(CachedItems, dict):
             if tags:
                 self.update({tag: image['Id'] for tag in tags})
 
+    @_locked
     def refresh_repo(self, name):
         if not self._client:
             return
         self._update(self._client.images(name=name))
 
+    @_locked
+    def refresh_image(self, image):
+        """
+        Updates the tags of a single image.
+
+        :param image: Image id or name.
+        :type image: unicode | str
+        """
+        if not self._client:
+            return
+        try:
+            image_detail = self._client.inspect_image(image)
+        except APIError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            _remove_values(self, image)
+            return
+        image_id = image_detail['Id']
+        tags = image_detail.get('RepoTags') or []
+        for tag in [k for k, v in list(self.items()) if v == image_id and k not in tags]:
+            self.pop(tag, None)
+        self.update({tag: image_id for tag in tags})
+
+    def apply_event(self, action, actor_id, attributes):
+        if action == 'delete':
+            _remove_values(self, actor_id)
+        elif action in ('pull', 'tag', 'untag', 'import', 'load'):
+            self.refresh_image(actor_id)
+
 
 class CachedContainerNames(CachedItems, dict):
+    """
+    Dictionary of container names and ids. The container listing that these are fetched from is also kept as summary
+    information (e.g. with the container status), until a container is replaced or removed.
+    """
+    def __init__(self, *args, **kwargs):
+        self._summaries = {}
+        super(CachedContainerNames, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        self._summaries.pop(key, None)
+        super(CachedContainerNames, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._summaries.pop(key, None)
+        super(CachedContainerNames, self).__delitem__(key)
+
+    @_locked
     def refresh(self):
         """
         Fetches all current container names from the client, along with their id.
         """
         if not self._client:
             return
-        current_containers = self._client.containers(all=True)
+        current_containers = self._client.containers(all=True, filters=self._filters)
         self.clear()
+        self._summaries.clear()
         for container in current_containers:
             container_names = container.get('Names')
             if container_names:
                 c_id = container['Id']
+                for name in container_names:
+                    self._summaries[name[1:]] = container
                 self.update((name[1:], c_id)
                             for name in container_names)
 
+    def apply_event(self, action, actor_id, attributes):
+        if action == 'create':
+            name = attributes.get('name')
+            if name:
+                self[name] = actor_id
+        elif action == 'destroy':
+            for name in [k for k, v in list(self.items()) if v == actor_id]:
+                self.pop(name, None)
+                self._summaries.pop(name, None)
+        elif action == 'rename':
+            old_name = attributes.get('oldName', '').lstrip('/')
+            if old_name:
+                self.pop(old_name, None)
+                self._summaries.pop(old_name, None)
+            name = attributes.get('name')
+            if name:
+                self[name] = actor_id
+        elif action in CONTAINER_STATE_EVENTS:
+            for name in [k for k, v in list(self.items()) if v == actor_id]:
+                self._summaries.pop(name, None)
+
+    @_locked
+    def discard_summary(self, name):
+        """
+        Discards the summary information of a container, e.g. when its state is changed.
+
+        :param name: Container name.
+        :type name: unicode | str
+        """
+        self._summaries.pop(name, None)
+
+    def get_summary(self, name):
+        """
+        Returns the summary information of a container from the client's container listing.
+
+        :param name: Container name.
+        :type name: unicode | str
+        :return: Container information as returned by the listing, or ``None`` if it is not available.
+        :rtype: dict | NoneType
+        """
+        return self._summaries.get(name)
+
 
 class CachedNetworkNames(CachedItems, dict):
+    @_locked
     def refresh(self):
         """
         Fetches all current network names from the client, along with their id.
         """
         if not self._client:
             return
-        current_networks = self._client.networks()
+        if self._filters:
+            current_networks = self._client.networks(filters=self._filters)
+            # Preset networks are not labeled, but always considered.
+            current_networks.extend(net for net in self._client.networks(names=list(DEFAULT_PRESET_NETWORKS))
+                                    if net['Name'] in DEFAULT_PRESET_NETWORKS)
+        else:
+            current_networks = self._client.networks()
         self.clear()
         self.update((net['Name'], net['Id'])
                     for net in current_networks)
 
+    def apply_event(self, action, actor_id, attributes):
+        if action == 'create':
+            name = attributes.get('name')
+            if name:
+                self[name] = actor_id
+        elif action == 'destroy':
+            _remove_values(self, actor_id)
+
 
 class CachedVolumeNames(CachedItems, set):
+    @_locked
     def refresh(self):
         """
         Fetches all current network names from the client.
         """
         if not self._client:
             return
-        current_volumes = self._client.volumes()['Volumes']
+        current_volumes = self._client.volumes(filters=self._filters)['Volumes']
         self.clear()
         if current_volumes:
             self.update(vol['Name'] for vol in current_volumes)
 
+    def apply_event(self, action, actor_id, attributes):
+        if action == 'create':
+            self.add(actor_id)
+        elif action == 'destroy':
+            self.discard(actor_id)
+
 
 class DockerHostItemCache(dict):
     """
@@ -101,36 +260,53 @@ class DockerHostItemCache(dict):
 
     :param clients: Dictionary of clients with alias and client object.
     :type clients: dict[unicode | str, dockermap.map.config.client.ClientConfiguration]
+    :param filters: Filters to apply when listing items from each client. If a function is passed, it is called for
+     generating the filters when items are listed for the first time.
+    :type filters: dict | function | NoneType
     """
     item_class = None
 
     def __init__(self, clients, *args, **kwargs):
         self._clients = clients
+        self._filters = kwargs.pop('filters', None)
+        self._lock = threading.RLock()
         super(DockerHostItemCache, self).__init__(*args, **kwargs)
 
     def __getitem__(self, item):
         """
-        Retrieves the items associated with the given client. Returned results are cached for later use.
+        Retrieves the items associated with the given client. Returned results are cached for later use. When accessed
+        from multiple threads, items of each client are only listed once.
 
         :param item: Client name.
         :type item: unicode | str
         :return: Items in the cache.
         """
         if item not in self:
-            return self.refresh(item)
+            with self._lock:
+                if item not in self:
+                    return self.refresh(item)
         return super(DockerHostItemCache, self).__getitem__(item)
 
     def refresh(self, item):
         """
-        Forces a refresh of a cached item.
+        Forces a refresh of a cached item. An existing item is updated in-place, so that references held by other
+        threads remain valid.
 
         :param item: Client name.
         :type item: unicode | str
         :return: Items in the cache.
         :rtype: DockerHostItemCache.item_class
         """
-        client = self._clients[item].get_client()
-        self[item] = val = self.item_class(client)
+        with self._lock:
+            val = self.get(item)
+            if val is None:
+                client = self._clients[item].get_client()
+                filters = self._filters
+                if callable(filters):
+                    self._filters = filters = filters()
+                self[item] = val = self.item_class(client, filters)
+                return val
+        val.refresh()
         return val
 
 
@@ -1,42 +1,39 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from ...dep import MultiForwardDependencyResolver, MultiReverseDependencyResolver, CircularDependency
-from ...utils import merge_list
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from six.moves import cPickle as pickle
+
+from ... import __version__
+from ...dep import MultiForwardDependencyResolver, MultiReverseDependencyResolver
+from ...utils import replace_file
 from ..input import ItemType
 
+log = logging.getLogger(__name__)
+
 
 class ContainerDependencyMergeMixin(object):
     """
     Resolves dependencies between :class:`~dockermap.map.config.container.ContainerConfiguration` instances, based on
-    shared and used volumes.
+    shared and used volumes. For container configurations, first parent dependencies are checked, and then immediate
+    dependencies of the current configuration are added to the list, but without duplicating any entries.
     """
-    def merge_dependency(self, item, resolve_parent, parents):
+    def is_resolvable(self, item):
         """
-        Merge dependencies of current configuration with further dependencies; in this instance, it means that in case
-        of container configuration first parent dependencies are checked, and then immediate dependencies of the current
-        configuration should be added to the list, but without duplicating any entries.
+        Only dependencies of container configurations are followed; images, volumes, and networks are included in the
+        result, but not resolved any further.
 
         :param item: Configuration item.
-        :type item: (unicode | str, unicode | str, unicode | str, unicode | str)
-        :param resolve_parent: Function to resolve parent dependencies.
-        :type resolve_parent: function
-        :type parents: collections.Iterable[(unicode | str, unicode | str, unicode | str, unicode | str)]
-        :return: List of recursively resolved dependencies of this container.
-        :rtype: list[(unicode | str, unicode | str, unicode | str, unicode | str)]
-        :raise CircularDependency: If the current element depends on one found deeper in the hierarchy.
-        """
-        dep = []
-        for parent_key in parents:
-            if item == parent_key:
-                raise CircularDependency(item, True)
-            if parent_key.config_type == ItemType.CONTAINER:
-                parent_dep = resolve_parent(parent_key)
-                if item in parent_dep:
-                    raise CircularDependency(item)
-                merge_list(dep, parent_dep)
-        merge_list(dep, parents)
-        return dep
+        :type item: dockermap.map.input.MapConfigId
+        :return: ``True`` if the item is a container configuration.
+        :rtype: bool
+        """
+        return item.config_type == ItemType.CONTAINER
 
 
 class ContainerDependencyResolver(ContainerDependencyMergeMixin, MultiForwardDependencyResolver):
@@ -45,3 +42,78 @@ class ContainerDependencyResolver(ContainerDependencyMergeMixin, MultiForwardDep
 
 class ContainerDependentsResolver(ContainerDependencyMergeMixin, MultiReverseDependencyResolver):
     pass
+
+
+class DependencyGraphCache(object):
+    """
+    Stores the dependency items and resolved dependencies of container maps in a directory, so that they do not have to
+    be generated again by later processes, as long as the map and its defaults have not changed. Entries are keyed by a
+    hash of the map contents. Maps with contents that cannot be serialized, e.g. lazy values, are not cached.
+
+    Entries are stored using :mod:`pickle`, which can execute arbitrary code when loading a file. The cache directory
+    must therefore only be writable by trusted users. It is created with permissions for the current user only.
+
+    :param path: Cache directory. Is created if it does not exist.
+    :type path: unicode | str
+    """
+    def __init__(self, path):
+        self._path = path
+
+    def get_key(self, container_map, map_defaults=None):
+        """
+        Generates the cache key of a container map.
+
+        :param container_map: Container map, before it is extended.
+        :type container_map: dockermap.map.config.main.ContainerMap
+        :param map_defaults: Default map properties.
+        :type map_defaults: dict | NoneType
+        :return: Hexadecimal hash of the map contents, or ``None`` if the map cannot be cached.
+        :rtype: unicode | str | NoneType
+        """
+        map_class = type(container_map)
+        try:
+            data = json.dumps([__version__, map_class.__module__, map_class.__name__, container_map.name,
+                               container_map.as_dict(), map_defaults], sort_keys=True, separators=(',', ':'))
+        except (TypeError, ValueError):
+            log.debug("Contents of map %s cannot be serialized; not using the dependency cache.", container_map.name)
+            return None
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _get_file_name(self, key):
+        return os.path.join(self._path, 'deps-{0}.pickle'.format(key))
+
+    def load(self, key):
+        """
+        Loads a cache entry.
+
+        :param key: Cache key.
+        :type key: unicode | str
+        :return: Cached data, or ``None`` if the entry does not exist or cannot be read.
+        """
+        try:
+            with open(self._get_file_name(key), 'rb') as f:
+                return pickle.load(f)
+        except (IOError, OSError):
+            return None
+        except Exception as e:
+            log.warning("Could not read dependency cache entry %s: %s", key, e)
+            return None
+
+    def save(self, key, data):
+        """
+        Stores a cache entry. The file is replaced atomically, so that concurrent processes do not read incomplete
+        entries. Errors are logged, but not raised.
+
+        :param key: Cache key.
+        :type key: unicode | str
+        :param data: Data to store.
+        """
+        try:
+            if not os.path.isdir(self._path):
+                os.makedirs(self._path, 0o700)
+            fd, temp_name = tempfile.mkstemp(dir=self._path, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            replace_file(temp_name, self._get_file_name(key))
+        except (IOError, OSError) as e:
+            log.warning("Could not write dependency cache entry %s: %s", key, e)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+def get_event_info(event):
+    """
+    Extracts the relevant information from an event of the Docker client. Also considers the format of older API
+    versions, where only container events are included.
+
+    :param event: Decoded event.
+    :type event: dict
+    :return: Tuple of event type (e.g. ``container``), action, actor id, and attributes.
+    :rtype: (unicode | str, unicode | str, unicode | str, dict)
+    """
+    actor = event.get('Actor') or {}
+    action = event.get('Action') or event.get('status') or ''
+    # Some actions have additional information appended, e.g. 'health_status: healthy'.
+    action = action.partition(':')[0]
+    return (event.get('Type', 'container'), action, actor.get('ID') or event.get('id'),
+            actor.get('Attributes') or {})
+
+
+class CacheEventMonitor(object):
+    """
+    Subscribes to the event stream of a Docker client and applies the events to the container, image, network, and
+    volume caches of a policy, so that these do not have to be refreshed entirely. Events are processed in a
+    background thread. Whenever the stream is connected or has to be re-connected, events may have been missed, and
+    the caches of the client are invalidated, so that they are fetched again on their next use. If connecting fails
+    repeatedly, the time between attempts is doubled each time, up to ``max_retry_interval``.
+
+    :param policy: Policy object.
+    :type policy: dockermap.map.policy.base.BasePolicy
+    :param client_name: Client name.
+    :type client_name: unicode | str
+    :param retry_interval: Time in seconds to wait before re-connecting after the stream has been interrupted.
+    :type retry_interval: float
+    :param max_retry_interval: Maximum time in seconds to wait between attempts to re-connect.
+    :type max_retry_interval: float
+    """
+    def __init__(self, policy, client_name, retry_interval=1, max_retry_interval=60):
+        self._policy = policy
+        self._client_name = client_name
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+        self._thread = None
+        self._stream = None
+        self._stopped = threading.Event()
+        self._connected = threading.Event()
+
+    def get_event_caches(self, event_type):
+        """
+        Returns the cache that events of a certain type apply to.
+
+        :param event_type: Event type, i.e. ``container``, ``image``, ``network``, or ``volume``.
+        :type event_type: unicode | str
+        :return: Cached items of the client, if they have already been loaded; ``None`` otherwise.
+        :rtype: dockermap.map.policy.cache.CachedItems | NoneType
+        """
+        policy = self._policy
+        if event_type == 'container':
+            cache = policy.container_names
+        elif event_type == 'image':
+            cache = policy.images
+        elif event_type == 'network':
+            cache = policy.network_names
+        elif event_type == 'volume':
+            cache = policy.volume_names
+        else:
+            return None
+        return cache.get(self._client_name)
+
+    def apply_event(self, event):
+        """
+        Applies a single event to the cached items of the client, while holding their lock.
+
+        :param event: Decoded event.
+        :type event: dict
+        """
+        event_type, action, actor_id, attributes = get_event_info(event)
+        if not actor_id:
+            return
+        cached_items = self.get_event_caches(event_type)
+        if cached_items is not None:
+            log.debug("Applying %s event %s on %s to cache of client %s.", event_type, action, actor_id,
+                      self._client_name)
+            with cached_items.lock:
+                cached_items.apply_event(action, actor_id, attributes)
+
+    def resync(self):
+        """
+        Invalidates all cached items of the client, so that they are fetched again on their next use.
+        """
+        log.debug("Invalidating caches of client %s.", self._client_name)
+        policy = self._policy
+        for cache in (policy.container_names, policy.images, policy.network_names, policy.volume_names):
+            cache.pop(self._client_name, None)
+
+    def _run(self):
+        client = self._policy.clients[self._client_name].get_client()
+        stopped = self._stopped
+        retry_interval = self._retry_interval
+        while not stopped.is_set():
+            try:
+                self._stream = stream = client.events(decode=True)
+                # Events before the stream was (re-)connected may have been missed.
+                self.resync()
+                self._connected.set()
+                retry_interval = self._retry_interval
+                for event in stream:
+                    if stopped.is_set():
+                        break
+                    self.apply_event(event)
+            except Exception as e:
+                if stopped.is_set():
+                    break
+                log.warning("Event stream of client %s interrupted: %s; re-connecting in %s seconds.",
+                            self._client_name, e, retry_interval)
+            self._connected.clear()
+            # Returns immediately when stopped.
+            if stopped.wait(retry_interval):
+                break
+            retry_interval = min(retry_interval * 2, self._max_retry_interval)
+        self._connected.clear()
+
+    def start(self, timeout=None):
+        """
+        Starts processing events in a background thread.
+
+        :param timeout: Time in seconds to wait until the event stream is connected. Set to ``0`` for not waiting at
+          all. ``None`` waits indefinitely.
+        :type timeout: float | NoneType
+        :return: Whether the event stream has been connected.
+        :rtype: bool
+        """
+        if self._thread and self._thread.is_alive():
+            return self._connected.is_set()
+        self._stopped.clear()
+        thread_name = 'dockermap-events-{0}'.format(self._client_name)
+        self._thread = thread = threading.Thread(target=self._run, name=thread_name)
+        thread.daemon = True
+        thread.start()
+        return self._connected.wait(timeout)
+
+    def stop(self, timeout=None):
+        """
+        Stops processing events and closes the event stream, if possible. Also interrupts waiting for re-connecting.
+
+        :param timeout: Time in seconds to wait for the background thread to finish. By default, does not wait.
+        :type timeout: float | NoneType
+        """
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None and hasattr(stream, 'close'):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self._stream = None
+        thread = self._thread
+        if timeout is not None and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    @property
+    def is_current(self):
+        """
+        Whether the event stream is currently connected, i.e. caches are kept up-to-date.
+
+        :return: ``True`` if events are being processed.
+        :rtype: bool
+        """
+        return self._connected.is_set()
@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 
 import six
+from six.moves.collections_abc import Mapping
 
 from ...functional import resolve_value
 from ..config.host_volume import get_host_path
@@ -97,3 +98,32 @@ def get_instance_volumes(instance_detail, check_names):
         return {m['Destination']: m['Source']
                 for m in instance_detail['Mounts']}
     return instance_detail.get('Volumes') or {}
+
+
+class LazyMapDict(Mapping):
+    """
+    Read-only dictionary of map names, which generates the value of a map on first access, e.g. the extended map or
+    one of its tables.
+
+    :param map_names: Names of all available maps.
+    :type map_names: collections.Iterable[unicode | str]
+    :param get_value: Function that returns the value for a map name.
+    :type get_value: (unicode | str) -> Any
+    """
+    def __init__(self, map_names, get_value):
+        self._map_names = map_names
+        self._get_value = get_value
+
+    def __getitem__(self, key):
+        if key not in self._map_names:
+            raise KeyError(key)
+        return self._get_value(key)
+
+    def __contains__(self, key):
+        return key in self._map_names
+
+    def __iter__(self):
+        return iter(self._map_names)
+
+    def __len__(self):
+        return len(self._map_names)
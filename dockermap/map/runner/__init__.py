@@ -2,8 +2,11 @@
 from collections import namedtuple
 import sys
 
+from concurrent.futures import ThreadPoolExecutor
+import six
 from six import with_metaclass
 
+from ...functional import bind_resolution_scope
 from ..action import Action, ImageAction
 from ..exceptions import ActionTypeException, ActionException
 from ..input import ItemType
@@ -28,6 +31,11 @@ class RunnerMeta(PolicyUtilMeta):
 
 
 class AbstractRunner(with_metaclass(RunnerMeta, PolicyUtil)):
+    max_workers = None
+    parallel_clients = False
+    memoize_values = False
+    policy_options = ['max_workers', 'parallel_clients', 'memoize_values']
+
     def __init__(self, *args, **kwargs):
         cls = self.__class__
         self.action_methods = {
@@ -36,6 +44,44 @@ class AbstractRunner(with_metaclass(RunnerMeta, PolicyUtil)):
         }
         super(AbstractRunner, self).__init__(*args, **kwargs)
 
+    def _collect_actions(self, actions):
+        results = []
+        try:
+            for res in self.run_actions(actions):
+                results.append(res)
+        except Exception:
+            return results, sys.exc_info()
+        return results, None
+
+    def run_action_wave(self, action_lists):
+        """
+        Runs multiple lists of actions concurrently, using up to :attr:`max_workers` threads. The lists must be
+        independent of each other, e.g. because their states have been generated in the same wave. Actions within
+        each list are performed in order.
+
+        :param action_lists: Lists of actions to apply.
+        :type action_lists: list[list[dockermap.map.action.ItemAction]]
+        :return: Where the result is not ``None``, returns the output from the client, in the order of the action lists.
+          If any list fails, the remaining lists of the wave are still completed and their output is returned, before
+          the first exception is raised.
+        :rtype: collections.Iterable[ActionOutput]
+        """
+        if len(action_lists) == 1 or not self.max_workers or self.max_workers <= 1:
+            for actions in action_lists:
+                for res in self.run_actions(actions):
+                    yield res
+            return
+        with ThreadPoolExecutor(min(self.max_workers, len(action_lists))) as executor:
+            wave_results = list(executor.map(bind_resolution_scope(self._collect_actions), action_lists))
+        first_error = None
+        for results, exc_info in wave_results:
+            for res in results:
+                yield res
+            if exc_info and not first_error:
+                first_error = exc_info
+        if first_error:
+            six.reraise(*first_error)
+
     def run_actions(self, actions):
         """
         Runs the given lists of attached actions and instance actions on the client.
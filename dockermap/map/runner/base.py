@@ -20,9 +20,11 @@ from .attached import AttachedPreparationMixin
 from .cmd import ExecMixin
 from .image import ImageMixin
 from .network import NetworkUtilMixin
+from .ready import ReadyCheckMixin
 from .script import ScriptMixin
 from .signal_stop import SignalMixin
-from .utils import update_kwargs, get_volumes, get_volumes_from, get_host_binds, get_port_bindings
+from .utils import (update_kwargs, get_kwargs_fingerprint, get_volumes, get_volumes_from, get_host_binds,
+                    get_port_bindings)
 
 log = logging.getLogger(__name__)
 
@@ -45,6 +47,13 @@ class DockerBaseRunnerMixin(object):
         (ItemType.CONTAINER, Action.WAIT, 'wait'),
     ]
 
+    def _discard_summary(self, action, c_name):
+        # The container listing no longer reflects the state of the container. Does not list containers, if the
+        # client has not been cached yet.
+        container_names = self._policy.container_names.get(action.client_name)
+        if container_names is not None:
+            container_names.discard_summary(c_name)
+
     def create_network(self, action, n_name, **kwargs):
         """
         Creates a configured network.
@@ -111,11 +120,16 @@ class DockerBaseRunnerMixin(object):
         return res
 
     def start_container(self, action, c_name, **kwargs):
+        self._discard_summary(action, c_name)
         if action.client_config.features['host_config']:
             res = action.client.start(c_name)
         else:
             c_kwargs = self.get_container_host_config_kwargs(action, c_name, kwargs=kwargs)
             res = action.client.start(**c_kwargs)
+        ready_check = self.get_container_ready_check(action)
+        if ready_check:
+            self.wait_ready(action, c_name, ready_check)
+            return res
         start_delay = action.config.start_delay
         if start_delay:
             log.debug("Sleeping %s seconds after container %s start.", start_delay, c_name)
@@ -124,10 +138,12 @@ class DockerBaseRunnerMixin(object):
 
     def restart(self, action, c_name, **kwargs):
         c_kwargs = self.get_container_restart_kwargs(action, c_name, kwargs=kwargs)
+        self._discard_summary(action, c_name)
         return action.client.restart(**c_kwargs)
 
     def stop(self, action, c_name, **kwargs):
         c_kwargs = self.get_container_stop_kwargs(action, c_name, kwargs=kwargs)
+        self._discard_summary(action, c_name)
         try:
             return action.client.stop(**c_kwargs)
         except Timeout:
@@ -146,30 +162,25 @@ class DockerBaseRunnerMixin(object):
 
     def update_container(self, action, c_name, update_values, **kwargs):
         c_kwargs = self.get_container_update_kwargs(action, c_name, update_values, kwargs=kwargs)
+        self._discard_summary(action, c_name)
         return action.client.update_container(**c_kwargs)
 
     def kill(self, action, c_name, **kwargs):
         c_kwargs = self.get_container_kill_kwargs(action, c_name, kwargs=kwargs)
+        self._discard_summary(action, c_name)
         return action.client.kill(**c_kwargs)
 
     def wait(self, action, c_name, **kwargs):
         c_kwargs = self.get_container_wait_kwargs(action, c_name, kwargs=kwargs)
+        self._discard_summary(action, c_name)
         return action.client.wait(**c_kwargs)
 
 
 class DockerConfigMixin(object):
-    def get_container_create_kwargs(self, action, container_name, kwargs=None):
+    def _get_container_create_kwargs(self, action, container_name, kwargs):
         """
-        Generates keyword arguments for the Docker client to create a container.
-
-        :param action: Action configuration.
-        :type action: ActionConfig
-        :param container_name: Container name.
-        :type container_name: unicode | str
-        :param kwargs: Additional keyword arguments to complement or override the configuration-based values.
-        :type kwargs: dict | NoneType
-        :return: Resulting keyword arguments.
-        :rtype: dict
+        Generates the keyword arguments for creating a container, without the fingerprint label. These are shared by
+        :meth:`get_container_create_kwargs` and :meth:`get_container_fingerprint`.
         """
         policy = self._policy
         client_config = action.client_config
@@ -184,15 +195,15 @@ class DockerConfigMixin(object):
                                 client_config.features['volumes']),
             user=extract_user(container_config.user),
             ports=[resolve_value(port_binding.exposed_port)
-                   for port_binding in container_config.exposes if port_binding.exposed_port],
+                   for port_binding in container_config.get_value('exposes') if port_binding.exposed_port],
             domainname=resolve_value(client_config.get('domainname', container_map.default_domain)) or None,
         )
         if container_map.set_hostname or container_map.set_hostname is NotSet:
             c_kwargs['hostname'] = policy.get_hostname(container_name, action.client_name)
         if container_config.network_mode == 'none':
             c_kwargs['network_disabled'] = True
-        elif client_config.features['networks'] and container_config.networks:
-            first_network = container_config.networks[0]
+        elif client_config.features['networks'] and container_config.get_value('networks'):
+            first_network = container_config.get_value('networks')[0]
             c_kwargs['networking_config'] = NetworkingConfig({
                 policy.nname(action.config_id.map_name, first_network.network_name): EndpointConfig(
                     client_config.version, **self.get_network_create_endpoint_kwargs(action, first_network)
@@ -213,9 +224,59 @@ class DockerConfigMixin(object):
             c_kwargs['stop_timeout'] = container_config.stop_timeout
         if client_config.features['healthcheck'] and container_config.healthcheck:
             c_kwargs['healthcheck'] = container_config.healthcheck._asdict()
-        update_kwargs(c_kwargs, init_options(container_config.create_options), kwargs)
+        if client_config.features['labels']:
+            c_kwargs['labels'] = policy.get_labels(action.config_id)
+        update_kwargs(c_kwargs, init_options(container_config.get_value('create_options')), kwargs)
         return c_kwargs
 
+    def get_container_create_kwargs(self, action, container_name, kwargs=None):
+        """
+        Generates keyword arguments for the Docker client to create a container.
+
+        :param action: Action configuration.
+        :type action: ActionConfig
+        :param container_name: Container name.
+        :type container_name: unicode | str
+        :param kwargs: Additional keyword arguments to complement or override the configuration-based values. If any
+          are passed, the container is not labeled with a fingerprint, so that it is fully compared with the
+          configuration during updates.
+        :type kwargs: dict | NoneType
+        :return: Resulting keyword arguments.
+        :rtype: dict
+        """
+        use_fingerprint = not kwargs
+        c_kwargs = self._get_container_create_kwargs(action, container_name, kwargs)
+        fingerprint_label = self._policy.fingerprint_label
+        labels = c_kwargs.get('labels')
+        if use_fingerprint and fingerprint_label and isinstance(labels, dict):
+            labels[fingerprint_label] = self.get_container_fingerprint(action)
+        return c_kwargs
+
+    def get_container_fingerprint(self, action):
+        """
+        Generates a fingerprint of the create arguments that result from the container configuration. Keyword
+        arguments passed in at runtime are not considered. Neither are values that depend on the instance, i.e. the
+        container name, the instance label, and host binds, which are compared separately during updates. Therefore
+        the fingerprint is identical for all instances of a configuration on a client.
+
+        :param action: Action configuration.
+        :type action: ActionConfig
+        :return: Hexadecimal SHA-256 digest.
+        :rtype: unicode | str
+        """
+        policy = self._policy
+        config_id = action.config_id
+        c_kwargs = self._get_container_create_kwargs(action, policy.cname(config_id.map_name, config_id.config_name),
+                                                     None)
+        labels = c_kwargs.get('labels')
+        if labels:
+            labels.pop(policy.instance_label, None)
+        c_kwargs.pop('binds', None)
+        host_config = c_kwargs.get('host_config')
+        if host_config:
+            c_kwargs['host_config'] = {key: value for key, value in iteritems(host_config) if key != 'Binds'}
+        return get_kwargs_fingerprint(c_kwargs)
+
     def get_container_host_config_kwargs(self, action, container_name, kwargs=None):
         """
         Generates keyword arguments for the Docker client to set up the HostConfig or start a container.
@@ -240,7 +301,7 @@ class DockerConfigMixin(object):
 
         c_kwargs = dict(
             links=[(cname(map_name, l_name), alias or policy.get_hostname(l_name))
-                   for l_name, alias in container_config.links],
+                   for l_name, alias in container_config.get_value('links')],
             binds=get_host_binds(container_map, config_id.config_name, container_config, config_id.instance_name,
                                  policy, supports_volumes),
             volumes_from=get_volumes_from(container_map, config_id.config_name, container_config,
@@ -254,7 +315,7 @@ class DockerConfigMixin(object):
             c_kwargs['network_mode'] = network_mode
         if container_name:
             c_kwargs['container'] = container_name
-        update_kwargs(c_kwargs, init_options(container_config.host_config), kwargs)
+        update_kwargs(c_kwargs, init_options(container_config.get_value('host_config')), kwargs)
         return c_kwargs
 
     def get_attached_container_create_kwargs(self, action, container_name, kwargs=None):
@@ -282,6 +343,8 @@ class DockerConfigMixin(object):
             user=user,
             network_disabled=True,
         )
+        if client_config.features['labels']:
+            c_kwargs['labels'] = policy.get_labels(config_id)
         hc_extra_kwargs = kwargs.pop('host_config', None) if kwargs else None
         use_host_config = client_config.features['host_config']
         if use_host_config:
@@ -441,6 +504,8 @@ class DockerConfigMixin(object):
         )
         if config.internal:
             c_kwargs['internal'] = True
+        if action.client_config.features['labels']:
+            c_kwargs['labels'] = self._policy.get_labels(action.config_id)
         driver_opts = init_options(config.driver_options)
         if driver_opts:
             c_kwargs['options'] = {option_name: resolve_value(option_value)
@@ -610,6 +675,8 @@ class DockerConfigMixin(object):
         """
         config = action.config
         c_kwargs = dict(name=volume_name)
+        if action.client_config.features['labels']:
+            c_kwargs['labels'] = self._policy.get_labels(action.config_id)
         if config:
             c_kwargs['driver'] = config.driver
             driver_opts = init_options(config.driver_options)
@@ -640,7 +707,7 @@ class DockerConfigMixin(object):
 
 
 class DockerClientRunner(DockerBaseRunnerMixin, DockerConfigMixin, AttachedPreparationMixin, ExecMixin, SignalMixin,
-                         ScriptMixin, NetworkUtilMixin, ImageMixin, AbstractRunner):
+                         ScriptMixin, NetworkUtilMixin, ImageMixin, ReadyCheckMixin, AbstractRunner):
     """
     Runs actions on a Docker client and returns results from the API.
     """
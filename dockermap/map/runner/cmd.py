@@ -64,7 +64,7 @@ class ExecMixin(object):
           if either no commands have been run or no values have been returned from the API.
         :rtype: list[dict] | NoneType
         """
-        config_cmds = action.config.exec_commands
+        config_cmds = action.config.get_value('exec_commands')
         if not config_cmds:
             return None
         return self.exec_commands(action, c_name, run_cmds=config_cmds)
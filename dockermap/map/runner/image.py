@@ -2,6 +2,9 @@
 from __future__ import unicode_literals
 
 import logging
+import threading
+
+from concurrent.futures import Future
 
 from ...docker_api import INSECURE_REGISTRIES
 from ..action import ImageAction
@@ -22,13 +25,58 @@ def _check_insecure_registry(kwargs):
 
 
 class ImageMixin(object):
+    """
+    Pulls images. Pulls can run concurrently, e.g. when the runner processes waves of actions with multiple workers.
+    The number of concurrent pulls can be limited per client using ``pull_limit_per_client`` and per registry using
+    ``pull_limit_per_registry``. Pulls of the same repository and tag on the same Docker daemon are only performed
+    once per run; further requests wait for the pull in progress and return its result. Registry logins are performed
+    once before any pull from that registry.
+    """
     action_method_names = [
         (ItemType.IMAGE, ImageAction.PULL, 'pull'),
     ]
+    pull_limit_per_client = None
+    pull_limit_per_registry = None
+    policy_options = ['pull_limit_per_client', 'pull_limit_per_registry']
 
     def __init__(self, *args, **kwargs):
         super(ImageMixin, self).__init__(*args, **kwargs)
         self._login_registries = set()
+        self._login_lock = threading.Lock()
+        self._pull_lock = threading.Lock()
+        self._pulls = {}
+        self._pull_semaphores = {}
+
+    def _get_pull_semaphore(self, key, limit):
+        if not limit:
+            return None
+        with self._pull_lock:
+            semaphore = self._pull_semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._pull_semaphores[key] = threading.BoundedSemaphore(limit)
+        return semaphore
+
+    def _pull_image(self, action, registry, **kwargs):
+        config_id = action.config_id
+        semaphores = [s for s in (self._get_pull_semaphore(('client', action.client_name),
+                                                           self.pull_limit_per_client),
+                                  self._get_pull_semaphore(('registry', registry), self.pull_limit_per_registry))
+                      if s is not None]
+        for semaphore in semaphores:
+            semaphore.acquire()
+        try:
+            log.info("Pulling image %s:%s.", config_id.config_name, config_id.instance_name)
+            res = action.client.pull(repository=config_id.config_name, tag=config_id.instance_name, **kwargs)
+        finally:
+            for semaphore in reversed(semaphores):
+                semaphore.release()
+        log.debug("Done pulling image %s:%s.", config_id.config_name, config_id.instance_name)
+        return res
+
+    def _refresh_repo(self, action):
+        config_name = action.config_id.config_name
+        self._policy.images[action.client_name].refresh_repo(config_name)
+        log.debug("Refreshed image cache for repo %s.", config_name)
 
     def login(self, action, registry, **kwargs):
         """
@@ -76,11 +124,31 @@ class ImageMixin(object):
         login_kwargs = {}
         if _check_insecure_registry(kwargs):
             login_kwargs['insecure_registry'] = True
-        if registry and '.' in registry and registry not in self._login_registries:
-            self.login(action, registry, **login_kwargs)
-        log.info("Pulling image %s:%s.", config_id.config_name, config_id.instance_name)
-        res = action.client.pull(repository=config_id.config_name, tag=config_id.instance_name, **kwargs)
-        log.debug("Done pulling image %s:%s.", config_id.config_name, config_id.instance_name)
-        self._policy.images[action.client_name].refresh_repo(config_id.config_name)
-        log.debug("Refreshed image cache for repo %s.", config_id.config_name)
+        if registry and '.' in registry:
+            with self._login_lock:
+                if registry not in self._login_registries:
+                    self.login(action, registry, **login_kwargs)
+        pull_key = (getattr(action.client, 'base_url', None) or action.client_name, config_id.config_name,
+                    config_id.instance_name)
+        with self._pull_lock:
+            current = self._pulls.get(pull_key)
+            if current is None:
+                pull_future = Future()
+                self._pulls[pull_key] = pull_future, action.client_name
+        if current is None:
+            try:
+                res = self._pull_image(action, registry, **kwargs)
+                self._refresh_repo(action)
+            except Exception as e:
+                with self._pull_lock:
+                    del self._pulls[pull_key]
+                pull_future.set_exception(e)
+                raise
+            pull_future.set_result(res)
+            return res
+        pull_future, pull_client_name = current
+        log.debug("Image %s:%s has already been requested for pulling.", config_id.config_name, config_id.instance_name)
+        res = pull_future.result()
+        if pull_client_name != action.client_name:
+            self._refresh_repo(action)
         return res
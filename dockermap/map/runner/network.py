@@ -96,4 +96,4 @@ class NetworkUtilMixin(object):
         :type kwargs: dict
         """
         kwargs.setdefault('skip_first', True)
-        self.connect_networks(action, container_name, action.config.networks, **kwargs)
+        self.connect_networks(action, container_name, action.config.get_value('networks'), **kwargs)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import logging
+import socket
+import time
+
+import six
+
+from ..exceptions import ContainerNotReadyError
+from ..input import ReadyCheck
+
+log = logging.getLogger(__name__)
+
+
+def _get_running_state(client, c_name):
+    details = client.inspect_container(c_name)
+    state = details['State']
+    if not state.get('Running'):
+        exit_code = state.get('ExitCode')
+        if exit_code == 0 and not state.get('Restarting'):
+            # One-shot containers that have completed successfully do not have to be awaited.
+            log.debug("Container %s has exited successfully.", c_name)
+            return None
+        raise ContainerNotReadyError("Container stopped before it was ready.", c_name, exit_code)
+    return details
+
+
+def _get_ip_address(details):
+    network_settings = details.get('NetworkSettings') or {}
+    ip_address = network_settings.get('IPAddress')
+    if ip_address:
+        return ip_address
+    for endpoint in six.itervalues(network_settings.get('Networks') or {}):
+        ip_address = endpoint.get('IPAddress')
+        if ip_address:
+            return ip_address
+    return None
+
+
+def probe_healthcheck(client, c_name):
+    """
+    Checks the health status of a container. Containers without a healthcheck are considered ready as soon as they are
+    running, and containers that have exited with code ``0`` are considered ready as well.
+
+    :param client: Docker client.
+    :type client: docker.client.Client
+    :param c_name: Container name.
+    :type c_name: unicode | str
+    :return: ``True`` if the container is healthy, ``False`` if it is still starting.
+    :rtype: bool
+    """
+    details = _get_running_state(client, c_name)
+    if details is None:
+        return True
+    health = details['State'].get('Health')
+    if not health:
+        return True
+    status = health.get('Status')
+    if status == 'unhealthy':
+        raise ContainerNotReadyError("Container reported as unhealthy.", c_name)
+    return status == 'healthy'
+
+
+def get_tcp_probe(port, connect_timeout=1):
+    """
+    Generates a probe function that attempts to connect to a TCP port on the container. Note that the container
+    network has to be reachable from where the client is run, e.g. on the Docker host. Containers that have exited
+    with code ``0`` are considered ready.
+
+    :param port: Port number.
+    :type port: int
+    :param connect_timeout: Timeout in seconds for each connection attempt.
+    :type connect_timeout: float
+    :return: Probe function.
+    :rtype: (docker.client.Client, unicode | str) -> bool
+    """
+    def _probe_tcp(client, c_name):
+        details = _get_running_state(client, c_name)
+        if details is None:
+            return True
+        ip_address = _get_ip_address(details)
+        if not ip_address:
+            return False
+        try:
+            conn = socket.create_connection((ip_address, port), timeout=connect_timeout)
+        except (socket.error, socket.timeout):
+            return False
+        conn.close()
+        return True
+
+    return _probe_tcp
+
+
+class ReadyCheckMixin(object):
+    """
+    Waits for containers to become ready after their start, polling a probe with exponential backoff until the deadline
+    is reached. The probe is set in :attr:`~dockermap.map.config.container.ContainerConfiguration.ready_check`. If the
+    option ``wait_for_healthcheck`` is set, containers without a ``ready_check`` are awaited until they report as
+    healthy.
+    """
+    wait_for_healthcheck = False
+    policy_options = ['wait_for_healthcheck']
+
+    def get_container_ready_check(self, action):
+        """
+        Returns the readiness check for a container configuration.
+
+        :param action: Action configuration.
+        :type action: dockermap.map.runner.ActionConfig
+        :return: Readiness check tuple, or ``None`` if the container does not have to be awaited.
+        :rtype: dockermap.map.input.ReadyCheck | NoneType
+        """
+        ready_check = action.config.ready_check
+        if ready_check:
+            return ready_check
+        if self.wait_for_healthcheck:
+            return ReadyCheck()
+        return None
+
+    def get_ready_probe(self, probe):
+        """
+        Returns the probe function for the probe setting of a readiness check.
+
+        :param probe: Probe setting: ``healthcheck``, a port number, or a callable.
+        :type probe: unicode | str | int | callable
+        :return: Probe function, accepting a client and the container name.
+        :rtype: (docker.client.Client, unicode | str) -> bool
+        """
+        if probe == 'healthcheck':
+            return probe_healthcheck
+        elif isinstance(probe, six.integer_types):
+            return get_tcp_probe(probe)
+        elif callable(probe):
+            return probe
+        raise ValueError("Invalid readiness probe.", probe)
+
+    def wait_ready(self, action, c_name, ready_check):
+        """
+        Waits until a container is ready.
+
+        :param action: Action configuration.
+        :type action: dockermap.map.runner.ActionConfig
+        :param c_name: Container name.
+        :type c_name: unicode | str
+        :param ready_check: Readiness check.
+        :type ready_check: dockermap.map.input.ReadyCheck
+        """
+        probe = self.get_ready_probe(ready_check.probe)
+        interval = ready_check.interval or 0.1
+        max_interval = ready_check.max_interval or interval
+        if ready_check.timeout is None:
+            deadline = None
+        else:
+            deadline = time.time() + ready_check.timeout
+        log.debug("Waiting for container %s to become ready.", c_name)
+        while not probe(action.client, c_name):
+            if deadline is None:
+                wait_time = interval
+            else:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise ContainerNotReadyError("Container did not become ready in time.", c_name,
+                                                 ready_check.timeout)
+                wait_time = min(interval, remaining)
+            time.sleep(wait_time)
+            interval = min(interval * 2, max_interval)
+        log.debug("Container %s is ready.", c_name)
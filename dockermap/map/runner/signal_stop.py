@@ -32,6 +32,7 @@ class SignalMixin(object):
         client = action.client
         sig = action.config.stop_signal
         stop_kwargs = self.get_container_stop_kwargs(action, c_name, kwargs=kwargs)
+        self._discard_summary(action, c_name)
         if not sig or sig == 'SIGTERM' or sig == signal.SIGTERM:
             try:
                 client.stop(**stop_kwargs)
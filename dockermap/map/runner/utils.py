@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import hashlib
 import itertools
+import json
 import six
 from six.moves import map, filter
 
@@ -62,6 +64,20 @@ def update_kwargs(kwargs, *updates):
                 kwargs[key] = u_item
 
 
+def get_kwargs_fingerprint(kwargs):
+    """
+    Generates a stable hash from keyword arguments, e.g. the ones used for creating a container. Mapping keys are
+    sorted, so that the order in which they have been set does not make a difference.
+
+    :param kwargs: Keyword arguments.
+    :type kwargs: dict
+    :return: Hexadecimal SHA-256 digest.
+    :rtype: unicode | str
+    """
+    data = json.dumps(kwargs, sort_keys=True, separators=(',', ':'), default=six.text_type)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
 def get_volumes(container_map, config, default_volume_paths, include_named):
     """
     Generates volume paths for the ``volumes`` argument during container creation.
@@ -101,11 +117,11 @@ def get_volumes(container_map, config, default_volume_paths, include_named):
             return resolve_value(default_volume_paths.get(vol.name.partition('.')[2]))
         return resolve_value(default_volume_paths.get(vol.name))
 
-    volumes = list(map(resolve_value, config.shares))
-    volumes.extend(map(_bind_volume_path, config.binds))
+    volumes = list(map(resolve_value, config.get_value('shares')))
+    volumes.extend(map(_bind_volume_path, config.get_value('binds')))
     if include_named:
-        volumes.extend(map(_attached_volume_path, config.attaches))
-        volumes.extend(filter(None, map(_used_volume_path, config.uses)))
+        volumes.extend(map(_attached_volume_path, config.get_value('attaches')))
+        volumes.extend(filter(None, map(_used_volume_path, config.get_value('uses'))))
     return volumes
 
 
@@ -152,18 +168,18 @@ def get_volumes_from(container_map, config_name, config, policy, include_volumes
     use_attached_parent_name = container_map.use_attached_parent_name
     if include_volumes:
         volumes_from = [volume_str(volume_or_container_name(u.name), u.readonly)
-                        for u in config.uses]
+                        for u in config.get_value('uses')]
         a_parent_name = config_name if use_attached_parent_name else None
         volumes_from.extend([aname(map_name, attached.name, a_parent_name)
-                             for attached in config.attaches])
+                             for attached in config.get_value('attaches')])
         return volumes_from
 
     if use_attached_parent_name:
         return [volume_str(container_name(u.name), u.readonly)
-                for u in config.uses
+                for u in config.get_value('uses')
                 if u.name.partition('.')[2] not in volume_names]
     return [volume_str(container_name(u.name), u.readonly)
-            for u in config.uses
+            for u in config.get_value('uses')
             if u.name not in volume_names]
 
 
@@ -213,10 +229,10 @@ def get_host_binds(container_map, config_name, config, instance, policy, named_v
     use_attached_parent_name = container_map.use_attached_parent_name
     default_paths = policy.default_volume_paths[map_name]
     bind = [volume_str(get_shared_volume_path(container_map, shared_volume, instance), shared_volume.readonly)
-            for shared_volume in config.binds]
+            for shared_volume in config.get_value('binds')]
     if named_volumes:
-        bind.extend(map(_attached_volume, config.attaches))
-        bind.extend(filter(None, map(_used_volume, config.uses)))
+        bind.extend(map(_attached_volume, config.get_value('attaches')))
+        bind.extend(filter(None, map(_used_volume, config.get_value('uses'))))
     return bind
 
 
@@ -256,7 +272,7 @@ def get_port_bindings(container_config, client_config):
     if_ipv4 = client_config.interfaces
     if_ipv6 = client_config.interfaces_ipv6
     for exposed_port, ex_port_bindings in itertools.groupby(
-            sorted(container_config.exposes, key=_get_ex_port), _get_ex_port):
+            sorted(container_config.get_value('exposes'), key=_get_ex_port), _get_ex_port):
         bind_list = list(_get_port_bindings(ex_port_bindings, if_ipv4, if_ipv6))
         if bind_list:
             port_bindings[exposed_port] = bind_list
@@ -3,8 +3,12 @@ from __future__ import unicode_literals
 
 import itertools
 from abc import abstractmethod
+from collections import defaultdict
 import logging
+import re
 
+from concurrent.futures import ThreadPoolExecutor
+import six
 from six import with_metaclass
 
 from ...utils import format_image_tag
@@ -27,6 +31,47 @@ class _ObjectNotFound(object):
 
 NOT_FOUND = _ObjectNotFound()
 
+EXITED_STATUS_PATTERN = re.compile(r'^Exited \((-?\d+)\)')
+
+
+def get_summary_detail(summary):
+    """
+    Converts the summary information of a container from the client's container listing into the format of
+    ``inspect_container``, as far as it is needed for determining the basic container state. The process id is not
+    included.
+
+    :param summary: Container information from the listing.
+    :type summary: dict
+    :return: Container details with ``Id`` and ``State``. Returns ``None`` if the status information is not available
+      or cannot be interpreted.
+    :rtype: dict | NoneType
+    """
+    status = summary.get('State')
+    if status in ('running', 'paused', 'restarting'):
+        c_state = {
+            'Running': True,
+            'Restarting': status == 'restarting',
+        }
+    elif status == 'created':
+        c_state = {
+            'Running': False,
+            'Restarting': False,
+            'StartedAt': INITIAL_START_TIME,
+        }
+    elif status == 'exited':
+        exit_match = EXITED_STATUS_PATTERN.match(summary.get('Status') or '')
+        if not exit_match:
+            return None
+        c_state = {
+            'Running': False,
+            'Restarting': False,
+            'ExitCode': int(exit_match.group(1)),
+            'StartedAt': None,
+        }
+    else:
+        return None
+    return {'Id': summary['Id'], 'State': c_state}
+
 
 class AbstractState(object):
     """
@@ -93,6 +138,8 @@ class ContainerBaseState(AbstractState):
     :param config_flags: Config flags on the container.
     :type config_flags: int
     """
+    summary_detail = True
+
     def __init__(self, *args, **kwargs):
         super(ContainerBaseState, self).__init__(*args, **kwargs)
         self.config = config = self.container_map.get_existing(self.config_id.config_name)
@@ -120,7 +167,14 @@ class ContainerBaseState(AbstractState):
             container_name = policy.cname(config_id.map_name, config_id.config_name, config_id.instance_name)
 
         self.container_name = container_name
-        if container_name in policy.container_names[self.client_name]:
+        container_names = policy.container_names[self.client_name]
+        if container_name in container_names:
+            if self.summary_detail and self.options.get('summary_states'):
+                summary = container_names.get_summary(container_name)
+                detail = summary and get_summary_detail(summary)
+                if detail:
+                    self.detail = detail
+                    return
             self.detail = self.client.inspect_container(container_name)
         else:
             self.detail = NOT_FOUND
@@ -137,7 +191,8 @@ class ContainerBaseState(AbstractState):
         if c_status['Running']:
             base_state = State.RUNNING
             state_flag = StateFlags.NONE
-            extra_data['pid'] = c_status['Pid']
+            if 'Pid' in c_status:
+                extra_data['pid'] = c_status['Pid']
         else:
             base_state = State.PRESENT
             if c_status['StartedAt'] == INITIAL_START_TIME:
@@ -293,6 +348,20 @@ class ImageBaseState(AbstractState):
 class AbstractStateGenerator(with_metaclass(ABCPolicyUtilMeta, PolicyUtil)):
     """
     Abstract base implementation for an state generator, which determines the current state of containers on the client.
+    If the option ``client_names`` is set, states are only generated for the listed clients.
+
+    With ``summary_states`` enabled, the container listing of each client is refreshed once per state
+    generator, and the basic container states are derived from it, instead of inspecting every container separately.
+    Clients whose caches are updated from the event stream are not refreshed. Summaries of containers that have
+    changed their state since the listing are discarded, from events and when the runner starts, stops, restarts,
+    kills, or updates a container.
+    This does not apply to container state classes that require full details (where ``summary_detail`` is
+    ``False``).
+
+    If ``prefetch_workers`` is set, the states of all items (or of each wave) are inspected concurrently with up to
+    that number of threads per client, before they are evaluated in order. Note that for items of later waves, the
+    details are then fetched before the actions on earlier items have been performed; when running actions in waves,
+    this only applies within each wave.
     """
     container_state_class = ContainerBaseState
     network_state_class = NetworkBaseState
@@ -301,7 +370,22 @@ class AbstractStateGenerator(with_metaclass(ABCPolicyUtilMeta, PolicyUtil)):
 
     nonrecoverable_exit_codes = (-127, -1)
     force_update = None
-    policy_options = ['nonrecoverable_exit_codes', 'force_update']
+    client_names = None
+    summary_states = False
+    prefetch_workers = None
+    policy_options = ['nonrecoverable_exit_codes', 'force_update', 'client_names', 'summary_states',
+                      'prefetch_workers']
+
+    def __init__(self, *args, **kwargs):
+        super(AbstractStateGenerator, self).__init__(*args, **kwargs)
+        self._summary_clients = set()
+
+    def _refresh_container_summaries(self, client_name):
+        if (self.summary_states and getattr(self.container_state_class, 'summary_detail', False) and
+                client_name not in self._summary_clients):
+            if not self._policy.is_monitored(client_name):
+                self._policy.container_names.refresh(client_name)
+            self._summary_clients.add(client_name)
 
     def get_container_state(self, *args, **kwargs):
         return self.container_state_class(self._policy, self.get_options(), *args, **kwargs)
@@ -315,30 +399,32 @@ class AbstractStateGenerator(with_metaclass(ABCPolicyUtilMeta, PolicyUtil)):
     def get_image_state(self, *args, **kwargs):
         return self.image_state_class(self._policy, self.get_options(), *args, **kwargs)
 
-    def generate_config_states(self, config_id, config_flags=ConfigFlags.NONE):
+    def get_config_state_objects(self, config_id, config_flags=ConfigFlags.NONE):
         """
-        Generates the actions on a single item, which can be either a dependency or a explicitly selected
-        container.
+        Generates the state objects of a single item on each client, without inspecting them yet.
 
         :param config_id: Configuration id tuple.
         :type config_id: dockermap.map.input.MapConfigId
         :param config_flags: Optional configuration flags.
         :type config_flags: dockermap.map.policy.ConfigFlags
-        :return: Generator for container state information.
-        :rtype: collections.Iterable[dockermap.map.state.ContainerConfigStates]
+        :return: Generator for state objects.
+        :rtype: collections.Iterable[AbstractState]
         """
-        c_map = self._policy.container_maps[config_id.map_name]
-        clients = c_map.clients or [self._policy.default_client_name]
+        clients = self._policy.get_client_names(config_id)
+        if self.client_names is not None:
+            clients = [client_name for client_name in clients if client_name in self.client_names]
         config_type = config_id.config_type
 
         for client_name in clients:
             if config_type == ItemType.CONTAINER:
+                self._refresh_container_summaries(client_name)
                 c_state = self.get_container_state(client_name, config_id, config_flags)
             elif config_type == ItemType.VOLUME:
                 client_config = self._policy.clients[client_name]
                 if client_config.features['volumes']:
                     c_state = self.get_volume_state(client_name, config_id, config_flags)
                 else:
+                    self._refresh_container_summaries(client_name)
                     c_state = self.get_container_state(client_name, config_id, config_flags)
             elif config_type == ItemType.NETWORK:
                 c_state = self.get_network_state(client_name, config_id, config_flags)
@@ -346,11 +432,60 @@ class AbstractStateGenerator(with_metaclass(ABCPolicyUtilMeta, PolicyUtil)):
                 c_state = self.get_image_state(client_name, config_id, config_flags)
             else:
                 raise ValueError("Invalid configuration type.", config_type)
+            yield c_state
+
+    def _get_state_info(self, c_state):
+        # Extract base state, state flags, and extra info.
+        state_info = ConfigState(c_state.client_name, c_state.config_id, c_state.config_flags, *c_state.get_state())
+        log.debug("Configuration state information: %s", state_info)
+        return state_info
+
+    def generate_config_states(self, config_id, config_flags=ConfigFlags.NONE):
+        """
+        Generates the actions on a single item, which can be either a dependency or a explicitly selected
+        container.
+
+        :param config_id: Configuration id tuple.
+        :type config_id: dockermap.map.input.MapConfigId
+        :param config_flags: Optional configuration flags.
+        :type config_flags: dockermap.map.policy.ConfigFlags
+        :return: Generator for container state information.
+        :rtype: collections.Iterable[dockermap.map.state.ContainerConfigStates]
+        """
+        for c_state in self.get_config_state_objects(config_id, config_flags):
             c_state.inspect()
-            # Extract base state, state flags, and extra info.
-            state_info = ConfigState(client_name, config_id, config_flags, *c_state.get_state())
-            log.debug("Configuration state information: %s", state_info)
-            yield state_info
+            yield self._get_state_info(c_state)
+
+    def generate_prefetched_states(self, config_items):
+        """
+        Generates the states of multiple items. All items are inspected concurrently before the first state is
+        returned, using up to ``prefetch_workers`` threads per client. States are returned in the original order.
+
+        :param config_items: Configuration id tuples and configuration flags.
+        :type config_items: collections.Iterable[(dockermap.map.input.MapConfigId, dockermap.map.policy.ConfigFlags)]
+        :return: Generator for container state information.
+        :rtype: collections.Iterable[dockermap.map.state.ContainerConfigStates]
+        """
+        state_objects = [c_state
+                         for config_id, config_flags in config_items
+                         for c_state in self.get_config_state_objects(config_id, config_flags)]
+        client_states = defaultdict(list)
+        for c_state in state_objects:
+            client_states[c_state.client_name].append(c_state)
+        executors = [ThreadPoolExecutor(min(self.prefetch_workers, len(c_states)))
+                     for c_states in six.itervalues(client_states)]
+        try:
+            futures = [executor.submit(c_state.inspect)
+                       for executor, c_states in zip(executors, six.itervalues(client_states))
+                       for c_state in c_states]
+            log.debug("Prefetching %s configuration states.", len(futures))
+            for future in futures:
+                future.result()
+        finally:
+            for executor in executors:
+                executor.shutdown()
+        for c_state in state_objects:
+            yield self._get_state_info(c_state)
 
     @abstractmethod
     def get_states(self, config_ids):
@@ -364,6 +499,19 @@ class AbstractStateGenerator(with_metaclass(ABCPolicyUtilMeta, PolicyUtil)):
         """
         pass
 
+    def get_state_waves(self, config_ids):
+        """
+        Generates state information for the selected containers in waves, where no configuration of a wave depends on
+        another configuration of the same wave. States of each wave should only be evaluated after all actions of the
+        previous waves have been performed. This implementation returns all states in one wave.
+
+        :param config_ids: MapConfigId tuples.
+        :type config_ids: list[dockermap.map.input.MapConfigId]
+        :return: Iterable of waves, each with an iterable of configuration states.
+        :rtype: collections.Iterable[collections.Iterable[dockermap.map.state.ConfigState]]
+        """
+        yield self.get_states(config_ids)
+
     @property
     def policy(self):
         """
@@ -389,6 +537,8 @@ class SingleStateGenerator(AbstractStateGenerator):
         :return: Iterable of configuration states.
         :rtype: collections.Iterable[dockermap.map.state.ConfigState]
         """
+        if self.prefetch_workers:
+            return self.generate_prefetched_states((config_id, ConfigFlags.NONE) for config_id in config_ids)
         return itertools.chain.from_iterable(self.generate_config_states(config_id)
                                              for config_id in config_ids)
 
@@ -418,6 +568,16 @@ class AbstractDependencyStateGenerator(with_metaclass(ABCPolicyUtilMeta, Abstrac
         for state in self.generate_config_states(config_id):
             yield state
 
+    def _get_merged_paths(self, config_ids):
+        input_paths = [
+            (config_id, list(self.get_dependency_path(config_id)))
+            for config_id in config_ids
+        ]
+        log.debug("Dependency paths from input: %s", input_paths)
+        dependency_paths = merge_dependency_paths(input_paths)
+        log.debug("Merged dependency paths: %s", dependency_paths)
+        return dependency_paths
+
     def get_states(self, config_ids):
         """
         Generates state information for the selected container and its dependencies / dependents.
@@ -427,15 +587,62 @@ class AbstractDependencyStateGenerator(with_metaclass(ABCPolicyUtilMeta, Abstrac
         :return: Iterable of configuration states.
         :rtype: collections.Iterable[dockermap.map.state.ConfigState]
         """
-        input_paths = [
-            (config_id, list(self.get_dependency_path(config_id)))
-            for config_id in config_ids
-        ]
-        log.debug("Dependency paths from input: %s", input_paths)
-        dependency_paths = merge_dependency_paths(input_paths)
-        log.debug("Merged dependency paths: %s", dependency_paths)
+        if self.prefetch_workers:
+            return self.generate_prefetched_states(
+                item
+                for config_id, dependency_path in self._get_merged_paths(config_ids)
+                for item in itertools.chain(((d_config_id, ConfigFlags.DEPENDENT) for d_config_id in dependency_path),
+                                            [(config_id, ConfigFlags.NONE)])
+            )
         return itertools.chain.from_iterable(self._get_all_states(config_id, dependency_path)
-                                             for config_id, dependency_path in dependency_paths)
+                                             for config_id, dependency_path in self._get_merged_paths(config_ids))
+
+    def get_config_waves(self, config_ids):
+        """
+        Groups the selected configurations and their dependencies / dependents into topological waves. Each item is
+        placed in the wave following the latest wave of any item on its dependency path. Within a wave, items retain
+        the order in which :meth:`get_states` would process them.
+
+        :param config_ids: MapConfigId tuples.
+        :type config_ids: list[dockermap.map.input.MapConfigId]
+        :return: List of waves, each with a list of configuration ids and their configuration flags.
+        :rtype: list[list[(dockermap.map.input.MapConfigId, dockermap.map.policy.ConfigFlags)]]
+        """
+        def _add_item(item_id, item_flags):
+            if item_id in item_waves:
+                return
+            path_waves = [item_waves[d] for d in self.get_dependency_path(item_id) if d in item_waves]
+            wave_index = max(path_waves) + 1 if path_waves else 0
+            item_waves[item_id] = wave_index
+            if wave_index == len(waves):
+                waves.append([])
+            waves[wave_index].append((item_id, item_flags))
+
+        item_waves = {}
+        waves = []
+        for config_id, dependency_path in self._get_merged_paths(config_ids):
+            for d_config_id in dependency_path:
+                _add_item(d_config_id, ConfigFlags.DEPENDENT)
+            _add_item(config_id, ConfigFlags.NONE)
+        log.debug("Configuration waves: %s", waves)
+        return waves
+
+    def get_state_waves(self, config_ids):
+        """
+        Generates state information for the selected container and its dependencies / dependents, grouped into waves
+        as determined by :meth:`get_config_waves`. States of a wave are only generated when it is being iterated over.
+
+        :param config_ids: MapConfigId tuples.
+        :type config_ids: list[dockermap.map.input.MapConfigId]
+        :return: Iterable of waves, each with an iterable of configuration states.
+        :rtype: collections.Iterable[collections.Iterable[dockermap.map.state.ConfigState]]
+        """
+        for wave in self.get_config_waves(config_ids):
+            if self.prefetch_workers:
+                yield self.generate_prefetched_states(wave)
+                continue
+            yield itertools.chain.from_iterable(self.generate_config_states(config_id, config_flags=config_flags)
+                                                for config_id, config_flags in wave)
 
 
 class DependencyStateGenerator(AbstractDependencyStateGenerator):
@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 
 import logging
 import shlex
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 
 import six
 from docker import utils as docker_utils
@@ -12,6 +12,8 @@ from ....functional import resolve_value
 from ....utils import format_image_tag
 from ...input import ItemType, CmdCheck, ExecPolicy
 from ...policy.utils import get_instance_volumes, extract_user, init_options
+from ...runner import ActionConfig
+from ...runner.base import DockerConfigMixin
 from .. import StateFlags, State
 from ..base import ContainerBaseState
 
@@ -37,26 +39,8 @@ CONTAINER_UPDATE_VARS = [
 ]
 
 
-def _check_environment(c_config, instance_detail):
-    def _parse_env():
-        for env_str in instance_env:
-            var_name, sep, env_val = env_str.partition('=')
-            if sep:
-                yield var_name, env_val
-
-    create_options = init_options(c_config.create_options)
-    if not create_options:
-        return True
-    instance_env = instance_detail['Config']['Env'] or []
-    config_env = resolve_value(create_options.get('environment'))
-    if not config_env:
-        return True
-    current_env = dict(_parse_env())
-    log.debug("Checking environment. Config / container instance:\n%s\n%s", config_env, current_env)
-    for k, v in six.iteritems(config_env):
-        if current_env.get(k) != resolve_value(v):
-            return False
-    return True
+UpdateCheckPlan = namedtuple('UpdateCheckPlan', ['environment', 'cmd', 'entrypoint', 'ports', 'limits',
+                                                 'restart_policy', 'fingerprint'])
 
 
 def _strip_quotes(cmd_item):
@@ -73,80 +57,161 @@ def _normalize_cmd(cmd):
     return list(map(_strip_quotes, cmd))
 
 
-def _check_cmd(c_config, instance_detail):
-    create_options = init_options(c_config.create_options)
-    if not create_options:
+def _get_plan_environment(create_options):
+    config_env = resolve_value(create_options.get('environment'))
+    if not config_env:
+        return None
+    return {k: resolve_value(v) for k, v in six.iteritems(config_env)}
+
+
+def _get_plan_cmd(create_options):
+    config_cmd = resolve_value(create_options.get('command'))
+    if not config_cmd:
+        return None
+    return _normalize_cmd(config_cmd)
+
+
+def _get_plan_entrypoint(create_options):
+    config_entrypoint = resolve_value(create_options.get('entrypoint'))
+    if not config_entrypoint:
+        return None
+    if isinstance(config_entrypoint, six.string_types):
+        return [config_entrypoint]
+    return list(config_entrypoint)
+
+
+def _get_plan_ports(container_config, client_config):
+    ports = []
+    for port_binding in container_config.get_value('exposes'):
+        port = resolve_value(port_binding.exposed_port)
+        i_key = port if isinstance(port, six.string_types) and '/' in port else '{0}/tcp'.format(port)
+        bind_port = resolve_value(port_binding.host_port)
+        if bind_port:
+            interface = resolve_value(port_binding.interface)
+            if interface:
+                bind_addr = resolve_value(client_config.interfaces.get(interface))
+            else:
+                bind_addr = '0.0.0.0'
+            bind_config = {'HostIp': bind_addr, 'HostPort': six.text_type(bind_port)}
+        else:
+            bind_config = None
+        ports.append((i_key, bind_config))
+    return ports
+
+
+def _get_plan_limits(container_config, client_config):
+    constraints = client_config.constraints
+    c_host_config = container_config.get_value('host_config')
+    c_create_options = container_config.get_value('create_options')
+    limits = []
+    for inspect_key, config_key, check_co, check_cs, input_func in CONTAINER_UPDATE_VARS:
+        if check_cs and not constraints.get(config_key):
+            log.debug("Skipping check for {0} - not supported by the client.".format(config_key))
+            continue
+        c_value = c_host_config.get(config_key) or None
+        if not c_value and check_co:
+            c_value = c_create_options.get(config_key) or None
+        if config_key == 'memswap_limit' and not c_value:
+            # Has a dependent default value.
+            mem = c_host_config.get('mem_limit') or c_create_options.get('mem_limit')
+            if mem:
+                c_value = docker_utils.parse_bytes(mem) * 2
+        if c_value and input_func:
+            c_value = input_func(c_value)
+        limits.append((inspect_key, config_key, c_value))
+    return limits
+
+
+def get_update_check_plan(container_config, client_config, fingerprint=None):
+    """
+    Resolves and normalizes the values of a container configuration that are compared with the container instance
+    during updates. The result is identical for all instances of a configuration on a client, and can therefore be
+    re-used for each of them.
+
+    :param container_config: Container configuration.
+    :type container_config: dockermap.map.config.container.ContainerConfiguration
+    :param client_config: Client configuration.
+    :type client_config: dockermap.map.config.client.ClientConfiguration
+    :param fingerprint: Fingerprint of the configuration, as generated by
+      :meth:`~dockermap.map.runner.base.DockerConfigMixin.get_container_fingerprint`.
+    :type fingerprint: unicode | str | NoneType
+    :return: Expected values for the update checks.
+    :rtype: UpdateCheckPlan
+    """
+    create_options = init_options(container_config.get_value('create_options'))
+    if create_options:
+        environment = _get_plan_environment(create_options)
+        cmd = _get_plan_cmd(create_options)
+        entrypoint = _get_plan_entrypoint(create_options)
+    else:
+        environment = cmd = entrypoint = None
+    return UpdateCheckPlan(environment, cmd, entrypoint, _get_plan_ports(container_config, client_config),
+                           _get_plan_limits(container_config, client_config),
+                           container_config.get_value('host_config').get('restart_policy'), fingerprint)
+
+
+def _check_environment(check_plan, instance_detail):
+    def _parse_env():
+        for env_str in instance_env:
+            var_name, sep, env_val = env_str.partition('=')
+            if sep:
+                yield var_name, env_val
+
+    config_env = check_plan.environment
+    if not config_env:
         return True
+    instance_env = instance_detail['Config']['Env'] or []
+    current_env = dict(_parse_env())
+    log.debug("Checking environment. Config / container instance:\n%s\n%s", config_env, current_env)
+    for k, v in six.iteritems(config_env):
+        if current_env.get(k) != v:
+            return False
+    return True
+
+
+def _check_cmd(check_plan, instance_detail):
     instance_config = instance_detail['Config']
-    config_cmd = resolve_value(create_options.get('command')) if create_options else None
+    config_cmd = check_plan.cmd
     if config_cmd:
         instance_cmd = instance_config['Cmd'] or []
         log.debug("Checking command. Config / container instance:\n%s\n%s", config_cmd, instance_cmd)
-        if _normalize_cmd(config_cmd) != instance_cmd:
+        if config_cmd != instance_cmd:
             return False
-    config_entrypoint = resolve_value(create_options.get('entrypoint')) if create_options else None
+    config_entrypoint = check_plan.entrypoint
     if config_entrypoint:
         instance_entrypoint = instance_config['Entrypoint'] or []
         log.debug("Checking entrypoint. Config / container instance:\n%s\n%s", config_entrypoint, instance_entrypoint)
-        if isinstance(config_entrypoint, six.string_types):
-            if [config_entrypoint] != instance_entrypoint:
-                return False
-        elif list(config_entrypoint) != instance_entrypoint:
+        if config_entrypoint != instance_entrypoint:
             return False
     return True
 
 
-def _check_container_network_ports(container_config, client_config, instance_detail):
-    if not container_config.exposes:
+def _check_container_network_ports(check_plan, instance_detail):
+    if not check_plan.ports:
         return True
     instance_ports = instance_detail['NetworkSettings']['Ports'] or {}
-    for port_binding in container_config.exposes:
-        port = resolve_value(port_binding.exposed_port)
-        i_key = port if isinstance(port, six.string_types) and '/' in port else '{0}/tcp'.format(port)
+    for i_key, bind_config in check_plan.ports:
         log.debug("Looking up port %s configuration.", i_key)
         if i_key not in instance_ports:
             log.debug("Not found.")
             return False
-        bind_port = resolve_value(port_binding.host_port)
-        if bind_port:
+        if bind_config:
             i_val = instance_ports[i_key]
             if not i_val:
                 log.debug("Port is exposed but not published.")
                 return False
-            interface = resolve_value(port_binding.interface)
-            if interface:
-                bind_addr = resolve_value(client_config.interfaces.get(interface))
-            else:
-                bind_addr = '0.0.0.0'
-            bind_config = {'HostIp': bind_addr, 'HostPort': six.text_type(bind_port)}
             log.debug("Checking port. Config / container instance:\n%s\n%s", bind_config, i_val)
             if bind_config not in i_val:
                 return False
     return True
 
 
-def _check_limits(container_config, instance_detail, client_config):
-    constraints = client_config.constraints
+def _check_limits(check_plan, instance_detail):
     i_host_config = instance_detail['HostConfig']
-    c_host_config = container_config.host_config
-    c_create_options = container_config.create_options
     update_dict = {}
     needs_reset = False
-    for inspect_key, config_key, check_co, check_cs, input_func in CONTAINER_UPDATE_VARS:
-        if check_cs and not constraints.get(config_key):
-            log.debug("Skipping check for {0} - not supported by the client.".format(config_key))
-            continue
+    for inspect_key, config_key, c_value in check_plan.limits:
         i_value = i_host_config.get(inspect_key) or None
-        c_value = c_host_config.get(config_key) or None
-        if not c_value and check_co:
-            c_value = c_create_options.get(config_key) or None
-        if config_key == 'memswap_limit' and not c_value:
-            # Has a dependent default value.
-            mem = c_host_config.get('mem_limit') or c_create_options.get('mem_limit')
-            if mem:
-                c_value = docker_utils.parse_bytes(mem) * 2
-        if c_value and input_func:
-            c_value = input_func(c_value)
         if i_value or c_value:
             log.debug("Comparing host-config variable %s - Container: %s - Config: %s.", inspect_key, i_value, c_value)
             if i_value != c_value:
@@ -161,8 +226,8 @@ def _check_limits(container_config, instance_detail, client_config):
     return update_dict, needs_reset
 
 
-def _check_restart_policy(container_config, instance_detail):
-    c_restart_policy = container_config.host_config.get('restart_policy')
+def _check_restart_policy(check_plan, instance_detail):
+    c_restart_policy = check_plan.restart_policy
     i_restart_policy = instance_detail['HostConfig'].get('RestartPolicy')
     if c_restart_policy and i_restart_policy:
         cr_name = c_restart_policy.get('Name')
@@ -181,13 +246,45 @@ def _check_restart_policy(container_config, instance_detail):
     return {}
 
 
+class ContainerConfigFingerprint(DockerConfigMixin):
+    """
+    Generates the fingerprint that containers would be labeled with, if they were created from the current
+    configuration.
+
+    :param policy: Policy object.
+    :type policy: dockermap.map.policy.base.BasePolicy
+    """
+    def __init__(self, policy):
+        self._policy = policy
+
+    def get_fingerprint(self, state):
+        """
+        :param state: Container state object.
+        :type state: UpdateContainerState
+        :return: Fingerprint of the create arguments.
+        :rtype: unicode | str
+        """
+        action = ActionConfig(state.client_name, state.config_id, state.client_config, state.client,
+                              state.container_map, state.config)
+        return self.get_container_fingerprint(action)
+
+
 class UpdateContainerState(ContainerBaseState):
     """
     Extends the base state by checking the current instance detail against the container configuration and volumes
-    other containers. Also checks if the container image matches the configured image's id.
+    other containers. Also checks if the container image matches the configured image's id. Always inspects the
+    container, since the summary information is not sufficient for these checks.
+
+    If the container has been labeled with a fingerprint of its create arguments, and it matches the current
+    configuration, checks of links, environment, command, ports, and network mode are skipped, since these cannot have
+    changed without re-creating the container.
     """
+    summary_detail = False
+
     def __init__(self, *args, **kwargs):
         super(UpdateContainerState, self).__init__(*args, **kwargs)
+        self.config_fingerprint = None
+        self.check_plans = None
         self.volume_checker = None
         self.endpoint_registry = None
         self.current_commands = None
@@ -198,7 +295,7 @@ class UpdateContainerState(ContainerBaseState):
         for host_link in instance_links:
             link_name, __, link_alias = host_link.partition(':')
             link_dict[link_name[1:]].add(link_alias.rpartition('/')[2])
-        for link in self.config.links:
+        for link in self.config.get_value('links'):
             instance_aliases = link_dict.get(self.policy.cname(self.config_id.map_name, link.container))
             config_alias = link.alias or self.policy.get_hostname(link.container)
             if not instance_aliases or config_alias not in instance_aliases:
@@ -237,11 +334,11 @@ class UpdateContainerState(ContainerBaseState):
             log.debug("Looking up %s command for user %s: %s", check_option, res_user, res_cmd)
             return cmd_exists(res_cmd, res_user)
 
-        if not self.config.exec_commands:
+        if not self.config.get_value('exec_commands'):
             return None
         if not self.current_commands:
             log.debug("No running exec commands found for container.")
-            return self.config.exec_commands
+            return self.config.get_value('exec_commands')
         log.debug("Checking commands for container %s.", self.container_name)
         if check_option == CmdCheck.FULL:
             cmd_exists = _find_full_command
@@ -250,9 +347,49 @@ class UpdateContainerState(ContainerBaseState):
         else:
             log.debug("Invalid check mode %s - skipping.", check_option)
             return None
-        return [exec_cmd for exec_cmd in self.config.exec_commands
+        return [exec_cmd for exec_cmd in self.config.get_value('exec_commands')
                 if not _cmd_running(exec_cmd.cmd, exec_cmd.user) and exec_cmd.policy != ExecPolicy.INITIAL]
 
+    def get_check_plan(self):
+        """
+        Returns the update check plan of the configuration on the current client, including the configuration
+        fingerprint if :attr:`config_fingerprint` is set. If :attr:`check_plans` is set, plans are stored there and
+        re-used for other instances of the same configuration.
+
+        :return: Expected values for the update checks.
+        :rtype: UpdateCheckPlan
+        """
+        check_plans = self.check_plans
+        if check_plans is None:
+            return self._get_check_plan()
+        plan_key = self.client_name, self.config_id.map_name, self.config_id.config_name
+        check_plan = check_plans.get(plan_key)
+        if check_plan is None:
+            check_plans[plan_key] = check_plan = self._get_check_plan()
+        return check_plan
+
+    def _get_check_plan(self):
+        if self.config_fingerprint and self.policy.fingerprint_label:
+            fingerprint = self.config_fingerprint.get_fingerprint(self)
+        else:
+            fingerprint = None
+        return get_update_check_plan(self.config, self.client_config, fingerprint)
+
+    def _check_fingerprint(self, check_plan):
+        fingerprint_label = self.policy.fingerprint_label
+        if not (check_plan.fingerprint and fingerprint_label):
+            return False
+        instance_labels = self.detail['Config'].get('Labels') or {}
+        instance_fingerprint = instance_labels.get(fingerprint_label)
+        if not instance_fingerprint:
+            log.debug("Container %s has no configuration fingerprint.", self.container_name)
+            return False
+        if instance_fingerprint != check_plan.fingerprint:
+            log.debug("Configuration fingerprint of container %s does not match.", self.container_name)
+            return False
+        log.debug("Configuration fingerprint of container %s matches.", self.container_name)
+        return True
+
     def _check_volumes(self):
         instance_volumes = get_instance_volumes(self.detail, self.client_config.features['volumes'])
         return self.volume_checker.check(self.config_id, self.container_map, self.config, instance_volumes)
@@ -276,7 +413,7 @@ class UpdateContainerState(ContainerBaseState):
         super(UpdateContainerState, self).inspect()
         if self.detail and self.detail['State']['Running'] and self.config_id.config_type == ItemType.CONTAINER:
             check_exec_option = self.options['check_exec_commands']
-            if check_exec_option and check_exec_option != CmdCheck.NONE and self.config.exec_commands:
+            if check_exec_option and check_exec_option != CmdCheck.NONE and self.config.get_value('exec_commands'):
                 self.current_commands = self.client.top(self.detail['Id'], ps_args='-eo pid,user,args')['Processes']
 
     def get_state(self):
@@ -304,11 +441,14 @@ class UpdateContainerState(ContainerBaseState):
                 state_flags |= StateFlags.IMAGE_MISMATCH
             if not self._check_volumes():
                 state_flags |= StateFlags.VOLUME_MISMATCH
-            if not self._check_links():
-                state_flags |= StateFlags.MISSING_LINK
-            if not (_check_environment(self.config, self.detail) and _check_cmd(self.config, self.detail) and
-                    _check_container_network_ports(self.config, self.client_config, self.detail)):
-                state_flags |= StateFlags.MISC_MISMATCH
+            check_plan = self.get_check_plan()
+            config_unchanged = self._check_fingerprint(check_plan)
+            if not config_unchanged:
+                if not self._check_links():
+                    state_flags |= StateFlags.MISSING_LINK
+                if not (_check_environment(check_plan, self.detail) and _check_cmd(check_plan, self.detail) and
+                        _check_container_network_ports(check_plan, self.detail)):
+                    state_flags |= StateFlags.MISC_MISMATCH
             if base_state == State.RUNNING:
                 check_exec_option = self.options['check_exec_commands']
                 if check_exec_option:
@@ -321,10 +461,10 @@ class UpdateContainerState(ContainerBaseState):
                                                                                        self.detail)
                 state_flags |= net_s_flags
                 extra.update(net_extra)
-            elif not self._check_container_network_mode():
+            elif not (config_unchanged or self._check_container_network_mode()):
                 state_flags |= StateFlags.MISC_MISMATCH
-            hc_update, hc_needs_reset = _check_limits(self.config, self.detail, self.client_config)
-            restart_policy_update = _check_restart_policy(self.config, self.detail)
+            hc_update, hc_needs_reset = _check_limits(check_plan, self.detail)
+            restart_policy_update = _check_restart_policy(check_plan, self.detail)
             hc_update.update(restart_policy_update)
             if not self.client_config.features['container_update_restart_policy'] and restart_policy_update:
                 hc_needs_reset = True
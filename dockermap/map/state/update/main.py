@@ -5,7 +5,7 @@ import six
 
 from ...input import CmdCheck
 from ..base import DependencyStateGenerator
-from .container import UpdateContainerState
+from .container import UpdateContainerState, ContainerConfigFingerprint
 from .network import UpdateNetworkState, NetworkEndpointRegistry
 from .volume import ContainerLegacyVolumeChecker, ContainerVolumeChecker, VolumeUpdateState
 
@@ -28,6 +28,10 @@ class UpdateStateGenerator(DependencyStateGenerator):
 
     In addition, the default state implementation applies, considering nonexistent containers or containers that
     cannot be restarted.
+
+    Containers labeled with a configuration fingerprint matching the current configuration skip most of these checks,
+    except for image, volumes, exec commands, and host config updates. This can be disabled by setting
+    ``check_fingerprint`` to ``False``.
     """
     container_state_class = UpdateContainerState
     network_state_class = UpdateNetworkState
@@ -36,15 +40,24 @@ class UpdateStateGenerator(DependencyStateGenerator):
     update_persistent = False
     check_exec_commands = CmdCheck.FULL
     skip_limit_reset = False
-    policy_options = ['update_persistent', 'check_exec_commands', 'skip_limit_reset']
+    check_fingerprint = True
+    policy_options = ['update_persistent', 'check_exec_commands', 'skip_limit_reset', 'check_fingerprint']
 
     def __init__(self, policy, kwargs):
         super(UpdateStateGenerator, self).__init__(policy, kwargs)
+        if self.client_names is not None:
+            clients = {client_name: client_config
+                       for client_name, client_config in six.iteritems(policy.clients)
+                       if client_name in self.client_names}
+        else:
+            clients = policy.clients
+        self._check_plans = {}
+        self._config_fingerprint = ContainerConfigFingerprint(policy) if self.check_fingerprint else None
         self._volume_checkers = {
             client_name: ContainerVolumeChecker(policy)
             if client_config.features['volumes']
             else ContainerLegacyVolumeChecker(policy)
-            for client_name, client_config in six.iteritems(policy.clients)
+            for client_name, client_config in six.iteritems(clients)
         }
         default_network_details = {
             client_name: {
@@ -52,7 +65,7 @@ class UpdateStateGenerator(DependencyStateGenerator):
                 for n_name in policy.default_network_names
                 if n_name in policy.network_names[client_name]
             }
-            for client_name, client_config in six.iteritems(policy.clients)
+            for client_name, client_config in six.iteritems(clients)
             if client_config.features['networks']
         }
         self._network_registries = {
@@ -64,6 +77,8 @@ class UpdateStateGenerator(DependencyStateGenerator):
 
     def get_container_state(self, client_name, *args, **kwargs):
         c_state = super(UpdateStateGenerator, self).get_container_state(client_name, *args, **kwargs)
+        c_state.config_fingerprint = self._config_fingerprint
+        c_state.check_plans = self._check_plans
         c_state.volume_checker = self._volume_checkers[client_name]
         c_state.endpoint_registry = self._network_registries.get(client_name)
         return c_state
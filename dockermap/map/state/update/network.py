@@ -92,9 +92,9 @@ class NetworkEndpointRegistry(object):
             i_networks = {}
             connected_network_names = set()
         c_net_mode = c_config.network_mode or 'default'
-        if c_config.networks:
+        if c_config.get_value('networks'):
             named_endpoints = [(self._nname(config_id.map_name, cn_config.network_name), cn_config)
-                               for cn_config in c_config.networks]
+                               for cn_config in c_config.get_value('networks')]
         elif c_net_mode in ('default', 'bridge'):
             named_endpoints = [(d_name, NetworkEndpoint(d_name))
                                for d_name in self._default_networks]
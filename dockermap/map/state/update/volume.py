@@ -30,7 +30,7 @@ class AbstractSingleVfsCheck(object):
 
     def check_bind(self, config, instance):
         config_id = self._config_id
-        for shared_volume in config.binds:
+        for shared_volume in config.get_value('binds'):
             bind_path, host_path = get_shared_volume_path(self._container_map, shared_volume, instance)
             instance_vfs = self._instance_volumes.get(bind_path)
             log.debug("Checking host bind. Config / container instance:\n%s\n%s", host_path, instance_vfs)
@@ -49,7 +49,7 @@ class AbstractSingleVfsCheck(object):
         config_id = self._config_id
         default_paths = self._policy.default_volume_paths[config_id.map_name]
         use_parent_name = self._container_map.use_attached_parent_name
-        for used in config.uses:
+        for used in config.get_value('uses'):
             used_volume = used.name
             ref_c_name, __, ref_i_name = used_volume.partition('.')
             if use_parent_name:
@@ -93,7 +93,7 @@ class SingleLegacyVfsCheck(AbstractSingleVfsCheck):
         config_id = self._config_id
         default_paths = self._policy.default_volume_paths[config_id.map_name]
         use_parent_name = self._container_map.use_attached_parent_name
-        for attached in config.attaches:
+        for attached in config.get_value('attaches'):
             a_name = '{0}.{1}'.format(parent_name, attached.name) if use_parent_name else attached.name
             if isinstance(attached, UsedVolume):
                 attached_path = attached.path
@@ -125,7 +125,7 @@ class SingleVolumeVfsCheck(AbstractSingleVfsCheck):
         parent_name = parent_name if self._container_map.use_attached_parent_name else None
         policy = self._policy
         default_paths = policy.default_volume_paths[config_id.map_name]
-        for attached in config.attaches:
+        for attached in config.get_value('attaches'):
             v_name = policy.aname(config_id.map_name, attached.name, parent_name)
             log.debug("Checking for attached volume %s.", v_name)
             if isinstance(attached, UsedVolume):
@@ -169,7 +169,7 @@ class AbstractVolumeChecker(object):
 
     def check(self, config_id, container_map, container_config, instance_volumes):
         vfs = self.get_vfs_check(config_id, container_map, instance_volumes)
-        for share in container_config.shares:
+        for share in container_config.get_value('shares'):
             cr_shared_path = resolve_value(share)
             self._vfs_paths[config_id.config_name, config_id.instance_name, cr_shared_path] = instance_volumes.get(share)
         if not vfs.check_bind(container_config, config_id.instance_name):
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+from collections import defaultdict, OrderedDict
+
 
 def merge_dependency_paths(item_paths):
     """
@@ -8,28 +10,57 @@ def merge_dependency_paths(item_paths):
     and merged in the incoming order. Later paths that are independent, but share some dependencies, are shortened
     by these dependencies. Paths that are contained in another entirely are discarded.
 
+    Since merged paths never share any items, each item is indexed with the merged path that it belongs to. For every
+    incoming path, only merged paths that it is related to are compared, instead of all of them.
+
     :param item_paths: List or tuple of items along with their dependency path.
     :type item_paths: collections.Iterable[(Any, list[Any])]
     :return: List of merged or independent paths.
     :rtype: list[(Any, list[Any])]
     """
-    merged_paths = []
-    for item, path in item_paths:
-        sub_path_idx = []
+    merged_paths = OrderedDict()
+    path_owners = {}
+    item_indexes = defaultdict(set)
+    for index, (item, path) in enumerate(item_paths):
         path_set = set(path)
-        for index, (merged_item, merged_path, merged_set) in enumerate(merged_paths):
+        owned_items = defaultdict(list)
+        related_idx = set()
+        item_owner = path_owners.get(item)
+        if item_owner is not None:
+            related_idx.add(item_owner)
+        for p in path_set:
+            owner = path_owners.get(p)
+            if owner is not None:
+                owned_items[owner].append(p)
+                related_idx.add(owner)
+            related_idx.update(item_indexes.get(p, ()))
+        sub_path_idx = []
+        discard = False
+        shortened = False
+        for merged_idx in sorted(related_idx):
+            merged_item, __, merged_set = merged_paths[merged_idx]
             if item in merged_set:
-                path = None
+                discard = True
                 break
             elif merged_item in path_set:
-                sub_path_idx.append(index)
-            elif merged_set & path_set:
-                path = [p for p in path if p not in merged_set]
-                path_set = set(path)
-                if not path:
-                    break
-        for spi in reversed(sub_path_idx):
-            merged_paths.pop(spi)
-        if path is not None:
-            merged_paths.append((item, path, path_set))
-    return [(i[0], i[1]) for i in merged_paths]
+                sub_path_idx.append(merged_idx)
+            else:
+                shared_items = owned_items.get(merged_idx)
+                if shared_items:
+                    path_set.difference_update(shared_items)
+                    shortened = True
+                    if not path_set:
+                        break
+        for spi in sub_path_idx:
+            merged_item, __, merged_set = merged_paths.pop(spi)
+            for p in merged_set:
+                del path_owners[p]
+            item_indexes[merged_item].discard(spi)
+        if not discard:
+            if shortened:
+                path = [p for p in path if p in path_set]
+            merged_paths[index] = item, path, path_set
+            for p in path_set:
+                path_owners[p] = index
+            item_indexes[item].add(index)
+    return [(i[0], i[1]) for i in merged_paths.values()]
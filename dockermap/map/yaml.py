@@ -1,14 +1,29 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals, absolute_import
 
+import hashlib
+import logging
 import os
+import re
+import sys
+import tempfile
+
 import six
+from six.moves import cPickle as pickle
 import yaml
 
-from ..utils import expand_path, expand_path_lazy
+from .. import __version__
+from ..utils import expand_path, expand_path_lazy, replace_file
 from .config.client import ClientConfiguration
 from .config.main import ContainerMap
 
+log = logging.getLogger(__name__)
+
+# Uses the libyaml-based loader, if PyYAML has been installed with it.
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+ENV_VAR_PATTERN = re.compile(r'\$\{?(\w+)')
+
 
 def expand_node(loader, node, expand_method):
     """
@@ -37,8 +52,65 @@ def expand_node(loader, node, expand_method):
         return [expand_method(l_val) for l_val in val]
 
 
-yaml.add_constructor('!path', lambda loader, node: expand_node(loader, node, expand_path), yaml.SafeLoader)
-yaml.add_constructor('!path_lazy', lambda loader, node: expand_node(loader, node, expand_path_lazy), yaml.SafeLoader)
+for _loader in {yaml.SafeLoader, SafeLoader}:
+    yaml.add_constructor('!path', lambda loader, node: expand_node(loader, node, expand_path), _loader)
+    yaml.add_constructor('!path_lazy', lambda loader, node: expand_node(loader, node, expand_path_lazy), _loader)
+
+
+def _load(stream):
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def _get_map_cache_name(cache_dir, filename):
+    path_hash = hashlib.sha256(os.path.abspath(filename).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, 'map-{0}.pickle'.format(path_hash))
+
+
+def _get_map_cache_key(filename, name, check_integrity):
+    stat = os.stat(filename)
+    with open(filename, 'r') as f:
+        env_names = sorted(set(ENV_VAR_PATTERN.findall(f.read())))
+    # Paths are expanded before the map is stored; any change of the variables or the home directory invalidates it.
+    env = [(env_name, os.environ.get(env_name)) for env_name in env_names]
+    return [__version__, tuple(sys.version_info[:2]), stat.st_mtime, stat.st_size, name, check_integrity,
+            os.path.expanduser('~'), env]
+
+
+def _load_cached_map(cache_name, cache_key):
+    try:
+        with open(cache_name, 'rb') as f:
+            stored_key, c_map = pickle.load(f)
+    except (IOError, OSError):
+        return None
+    except Exception as e:
+        log.warning("Could not read cached map %s: %s", cache_name, e)
+        return None
+    if stored_key != cache_key:
+        log.debug("Cached map %s is outdated.", cache_name)
+        return None
+    return c_map
+
+
+def _save_cached_map(cache_name, cache_key, c_map):
+    cache_dir = os.path.dirname(cache_name)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+        fd, temp_name = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    except (IOError, OSError) as e:
+        log.warning("Could not write cached map %s: %s", cache_name, e)
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((cache_key, c_map), f, pickle.HIGHEST_PROTOCOL)
+        replace_file(temp_name, cache_name)
+    except Exception as e:
+        # E.g. lazy values cannot be stored.
+        log.debug("Could not write cached map %s: %s", cache_name, e)
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
 
 
 def load_file(filename):
@@ -50,7 +122,7 @@ def load_file(filename):
     :return: Contents of the YAML file.
     """
     with open(filename, 'r') as f:
-        return yaml.safe_load(f)
+        return _load(f)
 
 
 def load_map(stream, name=None, check_integrity=True, check_duplicates=True):
@@ -69,7 +141,7 @@ def load_map(stream, name=None, check_integrity=True, check_duplicates=True):
     :return: A ContainerMap object.
     :rtype: ContainerMap
     """
-    map_dict = yaml.safe_load(stream)
+    map_dict = _load(stream)
     if isinstance(map_dict, dict):
         map_name = name or map_dict.pop('name', None)
         if not map_name:
@@ -89,17 +161,23 @@ def load_clients(stream, configuration_class=ClientConfiguration):
     :return: A dictionary of client configuration objects.
     :rtype: dict[unicode | str, dockermap.map.config.client.ClientConfiguration]
     """
-    client_dict = yaml.safe_load(stream)
+    client_dict = _load(stream)
     if isinstance(client_dict, dict):
         return {client_name: configuration_class(**client_config)
                 for client_name, client_config in six.iteritems(client_dict)}
     raise ValueError("Valid configuration could not be decoded.")
 
 
-def load_map_file(filename, name=None, check_integrity=True):
+def load_map_file(filename, name=None, check_integrity=True, cache_dir=None):
     """
     Loads a ContainerMap configuration from a YAML file.
 
+    If ``cache_dir`` is set, the loaded map is stored in that directory, and re-used on later calls as long as
+    modification time and size of the file, the home directory, and the environment variables referred to in the file
+    are unchanged. Only one map is stored per file path; an outdated map is replaced. Values of ``!path`` are expanded when the map is stored. Maps with lazy values (e.g.
+    ``!path_lazy``) are not cached. Maps are stored using :mod:`pickle`, which can execute arbitrary code when
+    loading a file; the cache directory must therefore only be writable by trusted users.
+
     :param filename: YAML file name.
     :type filename: unicode | str
     :param name: Name of the ContainerMap. If ``None`` will attempt to find a ``name`` element on the root level of
@@ -107,6 +185,8 @@ def load_map_file(filename, name=None, check_integrity=True):
     :type name: unicode | str
     :param check_integrity: Performs a brief integrity check; default is ``True``.
     :type check_integrity: bool
+    :param cache_dir: Optional directory for caching the loaded map.
+    :type cache_dir: unicode | str
     :return: A ContainerMap object.
     :rtype: ContainerMap
     """
@@ -115,8 +195,20 @@ def load_map_file(filename, name=None, check_integrity=True):
         map_name, __, __ = os.path.basename(base_name).rpartition(os.path.extsep)
     else:
         map_name = name
+    if cache_dir:
+        cache_name = _get_map_cache_name(cache_dir, filename)
+        cache_key = _get_map_cache_key(filename, map_name, check_integrity)
+        c_map = _load_cached_map(cache_name, cache_key)
+        if c_map is not None:
+            log.debug("Using cached map %s from %s.", c_map.name, cache_name)
+            return c_map
+    else:
+        cache_name = None
     with open(filename, 'r') as f:
-        return load_map(f, name=map_name, check_integrity=check_integrity)
+        c_map = load_map(f, name=map_name, check_integrity=check_integrity)
+    if cache_name:
+        _save_cached_map(cache_name, cache_key, c_map)
+    return c_map
 
 
 def load_clients_file(filename, configuration_class=ClientConfiguration):
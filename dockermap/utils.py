@@ -29,4 +29,26 @@ def merge_list(merged_list, items):
                        if item not in merged_set and not merged_add(item))
 
 
+def replace_file(src, dst):
+    """
+    Renames a file, replacing the destination if it exists. On Python 3, the destination is replaced atomically. On
+    Python 2, the destination is removed first if it cannot be replaced otherwise (i.e. on Windows).
+
+    :param src: Source file name.
+    :type src: unicode | str
+    :param dst: Destination file name.
+    :type dst: unicode | str
+    """
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+        return
+    try:
+        os.rename(src, dst)
+    except OSError:
+        if not os.path.exists(dst):
+            raise
+        os.remove(dst)
+        os.rename(src, dst)
+
+
 format_image_tag = '{0[0]}:{0[1]}'.format
@@ -18,7 +18,7 @@ def include_readme():
         return doc.rst.decode('utf-8')
 
 
-REQUIRED_PACKAGES = ['six', 'enum34;python_version<"3.4"']
+REQUIRED_PACKAGES = ['six', 'enum34;python_version<"3.4"', 'futures;python_version<"3.2"']
 
 
 setup(
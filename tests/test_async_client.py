@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+import unittest
+
+import six
+
+from dockermap.map.client import MappingDockerClient
+from dockermap.map.config.client import ClientConfiguration
+from dockermap.map.config.main import ContainerMap
+from tests import MAP_DATA_3
+
+if six.PY3:
+    import asyncio
+    from dockermap.map.async_client import ThreadedAsyncMappingDockerClient
+
+    class _RecordingClient(MappingDockerClient):
+        def __init__(self, *args, **kwargs):
+            super(_RecordingClient, self).__init__(*args, **kwargs)
+            self.calls = []
+
+        def get_policy(self):
+            return None
+
+        def run_actions(self, action_name, config_name, instances=None, map_name=None, **kwargs):
+            self.calls.append((action_name, config_name, threading.current_thread()))
+            return [config_name]
+
+    class _AsyncClient(ThreadedAsyncMappingDockerClient, _RecordingClient):
+        pass
+
+    class _PolicyClient(MappingDockerClient):
+        def run_actions(self, action_name, config_name, instances=None, map_name=None, **kwargs):
+            policy = self.get_policy()
+            return policy, policy.container_names['__default__']
+
+    class _AsyncPolicyClient(ThreadedAsyncMappingDockerClient, _PolicyClient):
+        pass
+
+
+class _SlowDockerClient(object):
+    def __init__(self):
+        self.listings = 0
+        self._lock = threading.Lock()
+
+    def containers(self, all=False, filters=None):
+        with self._lock:
+            self.listings += 1
+        time.sleep(0.05)
+        return [{'Id': 'abc', 'Names': ['/simple.c1'], 'State': 'running'}]
+
+
+@unittest.skipUnless(six.PY3, "Requires asyncio.")
+class AsyncClientTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = _AsyncClient()
+
+    def tearDown(self):
+        self.client.close()
+        self.loop.close()
+
+    def test_run_in_executor(self):
+        client = self.client
+        results = self.loop.create_future()
+        loops = []
+
+        def _start():
+            loops.append(client.loop)
+            futures = [client.create('c1'), client.startup('c2')]
+            gathered = asyncio.gather(*futures)
+            gathered.add_done_callback(lambda f: results.set_result(f.result()))
+
+        self.loop.call_soon(_start)
+        self.assertListEqual(self.loop.run_until_complete(results), [['c1'], ['c2']])
+        self.assertListEqual(loops, [self.loop])
+        self.assertSetEqual({call[1] for call in client.calls}, {'c1', 'c2'})
+        self.assertNotIn(threading.current_thread(), [call[2] for call in client.calls])
+
+    def test_explicit_loop(self):
+        client = _AsyncClient(loop=self.loop)
+        try:
+            self.assertIs(client.loop, self.loop)
+            self.assertListEqual(self.loop.run_until_complete(client.create('c1')), ['c1'])
+        finally:
+            client.close()
+
+
+@unittest.skipUnless(six.PY3, "Requires asyncio.")
+class AsyncClientPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.docker_client = _SlowDockerClient()
+        client_config = ClientConfiguration(version='1.25', client=self.docker_client)
+        self.client = _AsyncPolicyClient(ContainerMap('simple', MAP_DATA_3), clients={'__default__': client_config},
+                                         loop=self.loop)
+
+    def tearDown(self):
+        self.client.close()
+        self.loop.close()
+
+    def test_concurrent_policy_access(self):
+        client = self.client
+        futures = [client.run_actions('create', 'c1') for __ in range(8)]
+        results = self.loop.run_until_complete(asyncio.gather(*futures))
+        policies = {id(policy) for policy, __ in results}
+        caches = {id(cache) for __, cache in results}
+        self.assertEqual(len(policies), 1)
+        self.assertEqual(len(caches), 1)
+        self.assertEqual(self.docker_client.listings, 1)
+        policy, cache = results[0]
+        self.assertEqual(cache['simple.c1'], 'abc')
+        refreshed = policy.container_names.refresh('__default__')
+        self.assertIs(refreshed, cache)
+        self.assertEqual(self.docker_client.listings, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
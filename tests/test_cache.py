@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import unittest
+
+from dockermap.api import ClientConfiguration, ContainerMap
+from dockermap.map.input import ItemType, MapConfigId
+from dockermap.map.policy.base import BasePolicy
+from dockermap.map.policy.cache import CachedContainerNames, CachedNetworkNames, CachedVolumeNames
+from dockermap.map.policy.events import CacheEventMonitor, get_event_info
+from dockermap.map.runner import ActionConfig
+from dockermap.map.runner.base import DockerClientRunner
+
+from tests import MAP_DATA_2, CLIENT_DATA_1
+
+
+def _event(event_type, action, actor_id, **attributes):
+    return {
+        'Type': event_type,
+        'Action': action,
+        'Actor': {'ID': actor_id, 'Attributes': attributes},
+    }
+
+
+class _FailingEventClient(object):
+    def __init__(self):
+        self.calls = 0
+
+    def events(self, decode=False):
+        self.calls += 1
+        raise IOError("Connection refused.")
+
+
+class _StopAfterWaits(object):
+    def __init__(self, count):
+        self.timeouts = []
+        self._count = count
+
+    def is_set(self):
+        return len(self.timeouts) >= self._count
+
+    def wait(self, timeout=None):
+        self.timeouts.append(timeout)
+        return self.is_set()
+
+
+class _StateClient(object):
+    def __init__(self):
+        self.calls = []
+
+    def start(self, container, **kwargs):
+        self.calls.append(('start', container))
+
+    def stop(self, container, **kwargs):
+        self.calls.append(('stop', container))
+
+    def restart(self, container, **kwargs):
+        self.calls.append(('restart', container))
+
+    def kill(self, container, **kwargs):
+        self.calls.append(('kill', container))
+
+
+class TestCacheEvents(unittest.TestCase):
+    def setUp(self):
+        self.policy = BasePolicy({'main': ContainerMap('main', MAP_DATA_2, use_attached_parent_name=True)},
+                                 {'__default__': ClientConfiguration(**CLIENT_DATA_1)})
+        self.container_names = self.policy.container_names['__default__'] = CachedContainerNames(None)
+        self.network_names = self.policy.network_names['__default__'] = CachedNetworkNames(None)
+        self.volume_names = self.policy.volume_names['__default__'] = CachedVolumeNames(None)
+        self.monitor = CacheEventMonitor(self.policy, '__default__')
+
+    def test_event_info(self):
+        self.assertEqual(get_event_info(_event('container', 'health_status: healthy', 'c1', name='main.svc')),
+                         ('container', 'health_status', 'c1', {'name': 'main.svc'}))
+        self.assertEqual(get_event_info({'status': 'destroy', 'id': 'c1', 'from': 'image'}),
+                         ('container', 'destroy', 'c1', {}))
+
+    def test_container_events(self):
+        apply_event = self.monitor.apply_event
+        apply_event(_event('container', 'create', 'c1', name='main.svc'))
+        apply_event(_event('container', 'create', 'c2', name='main.svc2'))
+        self.assertDictEqual(self.container_names, {'main.svc': 'c1', 'main.svc2': 'c2'})
+        apply_event(_event('container', 'rename', 'c2', name='main.svc3', oldName='/main.svc2'))
+        self.assertDictEqual(self.container_names, {'main.svc': 'c1', 'main.svc3': 'c2'})
+        apply_event(_event('container', 'destroy', 'c1', name='main.svc'))
+        self.assertDictEqual(self.container_names, {'main.svc3': 'c2'})
+
+    def test_container_summary_events(self):
+        self.container_names._summaries['main.svc'] = {'Id': 'c1', 'State': 'exited', 'Status': 'Exited (0)'}
+        self.container_names.update({'main.svc': 'c1'})
+        self.monitor.apply_event(_event('container', 'exec_create: ls', 'c1', name='main.svc'))
+        self.assertIsNotNone(self.container_names.get_summary('main.svc'))
+        self.monitor.apply_event(_event('container', 'start', 'c1', name='main.svc'))
+        self.assertIsNone(self.container_names.get_summary('main.svc'))
+
+    def test_container_summary_runner(self):
+        runner = DockerClientRunner(self.policy, {})
+        client = _StateClient()
+        c_map = self.policy.container_maps['main']
+        config_id = MapConfigId(ItemType.CONTAINER, 'main', 'svc')
+        action = ActionConfig('__default__', config_id, self.policy.clients['__default__'], client, c_map,
+                              c_map.get_existing('svc'))
+        self.container_names.update({'main.svc': 'c1', 'main.svc2': 'c2'})
+        summary = {'Id': 'c1', 'State': 'exited', 'Status': 'Exited (0)'}
+        for method in (runner.start_container, runner.stop, runner.restart, runner.kill):
+            self.container_names._summaries['main.svc'] = summary
+            self.container_names._summaries['main.svc2'] = summary
+            method(action, 'main.svc')
+            self.assertIsNone(self.container_names.get_summary('main.svc'))
+            self.assertIsNotNone(self.container_names.get_summary('main.svc2'))
+        self.assertListEqual(client.calls, [('start', 'main.svc'), ('stop', 'main.svc'), ('restart', 'main.svc'),
+                                            ('kill', 'main.svc')])
+
+    def test_network_volume_events(self):
+        apply_event = self.monitor.apply_event
+        apply_event(_event('network', 'create', 'n1', name='main.app_net1', type='bridge'))
+        apply_event(_event('volume', 'create', 'main.app_data', driver='local'))
+        self.assertDictEqual(self.network_names, {'main.app_net1': 'n1'})
+        self.assertSetEqual(self.volume_names, {'main.app_data'})
+        apply_event(_event('network', 'destroy', 'n1', name='main.app_net1', type='bridge'))
+        apply_event(_event('volume', 'destroy', 'main.app_data', driver='local'))
+        self.assertDictEqual(self.network_names, {})
+        self.assertSetEqual(self.volume_names, set())
+
+    def test_event_lock(self):
+        event_thread = threading.Thread(target=self.monitor.apply_event,
+                                        args=(_event('container', 'create', 'c1', name='main.svc'), ))
+        with self.container_names.lock:
+            event_thread.start()
+            event_thread.join(0.1)
+            self.assertTrue(event_thread.is_alive())
+            self.assertDictEqual(self.container_names, {})
+        event_thread.join()
+        self.assertDictEqual(self.container_names, {'main.svc': 'c1'})
+
+    def _get_failing_monitor(self, **kwargs):
+        client = _FailingEventClient()
+        policy = BasePolicy({'main': ContainerMap('main', MAP_DATA_2, use_attached_parent_name=True)},
+                            {'__default__': ClientConfiguration(client=client, **CLIENT_DATA_1)})
+        return client, CacheEventMonitor(policy, '__default__', **kwargs)
+
+    def test_reconnect_backoff(self):
+        client, monitor = self._get_failing_monitor(retry_interval=1, max_retry_interval=4)
+        monitor._stopped = stopped = _StopAfterWaits(5)
+        monitor._run()
+        self.assertEqual(client.calls, 5)
+        self.assertListEqual(stopped.timeouts, [1, 2, 4, 4, 4])
+        self.assertFalse(monitor.is_current)
+
+    def test_start_stop(self):
+        client, monitor = self._get_failing_monitor(retry_interval=60)
+        self.assertFalse(monitor.start(timeout=0))
+        monitor.stop(timeout=5)
+        self.assertFalse(monitor._thread.is_alive())
+        self.assertLessEqual(client.calls, 1)
+
+    def test_resync(self):
+        self.monitor.resync()
+        self.assertNotIn('__default__', self.policy.container_names)
+        self.assertNotIn('__default__', self.policy.network_names)
+        self.assertFalse(self.policy.is_monitored('__default__'))
+
+
+class TestCacheLabelFilters(unittest.TestCase):
+    def test_label_filters(self):
+        c_map = ContainerMap('main', MAP_DATA_2, use_attached_parent_name=True)
+        clients = {'__default__': ClientConfiguration(**CLIENT_DATA_1)}
+        policy = BasePolicy({'main': c_map}, clients)
+        self.assertIsNone(policy.container_names._filters)
+        policy = BasePolicy({'main': c_map}, clients, option_defaults={'label_filters': True})
+        self.assertDictEqual(policy.container_names._filters, {'label': 'dockermap.map'})
+        self.assertDictEqual(policy.network_names._filters, {'label': 'dockermap.map'})
+        self.assertDictEqual(policy.volume_names._filters, {'label': 'dockermap.map'})
+        self.assertDictEqual(policy._map_data, {})
+        self.assertDictEqual(policy.images._filters(), {'reference': [
+            'busybox',
+            'registry.example.com/net_sub_svc',
+            'registry.example.com/net_svc',
+            'registry.example.com/persistent_one',
+            'registry.example.com/redis',
+            'registry.example.com/server',
+            'registry.example.com/server3',
+            'registry.example.com/sub_sub_svc',
+            'registry.example.com/sub_svc',
+            'registry.example.com/svc',
+            'registry.example.com/svc2',
+            'tianon/true',
+        ]})
+
+    def test_labels(self):
+        self.assertDictEqual(BasePolicy.get_labels(MapConfigId(ItemType.CONTAINER, 'main', 'redis', 'cache')), {
+            'dockermap.map': 'main',
+            'dockermap.config': 'redis',
+            'dockermap.instance': 'cache',
+        })
+        self.assertDictEqual(BasePolicy.get_labels(MapConfigId(ItemType.NETWORK, 'main', 'app_net1')), {
+            'dockermap.map': 'main',
+            'dockermap.config': 'app_net1',
+        })
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import sys
+import time
+import unittest
+from collections import namedtuple
+
+from dockermap.api import ClientConfiguration, ContainerMap, MappingDockerClient
+from dockermap.exceptions import PartialResultsError
+from dockermap.map.action import Action, ItemAction
+from dockermap.map.client import _merge_client_results
+from dockermap.map.exceptions import ActionRunnerException
+from dockermap.map.input import ItemType, MapConfigId
+from dockermap.map.runner import AbstractRunner, ActionOutput
+
+
+def _config_id(config_name, map_name='main'):
+    return MapConfigId(ItemType.CONTAINER, map_name, config_name)
+
+
+def _output(client_name, config_name):
+    return ActionOutput(client_name, _config_id(config_name), Action.CREATE, None)
+
+
+_State = namedtuple('_State', ['client_name', 'config_id'])
+
+
+def _action(config_name, **kwargs):
+    return ItemAction(_State('__default__', _config_id(config_name)), Action.CREATE, **kwargs)
+
+
+class _WaveRunner(AbstractRunner):
+    action_method_names = [
+        (ItemType.CONTAINER, Action.CREATE, 'create'),
+    ]
+
+    def create(self, action, c_name, delay=0, fail=False):
+        time.sleep(delay)
+        if fail:
+            raise ValueError("Action failed.", c_name)
+        return {'Id': c_name}
+
+
+class _WaveClient(MappingDockerClient):
+    runner_class = _WaveRunner
+
+    def __init__(self, *args, **kwargs):
+        self.waves = kwargs.pop('waves')
+        super(_WaveClient, self).__init__(*args, **kwargs)
+
+    def get_action_waves(self, action_name, config_name, instances=None, map_name=None, **kwargs):
+        return iter(self.waves)
+
+
+class _ClientRunner(object):
+    parallel_clients = True
+    max_workers = None
+    memoize_values = False
+
+
+class _ParallelClient(MappingDockerClient):
+    """
+    Generates one output per configuration on each client, without running any actions. Fails on the clients in
+    ``failing_clients`` after the first configuration.
+    """
+    def __init__(self, *args, **kwargs):
+        self.failing_clients = kwargs.pop('failing_clients', {})
+        super(_ParallelClient, self).__init__(*args, **kwargs)
+
+    def _run_action_lists(self, runner, results, action_name, config_name, instances, map_name, kwargs):
+        client_name, = kwargs['client_names']
+        for c_name in config_name:
+            error_type = self.failing_clients.get(client_name)
+            if error_type and results:
+                try:
+                    raise ValueError("Action failed.")
+                except ValueError:
+                    exc_info = sys.exc_info()
+                if error_type is ActionRunnerException:
+                    raise ActionRunnerException(exc_info, client_name, _config_id(c_name), Action.CREATE, results)
+                raise PartialResultsError(exc_info, results)
+            results.append(_output(client_name, c_name))
+
+
+class ParallelClientTest(unittest.TestCase):
+    def setUp(self):
+        self.c_map = ContainerMap('main', {
+            'clients': ['c1', 'c2'],
+            'web': {},
+            'app': {'clients': ['c3']},
+        })
+        self.clients = {name: ClientConfiguration(version='1.25') for name in ('c1', 'c2', 'c3')}
+
+    def test_client_names(self):
+        client = MappingDockerClient(self.c_map, clients=self.clients)
+        policy = client.get_policy()
+        self.assertListEqual(client._get_client_names(policy, 'web', None, None), ['c1', 'c2', 'c3'])
+        self.assertListEqual(policy.get_client_names(_config_id('web')), ['c1', 'c2'])
+        self.assertListEqual(policy.get_client_names(_config_id('app')), ['c3'])
+        self.assertListEqual(policy.get_client_names(MapConfigId(ItemType.VOLUME, 'main', 'app', 'data')), ['c3'])
+        self.assertListEqual(policy.get_client_names(MapConfigId(ItemType.IMAGE, 'main', 'app', 'latest')),
+                             ['c1', 'c2', 'c3'])
+
+    def test_merge_client_results(self):
+        merged = _merge_client_results([
+            [_output('c1', 'web'), _output('c1', 'app')],
+            [_output('c2', 'db'), _output('c2', 'app'), _output('c2', 'web')],
+        ])
+        self.assertListEqual(merged, [
+            _output('c1', 'web'), _output('c2', 'web'),
+            _output('c1', 'app'), _output('c2', 'app'),
+            _output('c2', 'db'),
+        ])
+
+    def test_run_client_actions(self):
+        client = _ParallelClient(self.c_map, clients=self.clients)
+        results = client._run_client_actions(_ClientRunner(), ['c1', 'c2', 'c3'], 'create', ['web', 'app'], None,
+                                             None, {})
+        self.assertListEqual(results, [
+            _output('c1', 'web'), _output('c2', 'web'), _output('c3', 'web'),
+            _output('c1', 'app'), _output('c2', 'app'), _output('c3', 'app'),
+        ])
+
+    def test_run_client_actions_partial_results(self):
+        client = _ParallelClient(self.c_map, clients=self.clients, failing_clients={'c2': ActionRunnerException})
+        with self.assertRaises(ActionRunnerException) as context:
+            client._run_client_actions(_ClientRunner(), ['c1', 'c2', 'c3'], 'create', ['web', 'app'], None, None, {})
+        exc = context.exception
+        self.assertEqual(exc.client_name, 'c2')
+        self.assertEqual(exc.config_id, _config_id('app'))
+        # Results of all clients are included, including those that completed after the failure.
+        self.assertListEqual(exc.results, [
+            _output('c1', 'web'), _output('c2', 'web'), _output('c3', 'web'),
+            _output('c1', 'app'), _output('c3', 'app'),
+        ])
+
+    def test_run_client_actions_other_error(self):
+        client = _ParallelClient(self.c_map, clients=self.clients, failing_clients={'c1': PartialResultsError})
+        with self.assertRaises(PartialResultsError) as context:
+            client._run_client_actions(_ClientRunner(), ['c1', 'c2'], 'create', ['web', 'app'], None, None, {})
+        self.assertIsInstance(context.exception.source_exception[1], ValueError)
+        self.assertEqual(len(context.exception.results), 3)
+
+
+class ActionWaveTest(unittest.TestCase):
+    def setUp(self):
+        self.c_map = ContainerMap('main', {name: {} for name in ('svc', 'web', 'app', 'db', 'worker', 'cache',
+                                                                   'queue')})
+        self.clients = {'__default__': ClientConfiguration(version='1.25', client=object())}
+
+    def _output(self, config_name):
+        return ActionOutput('__default__', _config_id(config_name), Action.CREATE, {'Id': 'main.' + config_name})
+
+    def test_run_action_wave_failure(self):
+        # Lists finish in reverse order; 'app' fails after 'cache', but comes first in the order of lists.
+        waves = [
+            [[_action('svc')]],
+            [
+                [_action('web', delay=0.2)],
+                [_action('app', delay=0.1, fail=True), _action('db')],
+                [_action('worker'), _action('cache', fail=True)],
+            ],
+            [[_action('queue')]],
+        ]
+        client = _WaveClient(self.c_map, clients=self.clients, waves=waves)
+        with self.assertRaises(ActionRunnerException) as context:
+            client.run_actions('create', None, max_workers=3)
+        exc = context.exception
+        self.assertEqual(exc.config_id, _config_id('app'))
+        self.assertEqual(exc.action_type, Action.CREATE)
+        self.assertIsInstance(exc.source_exception[1], ValueError)
+        # Remaining lists of the failed wave complete; actions after the failure in its list and later waves do not.
+        self.assertListEqual(exc.results, [self._output('svc'), self._output('web'), self._output('worker')])
+
+    def test_run_action_wave(self):
+        waves = [
+            [[_action('svc')]],
+            [[_action('web', delay=0.1)], [_action('app'), _action('db')]],
+        ]
+        client = _WaveClient(self.c_map, clients=self.clients, waves=waves)
+        results = client.run_actions('create', None, max_workers=2)
+        self.assertListEqual(results, [self._output(name) for name in ('svc', 'web', 'app', 'db')])
+
+
+if __name__ == '__main__':
+    unittest.main()
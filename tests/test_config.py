@@ -5,9 +5,14 @@ import unittest
 
 import six
 
+from dockermap.map.config.client import ClientConfiguration
+from dockermap.map.config.container import ContainerConfiguration
 from dockermap.map.config.main import ContainerMap
-from dockermap.map.input import SharedVolume, PortBinding, ContainerLink, UsedVolume
-from tests import MAP_DATA_2, MAP_DATA_3
+from dockermap.map.input import SharedVolume, PortBinding, ContainerLink, UsedVolume, MapConfigId, ItemType
+from dockermap.map.policy.base import BasePolicy
+from dockermap.map.runner import ActionConfig
+from dockermap.map.runner.base import DockerClientRunner
+from tests import MAP_DATA_2, MAP_DATA_3, CLIENT_DATA_1
 
 
 class TestConfig(unittest.TestCase):
@@ -151,6 +156,69 @@ class TestConfig(unittest.TestCase):
             },
         })
 
+    def test_extended_config_copy_on_write(self):
+        base_cfg = self.sample_map.get_existing('abstract_config')
+        cfg = self.ext_main.get_existing('server')
+        index = ContainerConfiguration.PROPERTY_INDEXES['uses']
+        self.assertIs(cfg._values[index], base_cfg._values[index])
+        cfg.merge({'uses': ['app_data'], 'create_options': {'mem_limit': '1g'}})
+        self.assertIsNot(cfg.uses, base_cfg.uses)
+        self.assertEqual(base_cfg.uses, [SharedVolume('redis.redis_socket', False)])
+        self.assertNotIn('mem_limit', base_cfg.create_options)
+
+    def test_extended_config_in_place_changes(self):
+        base_cfg = self.sample_map.get_existing('server')
+        cfg = self.ext_main.get_existing('server')
+        cfg2 = self.ext_main.get_existing('server2')
+        index = ContainerConfiguration.PROPERTY_INDEXES['create_options']
+        self.assertIs(cfg._values[index], base_cfg._values[index])
+        self.assertIs(cfg2._values[index], base_cfg._values[index])
+        cfg.create_options['mem_limit'] = '2g'
+        cfg.uses.append(SharedVolume('app_data', False))
+        self.assertEqual(cfg.create_options['mem_limit'], '2g')
+        self.assertEqual(base_cfg.create_options['mem_limit'], '1g')
+        self.assertEqual(cfg2.create_options['mem_limit'], '1g')
+        self.assertEqual(MAP_DATA_2['containers']['server']['create_options']['mem_limit'], '1g')
+        self.assertEqual(cfg2.uses, [SharedVolume('redis.redis_socket', False)])
+        base_cfg.create_options['cpu_shares'] = 20
+        self.assertEqual(cfg2.create_options['cpu_shares'], 15)
+
+    def test_extended_config_read_value(self):
+        base_cfg = self.sample_map.get_existing('server')
+        cfg = self.ext_main.get_existing('server2')
+        index = ContainerConfiguration.PROPERTY_INDEXES['create_options']
+        self.assertEqual(cfg.get_value('create_options')['mem_limit'], '1g')
+        self.assertIs(cfg._values[index], base_cfg._values[index])
+        self.assertIsNot(cfg.create_options, base_cfg.get_value('create_options'))
+        self.assertIsNot(cfg._values[index], base_cfg._values[index])
+
+    def test_extended_config_shared_after_run(self):
+        client_config = ClientConfiguration(**CLIENT_DATA_1)
+        policy = BasePolicy({'main': self.sample_map}, {'__default__': client_config})
+        runner = DockerClientRunner(policy, {})
+        c_map = policy.container_maps['main']
+        cfg = c_map.get_existing('server2')
+        base_cfg = c_map.get_existing('server')
+        cfg_id = MapConfigId(ItemType.CONTAINER, 'main', 'server2')
+        action = ActionConfig('__default__', cfg_id, client_config, None, c_map, cfg)
+        runner.get_container_create_kwargs(action, 'main.server2')
+        runner.get_container_host_config_kwargs(action, 'main.server2')
+        for prop in ('uses', 'exposes', 'create_options', 'host_config'):
+            index = ContainerConfiguration.PROPERTY_INDEXES[prop]
+            self.assertIs(cfg._values[index], base_cfg._values[index])
+
+    def test_config_storage(self):
+        cfg = ContainerConfiguration()
+        self.assertFalse(hasattr(cfg, '__dict__'))
+        self.assertEqual(cfg, ContainerConfiguration())
+        cfg.uses = 'app_data'
+        self.assertFalse(cfg.is_clean)
+        self.assertNotEqual(cfg, ContainerConfiguration())
+        cfg.clean()
+        self.assertTrue(cfg.is_clean)
+        self.assertEqual(cfg.uses, [SharedVolume('app_data', False)])
+        self.assertIsNot(ContainerConfiguration().links, ContainerConfiguration().links)
+
     def test_partial_extended_map(self):
         self.assertEqual(self.ext_simple.host.root, MAP_DATA_3.get('host_root'))
 
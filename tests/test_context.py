@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import gzip
+import io
+import shutil
+import tarfile
+import tempfile
 import unittest
 from tarfile import TarInfo
 
 import os
 
-from dockermap.build.context import get_filter_func, preprocess_matches
+from dockermap.build.context import (get_filter_func, preprocess_matches, DockerContext, StreamingDockerContext,
+                                    ParallelGzipCompressor, ExclusionMatcher, TarNormalization)
+from dockermap.build.dockerfile import DockerFile
+from dockermap.client.docker_util import DockerUtilityMixin, CONTEXT_HASH_LABEL
 
 SAMPLE_IGNORE_SIMPLE = r"""
 .*
@@ -98,3 +106,185 @@ class TestDockerIgnorePatterns(unittest.TestCase):
         for fn in TEST_EXCLUDE_FILES_MIXED:
             self.assertIsNone(filter_func(TarInfo(os.path.join(prefix, fn))),
                               "Unexpectedly kept {0}".format(fn))
+
+    def test_prune_directories(self):
+        matcher = ExclusionMatcher(preprocess_matches(SAMPLE_IGNORE_WITH_NEGATIVES.splitlines()))
+        self.assertTrue(matcher.is_excluded('.git'))
+        self.assertTrue(matcher.can_prune('.git'))
+        self.assertTrue(matcher.is_excluded('dir3/keep'))
+        self.assertFalse(matcher.can_prune('dir3/keep'))
+        self.assertFalse(matcher.can_prune('test'))
+
+    def test_many_patterns(self):
+        patterns = ['file{0}'.format(i) for i in range(150)]
+        patterns.append('!file149')
+        matcher = ExclusionMatcher(preprocess_matches(patterns))
+        self.assertTrue(matcher.is_excluded('file0'))
+        self.assertTrue(matcher.is_excluded('file148'))
+        self.assertFalse(matcher.is_excluded('file149'))
+        self.assertFalse(matcher.is_excluded('other'))
+
+    def _get_context_names(self, file_names, dockerignore):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for name in file_names:
+                path = os.path.join(temp_dir, 'src', name)
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                with open(path, 'w') as f:
+                    f.write(name)
+            with open(os.path.join(temp_dir, 'src', '.dockerignore'), 'w') as f:
+                f.write(dockerignore)
+            with DockerContext(compression=None) as ctx:
+                ctx.add(os.path.join(temp_dir, 'src'), arcname='app')
+                ctx.finalize()
+                with tarfile.open(fileobj=ctx.fileobj) as tf:
+                    return tf.getnames()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_add_directory(self):
+        names = self._get_context_names(['.git/config', 'dir1/a', 'dir3/drop/testfile', 'dir3/keep/testfile',
+                                         'dir3/keep/other', 'test/.root', 'test/.other', 'b'],
+                                        SAMPLE_IGNORE_WITH_NEGATIVES)
+        self.assertListEqual(names, ['app', 'app/b', 'app/dir1', 'app/dir1/a', 'app/dir3', 'app/dir3/keep/testfile',
+                                     'app/test', 'app/test/.other', 'app/test/.root'])
+        # Contents of excluded directories remain excluded, unless an exemption matches them.
+        names = self._get_context_names(['dir1/secret/key', 'dir1/top', 'dir1/keep/file', 'other'],
+                                        "dir1\n!dir1/keep\n")
+        self.assertListEqual(names, ['app', 'app/.dockerignore', 'app/dir1/keep', 'app/dir1/keep/file', 'app/other'])
+
+
+class TestStreamingContext(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(temp_dir, 'src', 'sub'))
+        for name in ('a', os.path.join('sub', 'b')):
+            with open(os.path.join(temp_dir, 'src', name), 'wb') as f:
+                f.write(os.urandom(100000))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _get_dockerfile(self):
+        dockerfile = DockerFile('busybox')
+        dockerfile.add_file(os.path.join(self.temp_dir, 'src'), '/app')
+        return dockerfile
+
+    def _get_contents(self, data, compression):
+        if compression == 'pgz':
+            compression = 'gz'
+        elif compression == 'none':
+            compression = None
+        with tarfile.open(fileobj=io.BytesIO(data), mode='r:{0}'.format(compression or '')) as tf:
+            return [(member.name, tf.extractfile(member).read() if member.isfile() else None)
+                    for member in tf.getmembers()]
+
+    def test_stream_contents(self):
+        with DockerContext(self._get_dockerfile(), finalize=True) as ctx:
+            expected = self._get_contents(ctx.fileobj.read(), 'gz')
+        for compression in ('gz', 'pgz', 'bz2', 'none', None):
+            with StreamingDockerContext(self._get_dockerfile(), compression=compression, finalize=True,
+                                        chunk_size=4096, queue_size=2) as ctx:
+                data = b''.join(ctx.fileobj)
+                self.assertRaises(ValueError, lambda: list(ctx.fileobj))
+            self.assertEqual(self._get_contents(data, compression), expected)
+
+    def test_parallel_compression(self):
+        for compression in ('pgz', 'none'):
+            with DockerContext(self._get_dockerfile(), compression=compression, compress_workers=2,
+                               finalize=True) as ctx:
+                self.assertEqual(ctx.stream_encoding, 'gzip' if compression == 'pgz' else None)
+                self.assertEqual(len(self._get_contents(ctx.fileobj.read(), compression)), 5)
+        with DockerContext(self._get_dockerfile(), compression='pgz', compress_workers=2) as ctx:
+            executor = ctx._writer._compressor._executor
+        self.assertTrue(executor._shutdown)
+        data = os.urandom(10000) * 10
+        compressor = ParallelGzipCompressor(workers=3, block_size=4096)
+        output = b''.join([compressor.compress(data[i:i + 1000]) for i in range(0, len(data), 1000)])
+        output += compressor.flush()
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(output)).read(), data)
+
+    def test_content_hash(self):
+        with DockerContext(self._get_dockerfile(), finalize=True) as ctx:
+            content_hash = ctx.get_content_hash()
+        with StreamingDockerContext(self._get_dockerfile(), compression='none') as ctx:
+            self.assertEqual(ctx.get_content_hash(), content_hash)
+            self.assertEqual(len(self._get_contents(b''.join(ctx.fileobj), None)), 5)
+        file_name = os.path.join(self.temp_dir, 'src', 'a')
+        os.utime(file_name, (0, 0))
+        with DockerContext(self._get_dockerfile(), finalize=True) as ctx:
+            self.assertEqual(ctx.get_content_hash(), content_hash)
+        with open(file_name, 'ab') as f:
+            f.write(b'x')
+        with DockerContext(self._get_dockerfile(), finalize=True) as ctx:
+            self.assertNotEqual(ctx.get_content_hash(), content_hash)
+
+    def test_skip_unchanged_build(self):
+        test_case = self
+
+        class BuildClient(DockerUtilityMixin):
+            api_version = '1.30'
+
+            def __init__(self):
+                self.labels = None
+
+            def inspect_image(self, image):
+                return {'Id': 'sha256:0123456789abcdef', 'Config': {'Labels': self.labels}}
+
+            def build(self, fileobj=None, labels=None, **kwargs):
+                test_case.assertIsNotNone(fileobj)
+                self.labels = labels
+                return '0123456789ab'
+
+        client = BuildClient()
+        self.assertEqual(client.build_from_file(self._get_dockerfile(), 'image', skip_unchanged=True), '0123456789ab')
+        self.assertIn(CONTEXT_HASH_LABEL, client.labels)
+        build = client.build
+        client.build = None
+        self.assertEqual(client.build_from_file(self._get_dockerfile(), 'image', skip_unchanged=True), '0123456789ab')
+        built = []
+
+        def _build(**kwargs):
+            built.append(kwargs)
+            return build(**kwargs)
+
+        client.build = _build
+        client.build_from_file(self._get_dockerfile(), 'image', skip_unchanged=True, buildargs={'a': '1'})
+        self.assertEqual(len(built), 1)
+        client.build_from_file(self._get_dockerfile(), 'image', skip_unchanged=True, buildargs={'a': '1'})
+        self.assertEqual(len(built), 1)
+        client.build_from_file(self._get_dockerfile(), 'image', skip_unchanged=True, buildargs={'a': '2'})
+        self.assertEqual(len(built), 2)
+
+    def test_reproducible_context(self):
+        src_path = os.path.join(self.temp_dir, 'src')
+        copy_path = os.path.join(self.temp_dir, 'copy')
+        shutil.copytree(src_path, copy_path)
+        os.chmod(os.path.join(copy_path, 'a'), 0o600)
+        os.utime(os.path.join(copy_path, 'a'), (0, 0))
+        for compression in ('gz', 'pgz', 'none'):
+            outputs = []
+            for path in (src_path, copy_path):
+                with DockerContext(compression=compression, reproducible=True) as ctx:
+                    ctx.add(path, arcname='src')
+                    ctx.finalize()
+                    outputs.append(ctx.fileobj.read())
+            with StreamingDockerContext(compression=compression, reproducible=True) as ctx:
+                ctx.add(copy_path, arcname='src')
+                outputs.append(b''.join(ctx.fileobj))
+            self.assertEqual(outputs[0], outputs[1])
+            self.assertEqual(outputs[0], outputs[2])
+        with DockerContext(compression=None, reproducible=TarNormalization(mtime=1000, uname='root')) as ctx:
+            ctx.add(copy_path, arcname='src')
+            ctx.finalize()
+            with tarfile.open(fileobj=ctx.fileobj) as tf:
+                members = tf.getmembers()
+        self.assertListEqual([member.name for member in members], ['src', 'src/a', 'src/sub', 'src/sub/b'])
+        self.assertListEqual([member.mode for member in members], [0o755, 0o644, 0o755, 0o644])
+        self.assertTrue(all(member.mtime == 1000 and member.uname == 'root' and member.uid == 0 for member in members))
+
+    def test_stream_errors(self):
+        with StreamingDockerContext(compression=None) as ctx:
+            ctx.add(os.path.join(self.temp_dir, 'missing'))
+            self.assertRaises(OSError, lambda: list(ctx.fileobj))
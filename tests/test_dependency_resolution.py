@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import shutil
+import tempfile
 import unittest
 import six
 
-from dockermap.api import ContainerMap
-from dockermap.map.input import ItemType
-from dockermap.dep import ImageDependentsResolver
+from dockermap.api import ClientConfiguration, ContainerMap
+from dockermap.map.input import ItemType, MapConfigId
+from dockermap.dep import ImageDependentsResolver, CircularDependency
+from dockermap.map.policy.base import BasePolicy
 from dockermap.map.policy.dep import ContainerDependencyResolver, ContainerDependentsResolver
 
+from tests import MAP_DATA_2, CLIENT_DATA_1
+
 
 TEST_MAP_DATA = {
     'a': dict(uses=['b', 'c']),
@@ -92,6 +97,87 @@ class ContainerDependencyTest(unittest.TestCase):
                          (ItemType.CONTAINER, 'test_map', 'd', '2'))
 
 
+class DependencyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.maps = {'main': ContainerMap('main', MAP_DATA_2, use_attached_parent_name=True)}
+        self.clients = {'__default__': ClientConfiguration(**CLIENT_DATA_1)}
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _get_policy(self):
+        return BasePolicy(self.maps, self.clients, option_defaults={'dependency_cache_dir': self.cache_dir})
+
+    def test_cached_dependencies(self):
+        redis_id = MapConfigId(ItemType.CONTAINER, 'main', 'redis', 'cache')
+        svc_id = MapConfigId(ItemType.CONTAINER, 'main', 'sub_sub_svc', None)
+        uncached_policy = BasePolicy(self.maps, self.clients)
+        first_policy = self._get_policy()
+        self.assertListEqual(first_policy.get_dependencies(redis_id), uncached_policy.get_dependencies(redis_id))
+        cached_policy = self._get_policy()
+        cached_policy.init_map('main')
+        cached_entry = cached_policy._f_resolver._deps[redis_id]
+        self.assertListEqual(cached_entry.dependencies, uncached_policy.get_dependencies(redis_id))
+        self.assertListEqual(cached_policy.get_dependents(svc_id), uncached_policy.get_dependents(svc_id))
+        self.maps['main'].containers['svc'].links = 'server3'
+        changed_policy = self._get_policy()
+        self.assertIn((ItemType.CONTAINER, 'main', 'server3', None), changed_policy.get_dependencies(
+            MapConfigId(ItemType.CONTAINER, 'main', 'svc', None)))
+
+
+class LazyPolicyMapTest(unittest.TestCase):
+    def test_lazy_map_initialization(self):
+        maps = {
+            'main': ContainerMap('main', MAP_DATA_2, use_attached_parent_name=True),
+            'test_map': ContainerMap('test_map', initial=TEST_MAP_DATA, check_integrity=False),
+        }
+        policy = BasePolicy(maps, {'__default__': ClientConfiguration(**CLIENT_DATA_1)})
+        self.assertSetEqual(set(policy.container_maps), {'main', 'test_map'})
+        self.assertDictEqual(policy._map_data, {})
+        redis_id = MapConfigId(ItemType.CONTAINER, 'main', 'redis', 'cache')
+        self.assertIn(MapConfigId(ItemType.CONTAINER, 'main', 'sub_svc', None), policy.get_dependencies(redis_id))
+        self.assertIn('redis.redis_socket', policy.default_volume_paths['main'])
+        self.assertListEqual(list(policy._map_data), ['main'])
+        self.assertListEqual(policy.get_dependencies((ItemType.CONTAINER, 'main', 'redis', 'cache')),
+                             policy.get_dependencies(redis_id))
+        self.assertListEqual(policy.get_dependents((ItemType.CONTAINER, 'main', 'svc', None)),
+                             policy.get_dependents(MapConfigId(ItemType.CONTAINER, 'main', 'svc', None)))
+
+
+class PolicyConfigUpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.c_map = ContainerMap('main', MAP_DATA_2, use_attached_parent_name=True)
+        self.policy = BasePolicy({'main': self.c_map}, {'__default__': ClientConfiguration(**CLIENT_DATA_1)})
+
+    def _config_id(self, config_name, instance=None):
+        return MapConfigId(ItemType.CONTAINER, 'main', config_name, instance)
+
+    def test_change_config(self):
+        policy = self.policy
+        server_id = self._config_id('server')
+        redis_id = self._config_id('redis', 'cache')
+        self.assertNotIn(self._config_id('server3'), policy.get_dependencies(server_id))
+        redis_dependencies = policy.get_dependencies(redis_id)
+        self.c_map.containers['server'].links = ['svc', 'server3']
+        policy.update_container_config('main', 'server')
+        self.assertIn(self._config_id('server3'), policy.get_dependencies(server_id))
+        self.assertIn(server_id, policy.get_dependents(self._config_id('server3')))
+        self.assertIs(policy._f_resolver._deps[redis_id].dependencies, redis_dependencies)
+
+    def test_add_remove_config(self):
+        policy = self.policy
+        new_id = self._config_id('new_svc')
+        policy.update_container_config('main', 'new_svc', {'image': 'new', 'links': ['svc']})
+        self.assertIn('new_svc', policy.container_maps['main'].containers)
+        self.assertIn(self._config_id('svc'), policy.get_dependencies(new_id))
+        self.assertIn(new_id, policy.get_dependents(self._config_id('svc')))
+        policy.remove_container_config('main', 'new_svc')
+        self.assertNotIn('new_svc', policy.container_maps['main'].containers)
+        self.assertListEqual(policy.get_dependencies(new_id), [])
+        self.assertNotIn(new_id, policy.get_dependents(self._config_id('svc')))
+
+
 class ImageDependenceTest(unittest.TestCase):
     def setUp(self):
         self.res = ImageDependentsResolver(TEST_IMG_DATA)
@@ -103,6 +189,41 @@ class ImageDependenceTest(unittest.TestCase):
         self.assertListEqual(['a', 'b', 'c', 'd'], self.res.get_dependencies('e'))
         self.assertListEqual(['f'], self.res.get_dependencies('x'))
 
+    def test_image_dependency_levels(self):
+        self.assertEqual(0, self.res.get_level('a'))
+        self.assertEqual(3, self.res.get_level('e'))
+        self.assertListEqual([['a', 'd'], ['b'], ['c']], self.res.get_dependency_levels('e'))
+
+    def test_deep_dependencies(self):
+        res = ImageDependentsResolver((six.text_type(i), six.text_type(i + 1)) for i in range(5000))
+        dep = res.get_dependencies('5000')
+        self.assertEqual(5000, len(dep))
+        self.assertListEqual(['0', '1', '2'], dep[:3])
+        self.assertEqual(5000, res.get_level('5000'))
+
+    def test_dependencies_cached_per_node(self):
+        merged = []
+
+        class CountingResolver(ImageDependentsResolver):
+            def merge_dependency(self, item, resolve_parent, parents):
+                merged.append(item)
+                return super(CountingResolver, self).merge_dependency(item, resolve_parent, parents)
+
+        res = CountingResolver((six.text_type(i), six.text_type(i + 1)) for i in range(100))
+        res.get_dependencies('100')
+        for i in range(100):
+            self.assertEqual(i, len(res.get_dependencies(six.text_type(i))))
+        self.assertEqual(100, len(merged))
+        self.assertEqual(100, len(set(merged)))
+
+    def test_circular_dependencies(self):
+        res = ImageDependentsResolver([('a', 'b'), ('b', 'c'), ('c', 'a')])
+        self.assertRaises(CircularDependency, res.get_dependencies, 'a')
+        res = ImageDependentsResolver([('a', 'a')])
+        with self.assertRaises(CircularDependency) as cm:
+            res.get_dependencies('a')
+        self.assertTrue(cm.exception.is_direct)
+
 
 if __name__ == '__main__':
     unittest.main()
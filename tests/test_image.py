@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import unittest
+
+from dockermap.map.input import ItemType, MapConfigId
+from dockermap.map.runner import ActionConfig
+from dockermap.map.runner.image import ImageMixin
+
+
+class _PullClient(object):
+    def __init__(self, base_url='unix://var/run/docker.sock', error=None):
+        self.base_url = base_url
+        self.error = error
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.pulls = []
+
+    def pull(self, repository, tag=None, **kwargs):
+        self.pulls.append((repository, tag))
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return 'pulled'
+
+
+class _CountingLock(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquired = threading.Semaphore(0)
+
+    def __enter__(self):
+        self._lock.acquire()
+        self.acquired.release()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._lock.release()
+
+
+class _ImageCache(object):
+    def __init__(self):
+        self.refreshed = []
+
+    def refresh_repo(self, repo):
+        self.refreshed.append(repo)
+
+
+class _Policy(object):
+    def __init__(self):
+        self.images = {'__default__': _ImageCache()}
+
+
+class _ImageRunner(ImageMixin):
+    def __init__(self):
+        super(_ImageRunner, self).__init__()
+        self._policy = _Policy()
+
+
+def _action(client, image='redis', tag='latest'):
+    return ActionConfig('__default__', MapConfigId(ItemType.IMAGE, 'main', image, tag), None, client, None, None)
+
+
+class TestImagePull(unittest.TestCase):
+    def _pull_concurrently(self, runner, client):
+        results = []
+        errors = []
+
+        def _pull():
+            try:
+                results.append(runner.pull(_action(client), 'redis:latest'))
+            except Exception as e:
+                errors.append(e)
+
+        runner._pull_lock = pull_lock = _CountingLock()
+        first = threading.Thread(target=_pull)
+        first.start()
+        self.assertTrue(client.started.wait(5))
+        second = threading.Thread(target=_pull)
+        second.start()
+        # Releases the pull only after the second request has looked up the one in progress.
+        self.assertTrue(pull_lock.acquired.acquire())
+        self.assertTrue(pull_lock.acquired.acquire())
+        client.release.set()
+        first.join(5)
+        second.join(5)
+        return results, errors
+
+    def test_single_flight_pull(self):
+        runner = _ImageRunner()
+        client = _PullClient()
+        results, errors = self._pull_concurrently(runner, client)
+        self.assertListEqual(errors, [])
+        self.assertListEqual(results, ['pulled', 'pulled'])
+        self.assertListEqual(client.pulls, [('redis', 'latest')])
+        self.assertListEqual(runner._policy.images['__default__'].refreshed, ['redis'])
+        self.assertEqual(runner.pull(_action(client), 'redis:latest'), 'pulled')
+        self.assertEqual(len(client.pulls), 1)
+
+    def test_pull_error_propagates(self):
+        runner = _ImageRunner()
+        error = ValueError("Pull failed.")
+        client = _PullClient(error=error)
+        results, errors = self._pull_concurrently(runner, client)
+        self.assertListEqual(results, [])
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(all(e is error for e in errors))
+        self.assertDictEqual(runner._pulls, {})
+        self.assertListEqual(runner._policy.images['__default__'].refreshed, [])
+
+    def test_pull_limit(self):
+        runner = _ImageRunner()
+        semaphore = runner._get_pull_semaphore(('registry', 'registry.example.com'), 1)
+        self.assertIs(runner._get_pull_semaphore(('registry', 'registry.example.com'), 1), semaphore)
+        self.assertIsNone(runner._get_pull_semaphore(('client', '__default__'), None))
+
+
+if __name__ == '__main__':
+    unittest.main()
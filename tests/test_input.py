@@ -16,7 +16,7 @@ from dockermap.map.input import (is_path, read_only, get_list, ItemType,
                                  NetworkEndpointList, NetworkEndpoint,
                                  AttachedVolumeList, UsedVolume,
                                  InputConfigIdList, MapConfigId, InputConfigId,
-                                 get_healthcheck, HealthCheck)
+                                 get_healthcheck, HealthCheck, get_ready_check, ReadyCheck)
 
 
 class InputConversionTest(unittest.TestCase):
@@ -295,6 +295,19 @@ class InputConversionTest(unittest.TestCase):
         assert_h2((['CMD-SHELL', 'test2'], '10 us', '1ms', 1))
         self.assertEqual(HealthCheck('NONE')._asdict(), {'test': None})
 
+    def test_get_ready_check(self):
+        assert_r1 = lambda v: self.assertEqual(get_ready_check(v), ReadyCheck('healthcheck', 60, 0.1, 2))
+        assert_r2 = lambda v: self.assertEqual(get_ready_check(v), ReadyCheck(8080, 30, 0.5, 5))
+        assert_r1('healthcheck')
+        assert_r1(['healthcheck'])
+        assert_r1({'probe': 'healthcheck'})
+        assert_r2((8080, 30, 0.5, 5))
+        assert_r2(('tcp:8080', '30s', '500ms', '5s'))
+        assert_r2({'probe': '8080', 'timeout': 30, 'interval': '500 ms', 'max_interval': 5})
+        self.assertIsNone(get_ready_check(None))
+        probe = lambda client, c_name: True
+        self.assertEqual(get_ready_check(probe), ReadyCheck(probe))
+
     def test_get_input_config_id(self):
         l = InputConfigIdList()
         assert_a = lambda v, m=None, i=None: self.assertEqual(l.get_type_item(v, map_name=m, instances=i),
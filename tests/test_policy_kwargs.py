@@ -117,6 +117,14 @@ class TestPolicyClientKwargs(unittest.TestCase):
         config = ActionConfig('__default__', cfg_id, self.sample_client_config1, None, self.sample_map1, cfg)
         hc_kwargs = dict(binds=['/new_h:/new_c:rw'])
         kwargs = self.runner.get_container_create_kwargs(config, c_name, kwargs=dict(host_config=hc_kwargs))
+        # Containers created with additional arguments are not labeled with the fingerprint of the configuration.
+        self.assertNotIn('dockermap.fingerprint', kwargs['labels'])
+        fingerprint = self.runner.get_container_fingerprint(config)
+        config_kwargs = self.runner.get_container_create_kwargs(config, c_name)
+        self.assertEqual(config_kwargs['labels']['dockermap.fingerprint'], fingerprint)
+        other_config = config._replace(config_id=cfg_id._replace(instance_name='instance2'))
+        other_kwargs = self.runner.get_container_create_kwargs(other_config, 'main.app_server.instance2')
+        self.assertEqual(other_kwargs['labels']['dockermap.fingerprint'], fingerprint)
         self.assertDictEqual(kwargs, dict(
             name=c_name,
             image='registry.example.com/app:custom',
@@ -139,6 +147,11 @@ class TestPolicyClientKwargs(unittest.TestCase):
                 'retries': 3,
                 'start_period': 5000000000,
             },
+            labels={
+                'dockermap.map': 'main',
+                'dockermap.config': 'app_server',
+                'dockermap.instance': 'instance1',
+            },
             host_config=HostConfig(
                 links={},
                 binds=[
@@ -163,6 +176,7 @@ class TestPolicyClientKwargs(unittest.TestCase):
         config = ActionConfig('merge', cfg_id, self.sample_client_config3, None, self.sample_map1, cfg)
         hc_kwargs = dict(binds=['/new_h:/new_c:rw'])
         kwargs = self.runner.get_container_create_kwargs(config, c_name, kwargs=dict(host_config=hc_kwargs))
+        self.assertNotIn('dockermap.fingerprint', kwargs['labels'])
         self.assertDictEqual(kwargs, dict(
             name=c_name,
             image='registry.example.com/app:custom',
@@ -185,6 +199,11 @@ class TestPolicyClientKwargs(unittest.TestCase):
                 'retries': 3,
                 'start_period': 5000000000,
             },
+            labels={
+                'dockermap.map': 'main',
+                'dockermap.config': 'app_server',
+                'dockermap.instance': 'instance1',
+            },
             links=[],
             binds=[
                 '/var/lib/site/config/app1:/var/lib/app/config:ro',
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import socket
+import unittest
+
+from dockermap.map.exceptions import ContainerNotReadyError
+from dockermap.map.input import ReadyCheck
+from dockermap.map.runner import ActionConfig, ready
+from dockermap.map.runner.ready import ReadyCheckMixin, probe_healthcheck, get_tcp_probe
+
+
+def _state(running=True, exit_code=0, health=None, ip_address='10.0.0.2'):
+    state = {'Running': running, 'ExitCode': exit_code}
+    if health:
+        state['Health'] = {'Status': health}
+    return {
+        'State': state,
+        'NetworkSettings': {
+            'IPAddress': '',
+            'Networks': {'bridge': {'IPAddress': ip_address}},
+        },
+    }
+
+
+class _InspectClient(object):
+    def __init__(self, *states):
+        self._states = list(states)
+        self.calls = 0
+
+    def inspect_container(self, container):
+        self.calls += 1
+        if len(self._states) > 1:
+            return self._states.pop(0)
+        return self._states[0]
+
+
+class _Connection(object):
+    def close(self):
+        pass
+
+
+class _SocketModule(object):
+    error = socket.error
+    timeout = socket.timeout
+
+    def __init__(self, *reachable):
+        self.reachable = set(reachable)
+        self.addresses = []
+
+    def create_connection(self, address, timeout=None):
+        self.addresses.append(address)
+        if address not in self.reachable:
+            raise socket.error("Connection refused.")
+        return _Connection()
+
+
+class _Config(object):
+    ready_check = None
+
+
+class _ReadyRunner(ReadyCheckMixin):
+    def __init__(self, wait_for_healthcheck=False):
+        self.wait_for_healthcheck = wait_for_healthcheck
+
+
+def _action(client):
+    return ActionConfig('__default__', None, None, client, None, None)
+
+
+class TestReadyProbes(unittest.TestCase):
+    def setUp(self):
+        self.socket_module = ready.socket
+
+    def tearDown(self):
+        ready.socket = self.socket_module
+
+    def test_probe_healthcheck(self):
+        self.assertTrue(probe_healthcheck(_InspectClient(_state()), 'c1'))
+        self.assertTrue(probe_healthcheck(_InspectClient(_state(health='healthy')), 'c1'))
+        self.assertFalse(probe_healthcheck(_InspectClient(_state(health='starting')), 'c1'))
+        self.assertRaises(ContainerNotReadyError, probe_healthcheck, _InspectClient(_state(health='unhealthy')), 'c1')
+
+    def test_probe_healthcheck_exited(self):
+        self.assertTrue(probe_healthcheck(_InspectClient(_state(running=False)), 'c1'))
+        self.assertRaises(ContainerNotReadyError, probe_healthcheck,
+                          _InspectClient(_state(running=False, exit_code=1)), 'c1')
+
+    def test_tcp_probe(self):
+        ready.socket = socket_module = _SocketModule(('10.0.0.2', 8080))
+        self.assertTrue(get_tcp_probe(8080)(_InspectClient(_state()), 'c1'))
+        self.assertFalse(get_tcp_probe(8081)(_InspectClient(_state()), 'c1'))
+        self.assertFalse(get_tcp_probe(8080)(_InspectClient(_state(ip_address='')), 'c1'))
+        self.assertListEqual(socket_module.addresses, [('10.0.0.2', 8080), ('10.0.0.2', 8081)])
+        self.assertTrue(get_tcp_probe(8080)(_InspectClient(_state(running=False)), 'c1'))
+        self.assertRaises(ContainerNotReadyError, get_tcp_probe(8080),
+                          _InspectClient(_state(running=False, exit_code=137)), 'c1')
+
+    def test_wait_ready(self):
+        client = _InspectClient(_state(health='starting'), _state(health='starting'), _state(health='healthy'))
+        _ReadyRunner().wait_ready(_action(client), 'c1', ReadyCheck(interval=0.001, max_interval=0.002))
+        self.assertEqual(client.calls, 3)
+
+    def test_wait_ready_timeout(self):
+        client = _InspectClient(_state(health='starting'))
+        self.assertRaises(ContainerNotReadyError, _ReadyRunner().wait_ready, _action(client), 'c1',
+                          ReadyCheck(timeout=0.01, interval=0.001, max_interval=0.002))
+        self.assertGreater(client.calls, 1)
+
+    def test_wait_for_healthcheck_exited(self):
+        runner = _ReadyRunner(wait_for_healthcheck=True)
+        client = _InspectClient(_state(running=False))
+        action = _action(client)
+        ready_check = runner.get_container_ready_check(action._replace(config=_Config()))
+        self.assertEqual(ready_check, ReadyCheck())
+        runner.wait_ready(action, 'c1', ready_check)
+        self.assertEqual(client.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
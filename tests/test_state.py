@@ -14,14 +14,17 @@ from dockermap import DEFAULT_COREIMAGE, DEFAULT_BASEIMAGE
 from dockermap.map.config.client import ClientConfiguration
 from dockermap.map.config.main import ContainerMap
 from dockermap.map.config.utils import get_map_config_ids
-from dockermap.map.input import ExecCommand, ExecPolicy, MapConfigId, ItemType, UsedVolume
+from dockermap.map.input import ExecCommand, ExecPolicy, MapConfigId, ItemType, PortBindingList, UsedVolume
 from dockermap.map.policy import ConfigFlags
 from dockermap.map.policy.base import BasePolicy
 from dockermap.map.policy.utils import get_shared_volume_path
+from dockermap.map.runner import ActionConfig
 from dockermap.map.state import INITIAL_START_TIME, State, StateFlags
 from dockermap.map.state.base import DependencyStateGenerator, DependentStateGenerator, SingleStateGenerator
 from dockermap.map.state.update import UpdateStateGenerator
-from dockermap.map.state.update.container import CONTAINER_UPDATE_VARS
+from dockermap.map.config.container import ContainerConfiguration
+from dockermap.map.state.update.container import (CONTAINER_UPDATE_VARS, ContainerConfigFingerprint,
+                                                  get_update_check_plan)
 from dockermap.map.state.utils import merge_dependency_paths
 from dockermap.utils import format_image_tag
 
@@ -117,6 +120,22 @@ def _network(config_name, **kwargs):
     return config_name, kwargs
 
 
+def _add_info(rsps):
+    info = {
+        'MemoryLimit': True,
+        'SwapLimit': True,
+        'KernelMemory': True,
+        'CpuCfsPeriod': True,
+        'CpuCfsQuota': True,
+        'CPUShares': True,
+        'CPUSet': True,
+        'OomKillDisable': True,
+        'PidsLimit': True,
+    }
+    for prefix in URL_PREFIXES:
+        rsps.add('GET', '{0}/info'.format(prefix), content_type='application/json', json=info)
+
+
 def _add_container_list(rsps, container_names):
     results = [
         {'Id': get_container_id(name), 'Names': ['/{0}'.format(name)]}
@@ -230,7 +249,7 @@ def _get_container_mounts(config_id, container_map, c_config, named_volumes, val
 
 def _add_container_inspect(rsps, config_id, container_name, container_map, c_config, state, image_id, named_volumes,
                            volumes_valid, links_valid=True, network_ep_valid=True, network_link_valid=True,
-                           skip_network=None, extra_network=False, **kwargs):
+                           skip_network=None, extra_network=False, fingerprint=None, **kwargs):
     config_type = config_id.config_type
     container_id = get_container_id(container_name)
     ports = defaultdict(list)
@@ -242,6 +261,8 @@ def _add_container_inspect(rsps, config_id, container_name, container_map, c_con
         'Entrypoint': [],
     }
     host_config['NetworkMode'] = 'default'  # TODO: Vary.
+    if fingerprint:
+        config_dict['Labels'] = {'dockermap.fingerprint': fingerprint}
     if config_type == ItemType.CONTAINER:
         for ex in c_config.exposes:
             ex_port = '{0}/tcp'.format(ex.exposed_port)
@@ -303,7 +324,7 @@ def _add_container_inspect(rsps, config_id, container_name, container_map, c_con
             'Ports': ports,
             'Networks': networks,
         }
-        for i_hc_key, c_hc_kwarg, c_cc_opt, i_hc_func in CONTAINER_UPDATE_VARS:
+        for i_hc_key, c_hc_kwarg, c_cc_opt, __, i_hc_func in CONTAINER_UPDATE_VARS:
             if c_hc_kwarg in kwargs:
                 c_val = kwargs.pop(c_hc_kwarg)
             elif c_hc_kwarg in c_config.host_config:
@@ -506,6 +527,7 @@ class TestPolicyStateGenerators(unittest.TestCase):
         for dn_name in ('bridge', 'none', 'host'):
             _add_network_inspect(rsps, dn_name, None, network_containers.get(dn_name, []))
             network_names.append(dn_name)
+        _add_info(rsps)
         _add_container_list(rsps, container_names)
         _add_network_list(rsps, network_names)
         _add_volume_list(rsps, volume_names)
@@ -586,6 +608,95 @@ class TestPolicyStateGenerators(unittest.TestCase):
             queue_state = _get_single_state(sg, self._config_id('redis', 'queue'))
             self.assertEqual(queue_state.state_flags & StateFlags.NEEDS_RESET, 0)
 
+    def test_single_states_client_names(self):
+        image_ids = [MapConfigId(ItemType.IMAGE, self.map_name, 'server', 'latest')]
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            _add_image_list(rsps, self.images)
+            states = list(SingleStateGenerator(self.policy, {'client_names': []}).get_states(image_ids))
+            self.assertListEqual(states, [])
+            states = list(SingleStateGenerator(self.policy, {'client_names': ['__default__']}).get_states(image_ids))
+            self.assertEqual(len(states), 1)
+            self.assertEqual(states[0].client_name, '__default__')
+            self.assertEqual(states[0].base_state, State.PRESENT)
+
+    def test_single_states_summary(self):
+        summaries = [
+            ('svc', 'running', 'Up 5 minutes', State.RUNNING, StateFlags.NONE),
+            ('svc2', 'created', 'Created', State.PRESENT, StateFlags.INITIAL),
+            ('sub_svc', 'exited', 'Exited (-127) 2 hours ago', State.PRESENT, StateFlags.NONRECOVERABLE),
+            ('sub_sub_svc', 'exited', 'Exited (0) 2 hours ago', State.PRESENT, StateFlags.NONE),
+        ]
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            results = [
+                {'Id': get_container_id(name), 'Names': ['/main.{0}'.format(name)], 'State': c_state, 'Status': status}
+                for name, c_state, status, __, __ in summaries
+            ]
+            for prefix in URL_PREFIXES:
+                rsps.add('GET', '{0}/containers/json'.format(prefix), content_type='application/json', json=results)
+            sg = SingleStateGenerator(self.policy, {'summary_states': True})
+            for name, __, __, base_state, state_flags in summaries:
+                c_state = _get_single_state(sg, self._config_id(name))
+                self.assertEqual(c_state.base_state, base_state)
+                self.assertEqual(c_state.state_flags, state_flags)
+                self.assertEqual(c_state.extra_data['id'], get_container_id(name))
+
+    def test_prefetched_states(self):
+        image_ids = [MapConfigId(ItemType.IMAGE, self.map_name, image_name, tag)
+                     for __, image_tag in self.images
+                     for image_name, __, tag in [image_tag.partition(':')]]
+        image_ids.append(MapConfigId(ItemType.IMAGE, self.map_name, 'missing', 'latest'))
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            _add_image_list(rsps, self.images)
+            states = list(SingleStateGenerator(self.policy, {}).get_states(image_ids))
+            prefetched_states = list(SingleStateGenerator(self.policy, {'prefetch_workers': 2}).get_states(image_ids))
+        self.assertEqual(len(prefetched_states), len(image_ids))
+        self.assertListEqual(prefetched_states, states)
+        self.assertEqual(prefetched_states[-1].base_state, State.ABSENT)
+
+    def test_prefetched_container_states(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self._setup_containers(rsps, [
+                _container('sub_sub_svc', P_STATE_EXITED_0),
+                _container('sub_svc', P_STATE_EXITED_127),
+                _container('redis', instances=['cache']),
+                _container('svc'),
+                _container('server', P_STATE_RESTARTING),
+            ])
+            states = list(UpdateStateGenerator(self.policy, {}).get_states(self.server_config_id))
+            prefetched_states = list(UpdateStateGenerator(self.policy, {'prefetch_workers': 3})
+                                     .get_states(self.server_config_id))
+        self.assertListEqual(prefetched_states, states)
+        states_dict = _get_states_dict(prefetched_states)
+        self.assertEqual(states_dict['containers'][('sub_sub_svc', None)].base_state, State.PRESENT)
+        self.assertEqual(states_dict['containers'][('sub_svc', None)].state_flags & StateFlags.NONRECOVERABLE,
+                         StateFlags.NONRECOVERABLE)
+        self.assertEqual(states_dict['containers'][('redis', 'cache')].base_state, State.RUNNING)
+        self.assertEqual(states_dict['containers'][('redis', 'queue')].base_state, State.ABSENT)
+        self.assertEqual(states_dict['containers'][('server', None)].state_flags & StateFlags.RESTARTING,
+                         StateFlags.RESTARTING)
+
+    def test_prefetched_network_states(self):
+        svc_ids = [
+            MapConfigId(ItemType.CONTAINER, self.map_name, 'server3'),
+            MapConfigId(ItemType.CONTAINER, self.map_name, 'net_svc')
+        ]
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self._setup_containers(rsps, [
+                _container('net_svc', skip_network='app_net1'),
+                _container('server3', skip_network='app_net1'),
+            ], [
+                _network('app_net2', Driver='new'),
+            ])
+            states = list(UpdateStateGenerator(self.policy, {}).get_states(svc_ids))
+            prefetched_states = list(UpdateStateGenerator(self.policy, {'prefetch_workers': 3}).get_states(svc_ids))
+        self.assertListEqual(prefetched_states, states)
+        states_dict = _get_states_dict(prefetched_states)
+        self.assertEqual(states_dict['networks']['app_net1'].base_state, State.ABSENT)
+        self.assertEqual(states_dict['networks']['app_net2'].state_flags & StateFlags.MISC_MISMATCH,
+                         StateFlags.MISC_MISMATCH)
+        self.assertEqual(states_dict['containers'][('net_svc', None)].state_flags & StateFlags.NETWORK_DISCONNECTED,
+                         StateFlags.NETWORK_DISCONNECTED)
+
     def test_dependent_states(self):
         with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
             self._setup_containers(rsps, [
@@ -613,6 +724,33 @@ class TestPolicyStateGenerators(unittest.TestCase):
                                 for s in states
                                 if not (s.config_id.config_type == ItemType.CONTAINER and s.config_id.config_name == 'redis')))
 
+    def test_dependency_config_waves(self):
+        server_id = self.server_config_id[0]
+        waves = DependencyStateGenerator(self.policy, {}).get_config_waves(self.server_config_id)
+        item_waves = {config_id: wave_index
+                      for wave_index, wave in enumerate(waves)
+                      for config_id, __ in wave}
+        self.assertSetEqual(set(item_waves), set(self.policy.get_dependencies(server_id)) | {server_id})
+        self.assertEqual(item_waves[server_id], len(waves) - 1)
+        self.assertListEqual(waves[-1], [(server_id, ConfigFlags.NONE)])
+        for config_id, wave_index in six.iteritems(item_waves):
+            for d_config_id in self.policy.get_dependencies(config_id):
+                self.assertLess(item_waves[d_config_id], wave_index)
+        redis_cache_id = MapConfigId(ItemType.CONTAINER, self.map_name, 'redis', 'cache')
+        redis_queue_id = MapConfigId(ItemType.CONTAINER, self.map_name, 'redis', 'queue')
+        self.assertEqual(item_waves[redis_cache_id], item_waves[redis_queue_id])
+
+    def test_dependent_config_waves(self):
+        redis_id = MapConfigId(ItemType.CONTAINER, self.map_name, 'redis', 'cache')
+        waves = DependentStateGenerator(self.policy, {}).get_config_waves([redis_id])
+        item_waves = {config_id: wave_index
+                      for wave_index, wave in enumerate(waves)
+                      for config_id, __ in wave}
+        self.assertSetEqual(set(item_waves), set(self.policy.get_dependents(redis_id)) | {redis_id})
+        for config_id, wave_index in six.iteritems(item_waves):
+            for d_config_id in self.policy.get_dependents(config_id):
+                self.assertLess(item_waves[d_config_id], wave_index)
+
     def test_update_states_clean(self):
         with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
             self._setup_default_containers(rsps)
@@ -716,6 +854,48 @@ class TestPolicyStateGenerators(unittest.TestCase):
             self.assertEqual(server_state.base_state, State.RUNNING)
             self.assertEqual(server_state.state_flags & StateFlags.MISSING_LINK, StateFlags.MISSING_LINK)
 
+    def _get_fingerprint(self, config_name):
+        config_id = MapConfigId(ItemType.CONTAINER, self.map_name, config_name)
+        action = ActionConfig('__default__', config_id, self.sample_client_config1, None, self.sample_map,
+                              self.sample_map.get_existing(config_name))
+        return ContainerConfigFingerprint(self.policy).get_container_fingerprint(action)
+
+    def test_update_states_fingerprint_match(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self._setup_containers(rsps, [
+                _container('sub_sub_svc'),
+                _container('sub_svc'),
+                _container('redis'),
+                _container('svc'),
+                _container('server', links_valid=False, fingerprint=self._get_fingerprint('server')),
+            ])
+            generator = UpdateStateGenerator(self.policy, {})
+            states = _get_states_dict(generator.get_states(self.server_config_id))
+            server_state = states['containers'][('server', None)]
+            self.assertEqual(server_state.base_state, State.RUNNING)
+            self.assertEqual(server_state.state_flags & StateFlags.MISSING_LINK, 0)
+            self.assertEqual(server_state.state_flags & StateFlags.MISC_MISMATCH, 0)
+            check_plan = generator._check_plans[('__default__', self.map_name, 'server')]
+            self.assertEqual(check_plan.fingerprint, self._get_fingerprint('server'))
+
+    def test_update_states_fingerprint_mismatch(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            fingerprint = self._get_fingerprint('server')
+            self._setup_containers(rsps, [
+                _container('sub_sub_svc'),
+                _container('sub_svc'),
+                _container('redis'),
+                _container('svc'),
+                _container('server', links_valid=False, fingerprint=fingerprint),
+            ])
+            self.sample_map.containers['server'].create_options.update(command='/bin/true')
+            self.assertNotEqual(self._get_fingerprint('server'), fingerprint)
+            states = _get_states_dict(UpdateStateGenerator(self.policy, {}).get_states(self.server_config_id))
+            server_state = states['containers'][('server', None)]
+            self.assertEqual(server_state.base_state, State.RUNNING)
+            self.assertEqual(server_state.state_flags & StateFlags.MISSING_LINK, StateFlags.MISSING_LINK)
+            self.assertEqual(server_state.state_flags & StateFlags.MISC_MISMATCH, StateFlags.MISC_MISMATCH)
+
     def test_update_states_invalid_network_ports(self):
         with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
             self._setup_containers(rsps, [
@@ -806,6 +986,27 @@ class TestPolicyStateGenerators(unittest.TestCase):
             self.assertEqual(server_state.base_state, State.RUNNING)
             self.assertEqual(server_state.state_flags & StateFlags.MISC_MISMATCH, StateFlags.MISC_MISMATCH)
 
+    def test_update_check_plans(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            self._setup_default_containers(rsps)
+            sg = UpdateStateGenerator(self.policy, {})
+            list(sg.get_states(self.server_config_id))
+            # Plans are shared between instances, e.g. of redis.
+            self.assertSetEqual(set(sg._check_plans), {
+                ('__default__', self.map_name, config_name)
+                for config_name in ('sub_sub_svc', 'sub_svc', 'redis', 'svc', 'server')
+            })
+            server_plan = sg._check_plans[('__default__', self.map_name, 'server')]
+            self.sample_map.containers['server'].create_options.update(environment=dict(Test='x'))
+            list(sg.get_states(self.server_config_id))
+            self.assertIs(sg._check_plans[('__default__', self.map_name, 'server')], server_plan)
+            # Each run starts with new plans.
+            sg = UpdateStateGenerator(self.policy, {})
+            states = _get_states_dict(sg.get_states(self.server_config_id))
+            self.assertDictEqual(sg._check_plans[('__default__', self.map_name, 'server')].environment, {'Test': 'x'})
+            self.assertEqual(states['containers'][('server', None)].state_flags & StateFlags.MISC_MISMATCH,
+                             StateFlags.MISC_MISMATCH)
+
     def test_update_states_updated_command(self):
         with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
             self._setup_default_containers(rsps)
@@ -877,6 +1078,49 @@ class TestPolicyStateGenerators(unittest.TestCase):
 
 
 
+class TestUpdateCheckPlan(unittest.TestCase):
+    def test_check_plan_contents(self):
+        c_config = ContainerConfiguration()
+        c_config.create_options = {
+            'environment': {'A': 'a', 'B': 1},
+            'command': 'run "--name" x',
+            'entrypoint': '/bin/sh',
+            'mem_limit': '1g',
+        }
+        c_config.exposes = PortBindingList([(8080, 80, 'private'), (8443, 443), '9000/udp'])
+        c_config.host_config = {'cpu_shares': 512, 'restart_policy': {'Name': 'always'}}
+        client_config = ClientConfiguration(interfaces={'private': '10.0.0.11'},
+                                            constraints={'mem_limit': True, 'memswap_limit': True})
+        plan = get_update_check_plan(c_config, client_config, 'abc')
+        self.assertDictEqual(plan.environment, {'A': 'a', 'B': 1})
+        self.assertListEqual(plan.cmd, ['run', '--name', 'x'])
+        self.assertListEqual(plan.entrypoint, ['/bin/sh'])
+        self.assertListEqual(plan.ports, [
+            ('8080/tcp', {'HostIp': '10.0.0.11', 'HostPort': '80'}),
+            ('8443/tcp', {'HostIp': '0.0.0.0', 'HostPort': '443'}),
+            ('9000/udp', None),
+        ])
+        # CPU shares are not supported by the client constraints and are not checked.
+        self.assertListEqual(plan.limits, [
+            ('BlkioWeight', 'blkio_weight', None),
+            ('Memory', 'mem_limit', parse_bytes('1g')),
+            ('MemoryReservation', 'mem_reservation', None),
+            ('MemorySwap', 'memswap_limit', parse_bytes('1g') * 2),
+        ])
+        self.assertDictEqual(plan.restart_policy, {'Name': 'always'})
+        self.assertEqual(plan.fingerprint, 'abc')
+
+    def test_empty_check_plan(self):
+        plan = get_update_check_plan(ContainerConfiguration(), ClientConfiguration(constraints={'mem_limit': True}))
+        self.assertIsNone(plan.environment)
+        self.assertIsNone(plan.cmd)
+        self.assertIsNone(plan.entrypoint)
+        self.assertListEqual(plan.ports, [])
+        self.assertTrue(all(c_value is None for __, __, c_value in plan.limits))
+        self.assertIsNone(plan.restart_policy)
+        self.assertIsNone(plan.fingerprint)
+
+
 class TestPolicyStateUtils(unittest.TestCase):
     def setUp(self):
         self.map_name = map_name = 'main'
@@ -1045,3 +1289,48 @@ class TestPolicyStateUtils(unittest.TestCase):
             (ItemType.VOLUME, self.map_name, 'server2', 'app_log'),
             (ItemType.VOLUME, self.map_name, 'server2', 'server_log'),
         ], merged_paths[1][1])
+
+    def test_merge_order_shortened(self):
+        merged_paths = merge_dependency_paths([
+            ('a', ['x', 'y']),
+            ('b', ['y', 'z', 'w']),
+            ('c', ['w', 'v']),
+        ])
+        self.assertListEqual(merged_paths, [
+            ('a', ['x', 'y']),
+            ('b', ['z', 'w']),
+            ('c', ['v']),
+        ])
+
+    def test_merge_order_fully_shared(self):
+        merged_paths = merge_dependency_paths([
+            ('a', ['x', 'y']),
+            ('b', ['y', 'x']),
+        ])
+        self.assertListEqual(merged_paths, [
+            ('a', ['x', 'y']),
+            ('b', []),
+        ])
+
+    def test_merge_order_replaced(self):
+        merged_paths = merge_dependency_paths([
+            ('a', ['x']),
+            ('c', ['z']),
+            ('b', ['a', 'x', 'w']),
+        ])
+        # Paths that are contained in a later one are removed, and the later one is appended.
+        self.assertListEqual(merged_paths, [
+            ('c', ['z']),
+            ('b', ['a', 'x', 'w']),
+        ])
+
+    def test_merge_order_contained(self):
+        merged_paths = merge_dependency_paths([
+            ('a', ['x', 'y']),
+            ('x', ['y']),
+            ('b', ['w']),
+        ])
+        self.assertListEqual(merged_paths, [
+            ('a', ['x', 'y']),
+            ('b', ['w']),
+        ])
@@ -2,10 +2,12 @@
 from __future__ import absolute_import, unicode_literals
 
 from collections import namedtuple
+import threading
 import unittest
 from six import string_types
 
-from dockermap.functional import lazy, register_type, uses_type_registry, LazyOnceObject, resolve_value, resolve_deep
+from dockermap.functional import (lazy, register_type, uses_type_registry, LazyOnceObject, resolve_value, resolve_deep,
+                                  resolution_scope, get_resolution_scope, bind_resolution_scope)
 
 LOOKUP_DICT = {
     'a': '/test/path_a',
@@ -113,3 +115,56 @@ class LazyValueResolutionTest(unittest.TestCase):
         self.assertFalse(data['d'][2]['a'].evaluated)
         # Placing functions as dictionary keys may not be a good idea, but should work at least for tuples.
         self.assertEqual(data.get('test_value_2'), 'e')
+
+    def test_resolution_scope(self):
+        calls = []
+
+        def _lookup(key):
+            calls.append(key)
+            return LOOKUP_DICT.get(key)
+
+        a = lazy(_lookup, 'a')
+        with resolution_scope() as scope:
+            with resolution_scope() as inner_scope:
+                self.assertIs(inner_scope, scope)
+                self.assertEqual(resolve_value(a), '/test/path_a')
+            self.assertEqual(resolve_value(a), '/test/path_a')
+            self.assertEqual(calls, ['a'])
+        self.assertIsNone(get_resolution_scope())
+        self.assertEqual(resolve_value(a), '/test/path_a')
+        self.assertEqual(calls, ['a', 'a'])
+
+    def test_resolution_scope_threads(self):
+        calls = []
+
+        def _lookup(key):
+            calls.append(key)
+            return LOOKUP_DICT.get(key)
+
+        def _resolve():
+            thread_scopes.append(get_resolution_scope())
+            return resolve_value(a)
+
+        a = lazy(_lookup, 'a')
+        thread_scopes = []
+        with resolution_scope() as scope:
+            self.assertEqual(resolve_value(a), '/test/path_a')
+            thread = threading.Thread(target=_resolve)
+            thread.start()
+            thread.join()
+            self.assertIsNone(thread_scopes[0])
+            self.assertEqual(calls, ['a', 'a'])
+            thread = threading.Thread(target=bind_resolution_scope(_resolve))
+            thread.start()
+            thread.join()
+            self.assertIs(thread_scopes[1], scope)
+            self.assertEqual(calls, ['a', 'a'])
+        self.assertIs(bind_resolution_scope(_resolve), _resolve)
+
+    def test_register_type_after_lookup(self):
+        OtherType = namedtuple('OtherType', ['arg1'])
+        ot = OtherType('a')
+        self.assertFalse(uses_type_registry(ot))
+        register_type(OtherType, lambda v: LOOKUP_DICT.get(v.arg1))
+        self.assertTrue(uses_type_registry(ot))
+        self.assertEqual(resolve_value(ot), '/test/path_a')
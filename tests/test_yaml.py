@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from dockermap.map.yaml import load_map_file
+from tests import MAP_DATA_2
+
+
+class MapFileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.map_file = os.path.join(self.temp_dir, 'main.yaml')
+        map_data = dict(MAP_DATA_2, use_attached_parent_name=True)
+        with open(self.map_file, 'w') as f:
+            yaml.safe_dump(map_data, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_cached_map(self):
+        c_map = load_map_file(self.map_file, name='main', cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        cached_map = load_map_file(self.map_file, name='main', cache_dir=self.cache_dir)
+        self.assertIsNot(cached_map, c_map)
+        self.assertEqual(cached_map, c_map)
+        self.assertEqual(cached_map.get_existing('server').as_dict(), c_map.get_existing('server').as_dict())
+
+    def test_changed_file(self):
+        load_map_file(self.map_file, name='main', cache_dir=self.cache_dir)
+        with open(self.map_file, 'w') as f:
+            f.write("host_root: !path_lazy ~/apps\nweb:\n  image: nginx\n")
+        c_map = load_map_file(self.map_file, name='main', cache_dir=self.cache_dir)
+        self.assertEqual(c_map.get_existing('web').image, 'nginx')
+        # Maps with lazy values are not stored.
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_changed_environment(self):
+        with open(self.map_file, 'w') as f:
+            f.write("host_root: !path ${DOCKERMAP_TEST_ROOT}/apps\nweb:\n  image: nginx\n")
+        os.environ['DOCKERMAP_TEST_ROOT'] = '/var/a'
+        try:
+            self.assertEqual(load_map_file(self.map_file, name='main', cache_dir=self.cache_dir).host.root,
+                             '/var/a/apps')
+            os.environ['DOCKERMAP_TEST_ROOT'] = '/var/b'
+            self.assertEqual(load_map_file(self.map_file, name='main', cache_dir=self.cache_dir).host.root,
+                             '/var/b/apps')
+            os.environ['DOCKERMAP_TEST_ROOT'] = '/var/a'
+            self.assertEqual(load_map_file(self.map_file, name='main', cache_dir=self.cache_dir).host.root,
+                             '/var/a/apps')
+        finally:
+            del os.environ['DOCKERMAP_TEST_ROOT']
+        # Outdated maps are replaced.
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_changed_name(self):
+        load_map_file(self.map_file, name='main', cache_dir=self.cache_dir)
+        c_map = load_map_file(self.map_file, name='other', cache_dir=self.cache_dir)
+        self.assertEqual(c_map.name, 'other')
+        self.assertEqual(load_map_file(self.map_file, name='other', cache_dir=self.cache_dir).name, 'other')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)